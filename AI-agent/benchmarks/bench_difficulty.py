@@ -0,0 +1,105 @@
+"""
+Benchmark: difficulty scoring, dense TF-IDF + per-term substring tests
+versus the sparse column sums + one-pass-per-term counting in
+src/schedule/utils, at the production top_k (40 terms).
+
+Works on synthetic noun phrases so it runs without the spaCy model:
+
+    python -m benchmarks.bench_difficulty [n_phrases] [n_headings] [top_k]
+"""
+
+import random
+import re
+import sys
+import time
+import tracemalloc
+
+from sklearn.feature_extraction.text import TfidfVectorizer
+
+from src.schedule.utils import compute_topic_difficulty, rank_terms
+
+
+def synthetic_phrases(n_phrases: int, n_headings: int = None, vocab_size: int = 20000, seed: int = 7):
+    rng = random.Random(seed)
+    syllables = ["al", "ge", "bra", "vec", "tor", "ma", "trix", "eig", "en", "lin",
+                 "ear", "op", "ti", "mi", "za", "tion", "gra", "di", "ent", "ker"]
+    vocab = ["".join(rng.choice(syllables) for _ in range(rng.randint(2, 5))) for _ in range(vocab_size)]
+    phrases = [" ".join(rng.choice(vocab) for _ in range(rng.randint(1, 4))) for _ in range(n_phrases)]
+    # Headings mostly reuse the top phrases' words, so the terms do match
+    common = [w for p in phrases[:2000] for w in p.split()]
+    headings = {}
+    while len(headings) < (n_headings or n_phrases // 50):
+        words = [rng.choice(common if rng.random() < 0.5 else vocab) for _ in range(rng.randint(2, 6))]
+        headings[" ".join(words).title()] = None
+    return phrases, list(headings)
+
+
+# ----------------------------------------------------
+# Reference implementation (before the sparse rewrite)
+# ----------------------------------------------------
+
+def reference_terms(phrases, top_k=40):
+    vectorizer = TfidfVectorizer(stop_words="english")
+    tfidf = vectorizer.fit_transform(phrases)
+    feature_names = vectorizer.get_feature_names_out()
+    scores = tfidf.toarray().sum(axis=0)
+    term_scores = sorted(zip(feature_names, scores), key=lambda x: x[1], reverse=True)
+    return [term for term, score in term_scores[:top_k]]
+
+
+def reference_difficulty(headings, tech_terms):
+    difficulty_scores = {}
+    for heading in headings:
+        h = heading.lower()
+        term_count = sum(1 for t in tech_terms if t in h)
+        words = re.findall(r"\w+", h)
+        avg_length = sum(len(w) for w in words) / (len(words) + 1)
+        difficulty_scores[heading] = round((term_count * 3) + (avg_length * 0.8), 3)
+    return difficulty_scores
+
+
+def measure(fn, *args, repeat: int = 3):
+    """(result, best wall time of `repeat` runs, peak traced memory of one run)."""
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = fn(*args)
+        best = min(best, time.perf_counter() - started)
+
+    # Traced separately: tracemalloc slows pure-Python code down a lot
+    tracemalloc.start()
+    fn(*args)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, best, peak
+
+
+def run(n_phrases: int = 50000, n_headings: int = 20000, top_k: int = 40):
+    phrases, headings = synthetic_phrases(n_phrases, n_headings)
+
+    old_terms, old_terms_s, old_terms_peak = measure(reference_terms, phrases, top_k, repeat=1)
+    new_terms, new_terms_s, new_terms_peak = measure(rank_terms, phrases, top_k, repeat=1)
+    assert old_terms == new_terms, "term ranking changed"
+
+    old_scores, old_score_s, _ = measure(reference_difficulty, headings, old_terms)
+    new_scores, new_score_s, _ = measure(compute_topic_difficulty, headings, "", new_terms)
+    assert old_scores == new_scores, "difficulty scores changed"
+
+    return {
+        "phrases": n_phrases,
+        "headings": len(headings),
+        "terms": top_k,
+        "tfidf_dense_s": round(old_terms_s, 4),
+        "tfidf_sparse_s": round(new_terms_s, 4),
+        "tfidf_dense_peak_mb": round(old_terms_peak / 2**20, 1),
+        "tfidf_sparse_peak_mb": round(new_terms_peak / 2**20, 1),
+        "scoring_substring_s": round(old_score_s, 4),
+        "scoring_counted_s": round(new_score_s, 4),
+        "scoring_speedup": round(old_score_s / new_score_s, 2) if new_score_s else None,
+    }
+
+
+if __name__ == "__main__":
+    args = [int(a) for a in sys.argv[1:]]
+    for key, value in run(*args).items():
+        print(f"{key:>24}: {value}")
@@ -0,0 +1,85 @@
+"""
+Benchmark: TextCleaner.clean versus the original nine-pass implementation
+(kept below as the timing reference) on a large synthetic document.
+Byte-identical output is checked by the golden-file tests in
+tests/test_text_cleaner.py, not here:
+
+    python -m benchmarks.bench_text_cleaner [doc_kb]
+"""
+
+import random
+import re
+import sys
+import time
+
+from src.preprocessing.text_cleaner import TextCleaner
+
+
+# ----------------------------------------------------
+# Reference implementation (before precompiling)
+# ----------------------------------------------------
+
+def reference_clean(text: str) -> str:
+    if not text or len(text.strip()) == 0:
+        return ""
+
+    for pattern in [r"\bPage\s*\d+\b", r"^\s*\d+\s*$", r"^\s*-\d+-\s*$", r"^\s*\d+\s*/\s*\d+\s*$"]:
+        text = re.sub(pattern, "", text, flags=re.MULTILINE)
+    text = re.sub(r"[•\*\-\–\●\▪\→]", "-", text)
+    text = re.sub(r"[^\w\s\.\,\-\:\;\(\)\[\]\/]", " ", text)
+    text = re.sub(r"\s{2,}", " ", text)
+    text = re.sub(r"\.(?=[A-Za-z])", ". ", text)
+    text = re.sub(r"\n{2,}", "\n", text)
+    return text.strip()
+
+
+# ----------------------------------------------------
+# Synthetic syllabus-like text with the awkward cases
+# ----------------------------------------------------
+
+PIECES = [
+    "Chapter", "Introduction", "to", "Algorithms", "graph", "theory", "éclair", "naïve", "数据",
+    "Page 12", "Page12", "Pages 3", "12", "-4-", "- 4 -", "3 / 10", "3/10", "1.2", "e.g.x",
+    "end.Next", "end. Next", "U.S.A", "•", "*", "-", "–", "●", "▪", "→", "©", "@", "#", "$",
+    "%", "&", "\"", "'", "?", "!", "(a)", "[1]", "a/b", "x:y;", "_id", "½", "²", "­",
+]
+SEPARATORS = [" ", " ", " ", "  ", "\t", "\n", "\n", "\n\n", "\r\n", " \n ", " ", " ", "\x0b", ""]
+
+
+def synthetic_document(rng: random.Random, size: int) -> str:
+    out = []
+    length = 0
+    while length < size:
+        if rng.random() < 0.05:
+            piece = rng.choice(["\n12\n", "\n  7  \n", "\n-8-\n", "\n 4 / 9 \n", "\nPage 3\n", "\n\n\n"])
+        else:
+            piece = rng.choice(PIECES) + rng.choice(SEPARATORS)
+        out.append(piece)
+        length += len(piece)
+    return "".join(out)
+
+
+def run(doc_kb: int = 2048):
+    text = synthetic_document(random.Random(3), doc_kb * 1024)
+    cleaner = TextCleaner()
+
+    started = time.perf_counter()
+    reference_clean(text)
+    old_s = time.perf_counter() - started
+
+    started = time.perf_counter()
+    cleaner.clean(text)
+    new_s = time.perf_counter() - started
+
+    return {
+        "large_doc_kb": doc_kb,
+        "reference_s": round(old_s, 4),
+        "cleaner_s": round(new_s, 4),
+        "speedup": round(old_s / new_s, 2) if new_s else None,
+    }
+
+
+if __name__ == "__main__":
+    args = [int(a) for a in sys.argv[1:]]
+    for key, value in run(*args).items():
+        print(f"{key:>24}: {value}")
@@ -0,0 +1,342 @@
+"""
+Benchmark suite: PDF extraction, NLP scoring, text processing, scheduling
+and the FastAPI endpoints on synthetic syllabus PDFs (benchmarks.syllabus_pdf).
+
+Runs offline: the vector store is the local backend in a temporary
+directory, and the embedding model is a deterministic hashing encoder with
+the SentenceTransformer interface (pass --real-model to load the configured
+model instead). Results are written as JSON; with --baseline, every case is
+compared against an earlier run and the exit code is 1 on a regression:
+
+    python -m benchmarks.suite --pages 10 100 1000 --repeat 3 --out bench.json
+    python -m benchmarks.suite --out new.json --baseline bench.json --tolerance 0.25
+
+Cases that cannot run here (e.g. no spaCy model installed) are recorded with
+an "error" and skipped by the comparison.
+"""
+
+import argparse
+import base64
+import itertools
+import json
+import os
+import platform
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import zlib
+from datetime import datetime, timezone
+
+import numpy as np
+
+# Everything the suite writes goes to a scratch directory, and vector writes
+# go to the local store. Set before src.config is imported.
+_WORK_DIR = tempfile.mkdtemp(prefix="study-planner-bench-")
+os.environ["VECTOR_STORE_BACKEND"] = "local"
+os.environ["LOCAL_VECTOR_STORE_DIR"] = os.path.join(_WORK_DIR, "vectors")
+os.environ["ANALYSIS_CACHE_DIR"] = os.path.join(_WORK_DIR, "analysis")
+os.environ["UPLOAD_SPOOL_DIR"] = os.path.join(_WORK_DIR, "spool")
+os.environ["EMBEDDING_CACHE_ENABLED"] = "0"
+
+from benchmarks.syllabus_pdf import build_syllabus_pdf  # noqa: E402
+
+# Generated PDFs are kept between runs; a 1000-page one takes a while to build
+PDF_CACHE_DIR = os.path.join(".cache", "benchmarks")
+
+
+# ----------------------------------------------------
+# Offline stand-ins
+# ----------------------------------------------------
+
+class HashingEncoder:
+    """
+    SentenceTransformer-shaped encoder: signed feature hashing of the words,
+    L2-normalized. Deterministic and fast, so timings measure our code.
+    """
+
+    def __init__(self, dim: int = 768):
+        self.dim = dim
+
+    def get_sentence_embedding_dimension(self):
+        return self.dim
+
+    def encode(self, texts, batch_size=32, convert_to_numpy=True, show_progress_bar=False, **kwargs):
+        matrix = np.zeros((len(texts), self.dim), dtype=np.float32)
+        for row, text in enumerate(texts):
+            for word in text.lower().split():
+                h = zlib.crc32(word.encode("utf-8"))
+                matrix[row, h % self.dim] += 1.0 if h & 1 << 31 else -1.0
+        norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+        return matrix / np.maximum(norms, 1e-12)
+
+
+def syllabus_pdf(pages: int, seed: int = 0) -> bytes:
+    """build_syllabus_pdf() through an on-disk cache."""
+    path = os.path.join(PDF_CACHE_DIR, f"syllabus-{pages}-{seed}.pdf")
+    if os.path.exists(path):
+        with open(path, "rb") as f:
+            return f.read()
+
+    data = build_syllabus_pdf(pages, seed)
+    os.makedirs(PDF_CACHE_DIR, exist_ok=True)
+    with open(path, "wb") as f:
+        f.write(data)
+    return data
+
+
+_copies = itertools.count()
+
+
+def unique_copy(pdf: bytes) -> bytes:
+    """
+    Same document with a trailing comment, so its content hash (and analysis
+    cache key) differs on every call and every timed request is a cold one.
+    """
+    return pdf + f"\n% benchmark copy {next(_copies)}\n".encode()
+
+
+# ----------------------------------------------------
+# Timing
+# ----------------------------------------------------
+
+def measure(fn, repeat: int):
+    """Calls fn(run) `repeat` times; returns timings and the last result."""
+    runs = []
+    result = None
+    for run in range(repeat):
+        started = time.perf_counter()
+        result = fn(run)
+        runs.append(time.perf_counter() - started)
+    return {
+        "median_s": round(statistics.median(runs), 6),
+        "min_s": round(min(runs), 6),
+        "runs": [round(r, 6) for r in runs],
+    }, result
+
+
+def run_case(results: dict, name: str, fn, repeat: int, info=None):
+    try:
+        record, result = measure(fn, repeat)
+        if info:
+            record["info"] = info(result)
+    except Exception as e:
+        record = {"error": f"{type(e).__name__}: {e}"}
+    results[name] = record
+    status = record.get("error") or f"{record['median_s']:.4f}s"
+    print(f"{name:>44}: {status}")
+
+
+# ----------------------------------------------------
+# Cases
+# ----------------------------------------------------
+
+def library_cases(results: dict, pages: int, repeat: int):
+    from src.preprocessing.text_chunker import chunk_text
+    from src.preprocessing.text_cleaner import TextCleaner
+    from src.schedule.generator import (
+        generate_dynamic_schedule,
+        generate_schedule_from_headings,
+        realign_schedule,
+    )
+    from src.schedule.utils import compute_topic_difficulty, extract_full_text, extract_pdf_headings
+
+    pdf = syllabus_pdf(pages)
+    headings = extract_pdf_headings(pdf)
+    full_text = extract_full_text(pdf)
+    tag = f"[{pages}]"
+
+    run_case(results, f"extract_pdf_headings{tag}", lambda run: extract_pdf_headings(pdf), repeat,
+             info=lambda r: {"headings": len(r)})
+    run_case(results, f"extract_full_text{tag}", lambda run: extract_full_text(pdf), repeat,
+             info=lambda r: {"chars": len(r)})
+    run_case(results, f"compute_topic_difficulty{tag}",
+             lambda run: compute_topic_difficulty(headings, full_text), repeat)
+    run_case(results, f"TextCleaner.clean{tag}", lambda run: TextCleaner().clean(full_text), repeat)
+    run_case(results, f"chunk_text{tag}", lambda run: chunk_text(full_text), repeat,
+             info=lambda r: {"chunks": len(r)})
+    run_case(results, f"generate_schedule_from_headings{tag}",
+             lambda run: generate_schedule_from_headings(headings, len(headings) * 2.0, {}, "2026-01-05"),
+             repeat, info=lambda r: {"sessions": len(r)})
+
+    timetable = generate_dynamic_schedule(
+        full_text, headings, "Mon-Fri 6-9pm, Weekends flexible", "2026-01-05", "3 hours/day", "bench"
+    )
+    first_task = next(iter(timetable.values()))[0]["id"]
+    run_case(results, f"realign_schedule{tag}",
+             lambda run: realign_schedule(timetable, first_task, "Mon-Fri 6-9pm", "3 hours/day", "bench"),
+             repeat, info=lambda r: {"days": len(r)})
+
+
+def endpoint_cases(results: dict, client, pages: int, repeat: int):
+    pdf = syllabus_pdf(pages)
+    tag = f"[{pages}]"
+
+    def ok(response):
+        if response.status_code >= 400:
+            raise RuntimeError(f"HTTP {response.status_code}: {response.text[:200]}")
+        return response.json()
+
+    run_case(
+        results, f"POST /schedule/upload-pdf/raw{tag}",
+        lambda run: ok(client.post(
+            "/schedule/upload-pdf/raw",
+            params={"total_hours": pages * 2, "start_date": "2026-01-05"},
+            content=unique_copy(pdf),
+            headers={"Content-Type": "application/pdf"},
+        )),
+        repeat, info=lambda r: {"sessions": len(r.get("schedule", []))},
+    )
+    run_case(
+        results, f"POST /schedule/generate{tag}",
+        lambda run: ok(client.post("/schedule/generate", json={
+            "userId": "bench",
+            "pdfContent": base64.b64encode(unique_copy(pdf)).decode(),
+            "availability": "Mon-Fri 6-9pm, Weekends flexible",
+            "startDate": "2026-01-05",
+            "studyTime": "3 hours/day",
+        })),
+        repeat, info=lambda r: {"days": len(r.get("timetable", {}))},
+    )
+    run_case(
+        results, f"POST /upload-pdf{tag}",
+        lambda run: ok(client.post(
+            "/upload-pdf",
+            files={"file": (f"bench-{run}.pdf", unique_copy(pdf), "application/pdf")},
+        )),
+        repeat, info=lambda r: {"headings_stored": r.get("headings_stored")},
+    )
+
+    from src.schedule.generator import generate_dynamic_schedule
+    from src.schedule.utils import extract_pdf_headings
+
+    timetable = generate_dynamic_schedule(
+        "", extract_pdf_headings(pdf), "Mon-Fri 6-9pm, Weekends flexible", "2026-01-05", "3 hours/day", "bench"
+    )
+    body = {
+        "userId": "bench",
+        "currentTimetable": timetable,
+        "missedTaskId": next(iter(timetable.values()))[0]["id"],
+        "availability": "Mon-Fri 6-9pm",
+        "studyTime": "3 hours/day",
+    }
+    run_case(results, f"POST /schedule/realign{tag}", lambda run: ok(client.post("/schedule/realign", json=body)),
+             repeat)
+    run_case(results, f"POST /schedule/realign?diff=true{tag}",
+             lambda run: ok(client.post("/schedule/realign", params={"diff": "true"}, json=body)), repeat)
+
+
+# ----------------------------------------------------
+# Run + compare
+# ----------------------------------------------------
+
+def _git_commit():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run_suite(sizes, repeat: int = 3, real_model: bool = False, endpoints: bool = True) -> dict:
+    from src import resources
+    import src.preprocessing.embedding_service  # noqa: F401  (registers the real model first)
+
+    if not real_model:
+        resources.register("embedding_model", HashingEncoder)
+
+    import fitz
+    results = {}
+    started = time.perf_counter()
+
+    for pages in sizes:
+        library_cases(results, pages, repeat)
+
+    if endpoints:
+        from fastapi.testclient import TestClient
+        from src.main import app
+
+        with TestClient(app) as client:
+            for pages in sizes:
+                endpoint_cases(results, client, pages, repeat)
+
+    return {
+        "meta": {
+            "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "git_commit": _git_commit(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "numpy": np.__version__,
+            "pymupdf": fitz.VersionBind,
+            "embedding_model": "real" if real_model else "hashing",
+            "sizes": list(sizes),
+            "repeat": repeat,
+            "total_s": round(time.perf_counter() - started, 3),
+        },
+        "results": results,
+    }
+
+
+def compare(current: dict, baseline: dict, tolerance: float = 0.25, min_delta_s: float = 0.005):
+    """
+    Cases whose median got slower than the baseline by more than `tolerance`
+    (relative) and `min_delta_s` (absolute, to ignore timer noise on tiny
+    cases). Returns (rows, regressions).
+    """
+    rows = []
+    regressions = []
+    for name, record in current["results"].items():
+        before = baseline.get("results", {}).get(name)
+        if not before or "median_s" not in before or "median_s" not in record:
+            continue
+        old, new = before["median_s"], record["median_s"]
+        ratio = new / old if old else float("inf")
+        regressed = ratio > 1 + tolerance and new - old > min_delta_s
+        rows.append((name, old, new, ratio, regressed))
+        if regressed:
+            regressions.append(name)
+    return rows, regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--pages", type=int, nargs="+", default=[10, 100, 1000])
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--out", default="benchmark-results.json")
+    parser.add_argument("--baseline", help="earlier results JSON to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="allowed slowdown, 0.25 = 25%%")
+    parser.add_argument("--real-model", action="store_true", help="use the configured embedding model")
+    parser.add_argument("--no-endpoints", action="store_true", help="skip the FastAPI endpoint cases")
+    args = parser.parse_args(argv)
+
+    try:
+        report = run_suite(args.pages, args.repeat, args.real_model, not args.no_endpoints)
+    finally:
+        shutil.rmtree(_WORK_DIR, ignore_errors=True)
+
+    with open(args.out, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"✅ Results written to {args.out}")
+
+    if not args.baseline:
+        return 0
+
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+    rows, regressions = compare(report, baseline, args.tolerance)
+    for name, old, new, ratio, regressed in rows:
+        flag = "⚠️ " if regressed else "  "
+        print(f"{flag}{name:>44}: {old:.4f}s -> {new:.4f}s ({ratio:.2f}x)")
+    if regressions:
+        print(f"⚠️ {len(regressions)} regression(s) over {args.tolerance:.0%}")
+        return 1
+    print("✅ No regressions")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
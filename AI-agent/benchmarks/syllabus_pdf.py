@@ -0,0 +1,113 @@
+"""
+Deterministic synthetic syllabus PDFs for benchmarks.
+
+Builds a course document with PyMuPDF that exercises the same paths as real
+uploads: a running header and "Page n of N" footer on every page, large bold
+unit headings, subsection headings (some wrapped over two lines), bullet
+lists and body paragraphs full of technical vocabulary. The same
+(pages, seed) always gives byte-identical output:
+
+    python -m benchmarks.syllabus_pdf 100 out.pdf [seed]
+"""
+
+import random
+import sys
+
+import fitz  # PyMuPDF
+
+WIDTH, HEIGHT = 595, 842  # A4 points
+MARGIN = 56
+
+SUBJECTS = [
+    "Linear Algebra", "Probability Theory", "Graph Algorithms", "Operating Systems",
+    "Compiler Design", "Computer Networks", "Database Systems", "Machine Learning",
+    "Numerical Methods", "Discrete Mathematics", "Signal Processing", "Cryptography",
+]
+TERMS = [
+    "eigenvalue decomposition", "gradient descent", "dynamic programming", "hash table",
+    "binary search tree", "context-free grammar", "virtual memory", "page replacement",
+    "convolutional network", "bayesian inference", "markov chain", "fourier transform",
+    "public key encryption", "transaction isolation", "b-tree index", "shortest path",
+    "minimum spanning tree", "register allocation", "lexical analysis", "congestion control",
+    "singular value decomposition", "maximum likelihood", "regularization", "backpropagation",
+]
+WORDS = [
+    "the", "a", "of", "and", "to", "in", "is", "for", "with", "on", "this", "we", "students",
+    "analysis", "method", "problem", "example", "definition", "property", "result", "study",
+    "apply", "compute", "prove", "derive", "model", "system", "structure", "complexity",
+]
+
+
+def _sentence(rng: random.Random) -> str:
+    words = [rng.choice(WORDS) for _ in range(rng.randint(6, 14))]
+    for _ in range(rng.randint(0, 2)):
+        words.insert(rng.randrange(len(words) + 1), rng.choice(TERMS))
+    return " ".join(words).capitalize() + "."
+
+
+def _paragraph(rng: random.Random) -> str:
+    return " ".join(_sentence(rng) for _ in range(rng.randint(2, 5)))
+
+
+def build_syllabus_pdf(pages: int, seed: int = 0) -> bytes:
+    """A `pages`-page syllabus PDF as bytes; identical for the same arguments."""
+    rng = random.Random(seed * 1_000_003 + pages)
+    subject = rng.choice(SUBJECTS)
+
+    doc = fitz.open()
+    unit = 0
+    section = 0
+
+    for number in range(1, pages + 1):
+        page = doc.new_page(width=WIDTH, height=HEIGHT)
+
+        # Running header and footer (repeat on every page)
+        page.insert_text((MARGIN, 32), f"{subject} - Course Syllabus", fontsize=13, fontname="hebo")
+        page.insert_text((MARGIN, HEIGHT - 24), f"Page {number} of {pages}", fontsize=13)
+
+        y = 80
+        while y < HEIGHT - 120:
+            roll = rng.random()
+            if roll < 0.12 or y == 80 and number % 4 == 1:
+                unit += 1
+                section = 0
+                title = f"Unit {unit}: {rng.choice(TERMS).title()}"
+                page.insert_text((MARGIN, y + 18), title, fontsize=18, fontname="hebo")
+                y += 34
+            elif roll < 0.35:
+                section += 1
+                title = f"{unit}.{section} {rng.choice(TERMS).title()} and {rng.choice(TERMS).title()}"
+                if rng.random() < 0.3:
+                    # Long heading wrapped over two lines
+                    words = (title + " " + " ".join(rng.choice(TERMS).title() for _ in range(2))).split()
+                    cut = len(words) // 2
+                    page.insert_text((MARGIN, y + 14), " ".join(words[:cut]), fontsize=14, fontname="hebo")
+                    page.insert_text((MARGIN, y + 31), " ".join(words[cut:]), fontsize=14, fontname="hebo")
+                    y += 40
+                else:
+                    page.insert_text((MARGIN, y + 14), title, fontsize=14, fontname="hebo")
+                    y += 24
+            elif roll < 0.5:
+                items = [f"- {rng.choice(TERMS)}: {_sentence(rng)}" for _ in range(rng.randint(2, 4))]
+                rect = fitz.Rect(MARGIN + 12, y, WIDTH - MARGIN, y + 14 * len(items) * 2)
+                page.insert_textbox(rect, "\n".join(items), fontsize=10)
+                y += 14 * len(items) * 2 + 6
+            else:
+                text = _paragraph(rng)
+                height = 13 * (len(text) // 90 + 2)
+                page.insert_textbox(fitz.Rect(MARGIN, y, WIDTH - MARGIN, y + height), text, fontsize=10)
+                y += height + 6
+
+    doc.set_metadata({"title": f"{subject} Syllabus", "producer": "benchmarks", "creationDate": "", "modDate": ""})
+    data = doc.tobytes(garbage=1, deflate=True, no_new_id=True)
+    doc.close()
+    return data
+
+
+if __name__ == "__main__":
+    n_pages = int(sys.argv[1]) if len(sys.argv) > 1 else 10
+    out = sys.argv[2] if len(sys.argv) > 2 else f"syllabus-{n_pages}.pdf"
+    seed = int(sys.argv[3]) if len(sys.argv) > 3 else 0
+    with open(out, "wb") as f:
+        f.write(build_syllabus_pdf(n_pages, seed))
+    print(f"✅ Wrote {out}")
@@ -12,3 +12,118 @@ PINECONE_INDEX = os.getenv("PINECONE_INDEX_NAME")  # example: "study-planner-ind
 
 # Default namespace for embeddings
 PINECONE_NAMESPACE = "pdf-headings"
+
+# Page-sharded PDF extraction: documents with at least this many pages are
+# split into page ranges and processed on a shared process pool.
+PDF_PARALLEL_MIN_PAGES = int(os.getenv("PDF_PARALLEL_MIN_PAGES", "100"))
+PDF_PARALLEL_WORKERS = int(os.getenv("PDF_PARALLEL_WORKERS", str(os.cpu_count() or 1)))
+# How the pool starts its workers. Not "fork": the API process already runs
+# model/client threads, and forking a multithreaded process can deadlock.
+PDF_PARALLEL_START_METHOD = os.getenv("PDF_PARALLEL_START_METHOD", "forkserver")
+
+# Content-addressed cache for PDF analysis results (headings, text, terms, scores)
+ANALYSIS_CACHE_DIR = os.getenv("ANALYSIS_CACHE_DIR", ".cache/analysis")
+ANALYSIS_CACHE_MEMORY_ITEMS = int(os.getenv("ANALYSIS_CACHE_MEMORY_ITEMS", "64"))
+ANALYSIS_CACHE_MAX_BYTES = int(os.getenv("ANALYSIS_CACHE_MAX_BYTES", str(512 * 1024 * 1024)))
+
+# Sentence-transformer model used by EmbeddingService
+EMBEDDING_MODEL_NAME = os.getenv("EMBEDDING_MODEL_NAME", "sentence-transformers/all-mpnet-base-v2")
+
+# Comma-separated resource names to build in the background at startup,
+# e.g. "spacy_nlp,embedding_model". Empty = load everything on first use.
+WARMUP_RESOURCES = [r.strip() for r in os.getenv("WARMUP_RESOURCES", "").split(",") if r.strip()]
+
+# Texts per forward pass when encoding lists of strings
+EMBEDDING_BATCH_SIZE = int(os.getenv("EMBEDDING_BATCH_SIZE", "64"))
+
+# Cross-request embedding micro-batching: concurrent jobs are merged into one
+# encode call once this many texts are queued or the oldest job waited this long
+EMBED_BATCHER_MAX_TEXTS = int(os.getenv("EMBED_BATCHER_MAX_TEXTS", "256"))
+EMBED_BATCHER_MAX_WAIT_MS = float(os.getenv("EMBED_BATCHER_MAX_WAIT_MS", "10"))
+
+# Persistent embedding cache shared by all worker processes
+EMBEDDING_CACHE_ENABLED = os.getenv("EMBEDDING_CACHE_ENABLED", "1") == "1"
+EMBEDDING_CACHE_DIR = os.getenv("EMBEDDING_CACHE_DIR", ".cache/embeddings")
+EMBEDDING_CACHE_CAPACITY = int(os.getenv("EMBEDDING_CACHE_CAPACITY", "100000"))  # vectors per model
+EMBEDDING_CACHE_DTYPE = os.getenv("EMBEDDING_CACHE_DTYPE", "float16")  # or float32
+
+# Vector store backend: "pinecone" (default) or "local" (in-process, offline)
+VECTOR_STORE_BACKEND = os.getenv("VECTOR_STORE_BACKEND", "pinecone").lower()
+LOCAL_VECTOR_STORE_DIR = os.getenv("LOCAL_VECTOR_STORE_DIR", ".cache/vectors")
+# Namespaces with at least this many vectors are searched through an IVF index
+LOCAL_VECTOR_STORE_ANN_THRESHOLD = int(os.getenv("LOCAL_VECTOR_STORE_ANN_THRESHOLD", "20000"))
+LOCAL_VECTOR_STORE_NPROBE = int(os.getenv("LOCAL_VECTOR_STORE_NPROBE", "8"))
+
+# Bulk vector upserts: vectors per request, request payload cap (Pinecone
+# allows 2 MB), concurrent requests in flight and retries per batch
+VECTOR_UPSERT_BATCH_SIZE = int(os.getenv("VECTOR_UPSERT_BATCH_SIZE", "100"))
+VECTOR_UPSERT_MAX_BYTES = int(os.getenv("VECTOR_UPSERT_MAX_BYTES", str(2 * 1024 * 1024)))
+VECTOR_UPSERT_MAX_IN_FLIGHT = int(os.getenv("VECTOR_UPSERT_MAX_IN_FLIGHT", "4"))
+VECTOR_UPSERT_MAX_RETRIES = int(os.getenv("VECTOR_UPSERT_MAX_RETRIES", "3"))
+# Ids per bulk delete request (Pinecone accepts up to 1000)
+VECTOR_DELETE_BATCH_SIZE = int(os.getenv("VECTOR_DELETE_BATCH_SIZE", "1000"))
+
+# Technical-term extraction: text is fed to spaCy in pieces of at most
+# SPACY_MAX_CHARS characters, SPACY_BATCH_SIZE pieces per nlp.pipe batch,
+# optionally across SPACY_N_PROCESS processes
+SPACY_MAX_CHARS = int(os.getenv("SPACY_MAX_CHARS", "20000"))
+SPACY_BATCH_SIZE = int(os.getenv("SPACY_BATCH_SIZE", "16"))
+SPACY_N_PROCESS = int(os.getenv("SPACY_N_PROCESS", "1"))
+
+# CPU-bound request processing (PDF parsing, NLP, scheduling) runs on a bounded
+# executor: at most PROCESSING_MAX_CONCURRENCY jobs at once, PROCESSING_MAX_QUEUE
+# waiting (429 beyond that), each waiting up to PROCESSING_QUEUE_TIMEOUT seconds (503)
+PROCESSING_MAX_CONCURRENCY = int(os.getenv("PROCESSING_MAX_CONCURRENCY", str(os.cpu_count() or 1)))
+PROCESSING_MAX_QUEUE = int(os.getenv("PROCESSING_MAX_QUEUE", "32"))
+PROCESSING_QUEUE_TIMEOUT = float(os.getenv("PROCESSING_QUEUE_TIMEOUT", "30"))
+PROCESSING_EXECUTOR = os.getenv("PROCESSING_EXECUTOR", "thread").lower()  # or "process"
+
+# Background jobs (?job=true on the PDF upload routes): worker threads, jobs
+# allowed to wait for a worker (429 beyond that) and how long finished job
+# results stay retrievable, in seconds
+JOB_WORKERS = int(os.getenv("JOB_WORKERS", "2"))
+JOB_MAX_PENDING = int(os.getenv("JOB_MAX_PENDING", "64"))
+JOB_RESULT_TTL = float(os.getenv("JOB_RESULT_TTL", "3600"))
+
+# Uploads are spooled to UPLOAD_SPOOL_DIR in UPLOAD_CHUNK_BYTES pieces and
+# rejected with 413 once they exceed MAX_UPLOAD_BYTES
+MAX_UPLOAD_BYTES = int(os.getenv("MAX_UPLOAD_BYTES", str(100 * 1024 * 1024)))
+UPLOAD_CHUNK_BYTES = int(os.getenv("UPLOAD_CHUNK_BYTES", str(1024 * 1024)))
+UPLOAD_SPOOL_DIR = os.getenv("UPLOAD_SPOOL_DIR", "temp")
+
+# Token-aware chunking for document indexing: chunk size in embedding-model
+# tokens (0 = the model's max sequence length) and tokens shared between
+# consecutive chunks
+CHUNK_MAX_TOKENS = int(os.getenv("CHUNK_MAX_TOKENS", "0"))
+CHUNK_OVERLAP_TOKENS = int(os.getenv("CHUNK_OVERLAP_TOKENS", "32"))
+
+# Study hours per day when a plan request gives neither daily hours nor an
+# exam date to spread the total over
+DEFAULT_DAILY_HOURS = float(os.getenv("DEFAULT_DAILY_HOURS", "3"))
+
+# Bounds on a requested plan: the smallest daily_hours accepted, and the most
+# days a plan may span (a tiny capacity would otherwise mean millions of
+# sessions from one request)
+MIN_DAILY_HOURS = float(os.getenv("MIN_DAILY_HOURS", "0.25"))
+MAX_SCHEDULE_DAYS = int(os.getenv("MAX_SCHEDULE_DAYS", "3660"))
+
+# Hours planned per topic by /schedule/generate, which has no total to share
+# out (the same two hours /upload-pdf gives each heading)
+DYNAMIC_TOPIC_HOURS = float(os.getenv("DYNAMIC_TOPIC_HOURS", "2"))
+
+# StudyPlanner: cosine similarity at which topics are grouped into the same
+# study cluster
+TOPIC_CLUSTER_THRESHOLD = float(os.getenv("TOPIC_CLUSTER_THRESHOLD", "0.5"))
+
+# Heading consolidation: share of pages a heading must repeat on to count as
+# a running header/footer, and the character 3-gram Jaccard similarity at
+# which two headings are near-duplicates
+HEADING_REPEAT_RATIO = float(os.getenv("HEADING_REPEAT_RATIO", "0.5"))
+HEADING_DUP_THRESHOLD = float(os.getenv("HEADING_DUP_THRESHOLD", "0.8"))
+
+# Add a Server-Timing header (per-stage durations) to every response; the
+# same timings always feed the /metrics histograms
+SERVER_TIMING_ENABLED = os.getenv("SERVER_TIMING_ENABLED", "0") == "1"
+
+# /schedule/generate-batch: most requests accepted in one batch
+SCHEDULE_BATCH_MAX_ITEMS = int(os.getenv("SCHEDULE_BATCH_MAX_ITEMS", "500"))
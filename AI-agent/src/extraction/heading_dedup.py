@@ -0,0 +1,251 @@
+"""
+Order-preserving heading consolidation.
+
+Turns the raw heading spans of a document (in reading order, per page) into
+the list of distinct headings to embed and schedule:
+
+1. Line-wrapped fragments are merged: consecutive heading spans on a page,
+   with the same font size, on the same line or on the next line down. A
+   next-line span that opens a heading of its own (a section number such as
+   "1.2", "Unit/Chapter N", a bullet) is kept separate.
+2. Running headers/footers are dropped: text inside the top and bottom page
+   margins that repeats there on at least HEADING_REPEAT_RATIO of the pages,
+   verbatim or up to its numbers ("Chapter 3 | Page 12"). A heading that
+   repeats in the body of every page ("Summary") is kept, and step 3 keeps
+   its first occurrence.
+3. Duplicates are removed, keeping the first occurrence: exact ones after
+   normalization ("Chapter 3" vs "CHAPTER 3"), then near ones found with
+   MinHash signatures of character 3-grams and LSH banding, confirmed by
+   Jaccard similarity >= HEADING_DUP_THRESHOLD (and the same numbers).
+
+Steps 1 and 2 are linear passes. Step 3 compares every pair of headings
+that share an LSH bucket (buckets also key on the headings' numbers), so it
+stays near-linear unless many headings are alike.
+"""
+
+import re
+import unicodedata
+import zlib
+from typing import Dict, List, NamedTuple, Sequence, Tuple
+
+import numpy as np
+
+from src.config import HEADING_DUP_THRESHOLD, HEADING_REPEAT_RATIO
+
+# Running headers need at least this many pages to be told apart from content
+_MIN_PAGES_FOR_RUNNING = 3
+# Top/bottom fraction of the page treated as header/footer margin
+_MARGIN = 0.1
+# A merged heading stops growing past this length (bold body text is not a heading)
+_MAX_HEADING_CHARS = 160
+
+_NUM_PERM = 64
+_BANDS = 16  # 16 bands x 4 rows: pairs above ~0.5 Jaccard usually share a bucket
+_MERSENNE_61 = np.uint64((1 << 61) - 1)
+_rng = np.random.default_rng(20240601)
+_PERM_A = _rng.integers(1, 1 << 31, size=_NUM_PERM, dtype=np.uint64)
+_PERM_B = _rng.integers(0, 1 << 31, size=_NUM_PERM, dtype=np.uint64)
+
+_SPACES = re.compile(r"\s+")
+_EDGE_PUNCT = re.compile(r"^[\W_]+|[\W_]+$")
+_DIGITS = re.compile(r"\d+")
+# Text that begins a heading rather than continuing the line above it
+_HEADING_START = re.compile(
+    r"\d+(?:\.\d+)*\.?(?:\s|$)"
+    r"|(?i:unit|chapter|part|section|module|lecture|lesson|week)\s+(?:\d+|[IVXLC]+)\b"
+    r"|[•\-–*●▪→·]"
+)
+
+
+class HeadingSpan(NamedTuple):
+    text: str
+    x0: float
+    x1: float
+    y0: float
+    y1: float
+    size: float
+
+
+def heading_span(span, text: str) -> HeadingSpan:
+    """HeadingSpan from a PyMuPDF text-dict span and its stripped text."""
+    x0, y0, x1, y1 = span["bbox"]
+    return HeadingSpan(text, x0, x1, y0, y1, span["size"])
+
+
+def normalize_heading(text: str) -> str:
+    """Comparison key: NFKC, casefolded, single spaces, no edge punctuation."""
+    text = unicodedata.normalize("NFKC", text).casefold()
+    return _EDGE_PUNCT.sub("", _SPACES.sub(" ", text).strip())
+
+
+# ------------------------------------------------
+# 🔹 Running headers / footers
+# ------------------------------------------------
+def _in_margin(span: HeadingSpan, height: float) -> bool:
+    return height > 0 and (span.y1 <= height * _MARGIN or span.y0 >= height * (1 - _MARGIN))
+
+
+def drop_running_headers(pages: Sequence[Tuple[float, List[HeadingSpan]]]) -> List[List[HeadingSpan]]:
+    """
+    :param pages: (page_height, spans) per page, in page order
+    :return: spans per page without the running headers/footers (repeated
+             margin text; the same text in the page body is kept)
+    """
+    if len(pages) < _MIN_PAGES_FOR_RUNNING:
+        return [list(spans) for _, spans in pages]
+
+    exact_pages: Dict[str, set] = {}
+    masked_pages: Dict[str, set] = {}
+    for number, (height, spans) in enumerate(pages):
+        for span in spans:
+            if not _in_margin(span, height):
+                continue
+            key = normalize_heading(span.text)
+            exact_pages.setdefault(key, set()).add(number)
+            masked_pages.setdefault(_DIGITS.sub("#", key), set()).add(number)
+
+    needed = max(_MIN_PAGES_FOR_RUNNING, HEADING_REPEAT_RATIO * len(pages))
+    running = {key for key, seen in exact_pages.items() if len(seen) >= needed}
+    running_masked = {key for key, seen in masked_pages.items() if len(seen) >= needed}
+
+    kept = []
+    for height, spans in pages:
+        page = []
+        for span in spans:
+            if _in_margin(span, height):
+                key = normalize_heading(span.text)
+                if key in running or _DIGITS.sub("#", key) in running_masked:
+                    continue
+            page.append(span)
+        kept.append(page)
+    return kept
+
+
+# ------------------------------------------------
+# 🔹 Line-wrapped fragments
+# ------------------------------------------------
+def merge_fragments(spans: Sequence[HeadingSpan]) -> List[HeadingSpan]:
+    """
+    Joins consecutive heading spans of one page that continue each other:
+    same font size (within 1pt) and either on the same line or starting
+    within half a line below the previous one. Stacked headings ("1.1 ...",
+    then "1.2 ..." on the next line) are not continuations.
+    """
+    merged = []
+    current = None
+
+    for span in spans:
+        if current is not None and len(current.text) < _MAX_HEADING_CHARS and abs(span.size - current.size) <= 1:
+            same_line = abs(span.y0 - current.y0) < current.size * 0.5 and span.x0 >= current.x1 - 1
+            # Line boxes of consecutive lines can overlap by a few points
+            next_line = (
+                span.y0 - current.y0 >= current.size * 0.5
+                and span.y0 - current.y1 <= current.size * 0.5
+                and not _HEADING_START.match(span.text)
+            )
+            if same_line or (next_line and not current.text.endswith((".", "?", "!"))):
+                if same_line and span.x0 - current.x1 < current.size * 0.15:
+                    joined = current.text + span.text  # one word split over two spans
+                elif current.text.endswith("-") and next_line:
+                    joined = current.text[:-1] + span.text  # hyphenated line break
+                else:
+                    joined = f"{current.text} {span.text}"
+                current = HeadingSpan(joined, current.x0, span.x1, current.y0, span.y1, current.size)
+                continue
+
+        if current is not None:
+            merged.append(current)
+        current = span
+
+    if current is not None:
+        merged.append(current)
+    return merged
+
+
+# ------------------------------------------------
+# 🔹 Duplicates (exact, then MinHash/LSH)
+# ------------------------------------------------
+def _shingles(key: str) -> frozenset:
+    if len(key) < 3:
+        return frozenset((key,))
+    return frozenset(key[i:i + 3] for i in range(len(key) - 2))
+
+
+def _shingle_hashes(grams: frozenset) -> np.ndarray:
+    return np.fromiter((zlib.crc32(g.encode("utf-8")) for g in grams), dtype=np.uint64, count=len(grams))
+
+
+def minhash_signatures(shingles: Sequence[np.ndarray]) -> np.ndarray:
+    """(n, _NUM_PERM) MinHash signatures, hashed with (a*x + b) mod 2^61-1."""
+    signatures = np.empty((len(shingles), _NUM_PERM), dtype=np.uint64)
+    block = 512
+    for start in range(0, len(shingles), block):
+        part = shingles[start:start + block]
+        flat = np.concatenate(part)
+        offsets = np.cumsum([0] + [len(s) for s in part[:-1]])
+        hashed = (flat[:, None] * _PERM_A + _PERM_B) % _MERSENNE_61
+        signatures[start:start + len(part)] = np.minimum.reduceat(hashed, offsets, axis=0)
+    return signatures
+
+
+def _jaccard(a: frozenset, b: frozenset) -> float:
+    return len(a & b) / len(a | b)
+
+
+def dedupe_headings(headings: Sequence[str], threshold: float = HEADING_DUP_THRESHOLD) -> List[str]:
+    """First occurrence of every group of exact or near-duplicate headings, in order."""
+    firsts = {}
+    for heading in headings:
+        key = normalize_heading(heading)
+        if key and key not in firsts:
+            firsts[key] = heading
+    if len(firsts) < 2:
+        return list(firsts.values())
+
+    keys = list(firsts)
+    shingles = [_shingles(key) for key in keys]
+    # Headings that differ in their numbers ("Chapter 1" / "Chapter 10") are
+    # never near-duplicates
+    numbers = [_DIGITS.findall(key) for key in keys]
+    signatures = minhash_signatures([_shingle_hashes(g) for g in shingles])
+    # One uint64 bucket key per (heading, band): the band's rows mixed together,
+    # and the heading's numbers, so only headings with the same numbers share one
+    number_keys = np.array([zlib.crc32(" ".join(n).encode("utf-8")) for n in numbers], dtype=np.uint64)
+    bands = (signatures.reshape(len(keys), _BANDS, -1) * _PERM_A[: _NUM_PERM // _BANDS]).sum(axis=2)
+    bands ^= number_keys[:, None] * _PERM_A[-1]
+
+    # Union-find; the root of a group is always its earliest heading
+    parent = list(range(len(keys)))
+
+    def find(i):
+        while parent[i] != i:
+            parent[i] = parent[parent[i]]
+            i = parent[i]
+        return i
+
+    # Every pair that shares a bucket in some band is a candidate (not just
+    # pairs with the bucket's first member); pairs already in one group are skipped
+    checked = set()
+    for band in bands.T.tolist():
+        buckets = {}
+        for i, bucket in enumerate(band):
+            members = buckets.setdefault(bucket, [])
+            for j in members:
+                a, b = find(j), find(i)
+                if a == b or (j, i) in checked:
+                    continue
+                checked.add((j, i))
+                if numbers[j] == numbers[i] and _jaccard(shingles[j], shingles[i]) >= threshold:
+                    parent[max(a, b)] = min(a, b)
+            members.append(i)
+
+    return [firsts[key] for i, key in enumerate(keys) if find(i) == i]
+
+
+def consolidate_headings(pages: Sequence[Tuple[float, List[HeadingSpan]]]) -> List[str]:
+    """
+    :param pages: (page_height, heading spans in reading order) per page
+    :return: distinct headings in document order
+    """
+    merged = [(height, merge_fragments(spans)) for height, spans in pages]
+    return dedupe_headings([span.text for spans in drop_running_headers(merged) for span in spans])
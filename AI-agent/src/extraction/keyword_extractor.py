@@ -0,0 +1,63 @@
+"""
+Streaming noun-phrase extraction for technical-term scoring.
+
+Only the spaCy components noun chunks depend on are loaded (tok2vec, tagger,
+attribute_ruler for POS, parser for dependencies); NER and the lemmatizer are
+excluded. Text is cut into line-aligned pieces below spaCy's max_length and
+streamed through nlp.pipe, so memory stays flat on book-length input.
+"""
+
+import io
+
+from src import resources
+from src.config import SPACY_BATCH_SIZE, SPACY_MAX_CHARS, SPACY_N_PROCESS
+
+# Components noun_chunks does not need
+EXCLUDED_COMPONENTS = ["ner", "lemmatizer"]
+
+
+def _load_nlp():
+    import spacy
+    return spacy.load("en_core_web_sm", exclude=EXCLUDED_COMPONENTS)
+
+
+resources.register("spacy_nlp", _load_nlp)
+
+
+def iter_text_pieces(text: str, max_chars: int = SPACY_MAX_CHARS):
+    """
+    Yields consecutive pieces of `text` of at most `max_chars` characters,
+    cut at line breaks (or at spaces for a single overlong line).
+    """
+    piece = []
+    size = 0
+
+    for line in io.StringIO(text):
+        while len(line) > max_chars:
+            cut = line.rfind(" ", 0, max_chars)
+            cut = cut if cut > 0 else max_chars
+            head, line = line[:cut], line[cut:]
+            if piece:
+                yield "".join(piece)
+                piece, size = [], 0
+            yield head
+
+        if size + len(line) > max_chars and piece:
+            yield "".join(piece)
+            piece, size = [], 0
+
+        piece.append(line)
+        size += len(line)
+
+    if piece:
+        yield "".join(piece)
+
+
+def iter_noun_phrases(text: str, batch_size: int = SPACY_BATCH_SIZE, n_process: int = SPACY_N_PROCESS):
+    """
+    Yields every noun chunk in `text`, lowercased, in document order.
+    """
+    nlp = resources.get("spacy_nlp")
+    for doc in nlp.pipe(iter_text_pieces(text), batch_size=batch_size, n_process=n_process):
+        for chunk in doc.noun_chunks:
+            yield chunk.text.lower()
@@ -0,0 +1,91 @@
+"""
+Per-text counts over many short texts (headings), computed on all of them
+at once.
+
+- count_terms: the texts are joined into one corpus and each term is looked
+  up with `str.find`, which scans in C. After a hit the search jumps to the
+  start of the next text, so a term costs one corpus scan plus one lookup
+  per text that contains it. Same counts as a per-text
+  `sum(1 for t in terms if t in text)` loop, without its terms x texts
+  Python iterations.
+- word_stats: word characters and words (`\\w+` runs) per text, from a
+  NumPy mask over the corpus' code points.
+"""
+
+import re
+from bisect import bisect_right
+from collections import Counter
+from typing import List, Sequence, Tuple
+
+import numpy as np
+
+_SEP = "\x00"
+_WORD_CHAR = re.compile(r"\w")
+_ASCII_WORD = np.array([bool(_WORD_CHAR.match(chr(c))) for c in range(128)])
+
+
+def count_terms(texts: Sequence[str], terms: Sequence[str]) -> List[int]:
+    """
+    How many of `terms` occur in each text, each term at most once per
+    text. A term repeated in `terms` counts as many times as it is listed.
+    """
+    weights = Counter(terms)
+    always = weights.pop("", 0)  # "" is a substring of everything
+    counts = [always] * len(texts)
+    if not texts or not weights:
+        return counts
+
+    corpus = _SEP.join(texts)
+    starts = []
+    offset = 0
+    for text in texts:
+        starts.append(offset)
+        offset += len(text) + 1
+    starts.append(len(corpus) + 1)  # end sentinel
+
+    for term, weight in weights.items():
+        if _SEP in term:
+            # Could match across two texts; test each one on its own
+            for i, text in enumerate(texts):
+                if term in text:
+                    counts[i] += weight
+            continue
+
+        pos = corpus.find(term)
+        while pos != -1:
+            i = bisect_right(starts, pos) - 1
+            counts[i] += weight
+            pos = corpus.find(term, starts[i + 1])
+
+    return counts
+
+
+def word_stats(texts: Sequence[str]) -> Tuple[List[int], List[int]]:
+    """
+    (word characters, words) per text: the same numbers as
+    `sum(map(len, re.findall(r"\\w+", text)))` and `len(re.findall(...))`.
+    """
+    if not texts:
+        return [], []
+
+    # Trailing separator: every text starts before the end of the corpus
+    corpus = _SEP.join(texts) + _SEP
+    codes = np.frombuffer(corpus.encode("utf-32-le", "surrogatepass"), dtype=np.uint32)
+
+    is_word = np.zeros(len(codes), dtype=bool)
+    ascii_chars = codes < 128
+    is_word[ascii_chars] = _ASCII_WORD[codes[ascii_chars]]
+    other = np.flatnonzero(~ascii_chars)
+    if other.size:
+        # Ask the regex engine itself about each distinct non-ASCII character
+        distinct, inverse = np.unique(codes[other], return_inverse=True)
+        is_word[other] = np.array([bool(_WORD_CHAR.match(chr(c))) for c in distinct.tolist()])[inverse]
+
+    run_starts = is_word.copy()
+    run_starts[1:] &= ~is_word[:-1]
+
+    starts = np.zeros(len(texts), dtype=np.int64)
+    np.cumsum([len(text) + 1 for text in texts[:-1]], out=starts[1:])
+    chars = np.add.reduceat(is_word.astype(np.int64), starts)
+    words = np.add.reduceat(run_starts.astype(np.int64), starts)
+    return chars.tolist(), words.tolist()
@@ -0,0 +1,251 @@
+"""
+Background jobs for long-running PDF pipelines.
+
+`job_manager.submit(kind, fn)` queues `fn(progress=...)` on a small worker pool
+and returns at once with a job id. While it runs, the pipeline reports stage
+progress through `progress(stage, **counts)` (pages parsed, headings found,
+vectors stored, ...). Clients poll the job snapshot or follow it as a
+server-sent-events stream. Finished jobs are dropped JOB_RESULT_TTL seconds
+after they complete.
+
+Jobs run on their own JOB_WORKERS threads, outside the processing stage's
+concurrency limit (src.processing); JOB_MAX_PENDING bounds the queue.
+"""
+
+import asyncio
+import json
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+from fastapi import HTTPException
+
+from src.config import JOB_MAX_PENDING, JOB_RESULT_TTL, JOB_WORKERS
+
+QUEUED = "queued"
+RUNNING = "running"
+SUCCEEDED = "succeeded"
+FAILED = "failed"
+
+FINISHED = (SUCCEEDED, FAILED)
+
+# Seconds between keep-alive comments on an idle event stream
+SSE_KEEPALIVE = 15.0
+
+
+class Job:
+
+    def __init__(self, kind: str):
+        self.id = uuid.uuid4().hex
+        self.kind = kind
+        self.status = QUEUED
+        self.stages = {}
+        self.result = None
+        self.error = None
+        self.created_at = time.time()
+        self.started_at = None
+        self.finished_at = None
+
+        # Bumped on every change; event streams send a snapshot per version
+        self.version = 0
+        self._lock = threading.Lock()
+        self._listeners = set()
+
+    # ----------- Updates (worker thread) ---------------
+    def report(self, stage: str, **counts):
+        with self._lock:
+            self.stages.setdefault(stage, {}).update(counts)
+            self._changed()
+
+    def _set(self, **fields):
+        with self._lock:
+            for name, value in fields.items():
+                setattr(self, name, value)
+            self._changed()
+
+    def _changed(self):
+        self.version += 1
+        for loop, event in list(self._listeners):
+            try:
+                loop.call_soon_threadsafe(event.set)
+            except RuntimeError:  # listener's loop already closed
+                self._listeners.discard((loop, event))
+
+    # ----------- Reads ---------------
+    def snapshot(self, include_result: bool = True) -> dict:
+        with self._lock:
+            data = {
+                "job_id": self.id,
+                "kind": self.kind,
+                "status": self.status,
+                "stages": {stage: dict(counts) for stage, counts in self.stages.items()},
+                "created_at": self.created_at,
+                "started_at": self.started_at,
+                "finished_at": self.finished_at,
+            }
+            if self.error is not None:
+                data["error"] = self.error
+            if include_result and self.status == SUCCEEDED:
+                data["result"] = self.result
+            return data
+
+    def listen(self):
+        """Registers an asyncio.Event (on the running loop) set on every change."""
+        listener = (asyncio.get_running_loop(), asyncio.Event())
+        with self._lock:
+            self._listeners.add(listener)
+        return listener
+
+    def unlisten(self, listener):
+        with self._lock:
+            self._listeners.discard(listener)
+
+
+def _error_for(exc: Exception) -> dict:
+    if isinstance(exc, HTTPException):
+        return {"status_code": exc.status_code, "detail": exc.detail}
+    # Imported here: the pipeline module pulls in the PDF/NLP stack
+    from src.pipeline.study_plan_pipeline import NoUsableContentError
+    from src.schedule.engine import ScheduleConstraintError
+    if isinstance(exc, (NoUsableContentError, ScheduleConstraintError)):
+        return {"status_code": 422, "detail": str(exc)}
+    return {"status_code": 500, "detail": f"Internal Server Error: {str(exc)}"}
+
+
+class JobManager:
+
+    def __init__(self, workers: int, max_pending: int, result_ttl: float):
+        self.workers = max(1, workers)
+        self.max_pending = max(0, max_pending)
+        self.result_ttl = result_ttl
+
+        self._jobs = {}
+        self._lock = threading.Lock()
+        self._executor = None
+
+        self.submitted = 0
+        self.rejected = 0
+        self.expired = 0
+
+    @property
+    def executor(self):
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="jobs")
+            return self._executor
+
+    def _purge_expired(self):
+        cutoff = time.time() - self.result_ttl
+        with self._lock:
+            expired = [
+                job_id for job_id, job in self._jobs.items()
+                if job.status in FINISHED and job.finished_at < cutoff
+            ]
+            for job_id in expired:
+                del self._jobs[job_id]
+            self.expired += len(expired)
+
+    def _queued(self) -> int:
+        return sum(1 for job in self._jobs.values() if job.status == QUEUED)
+
+    def submit(self, kind: str, fn) -> Job:
+        """
+        Queues fn(progress=job.report) and returns the Job right away.
+        Raises 429 when JOB_MAX_PENDING jobs are already waiting for a worker.
+        """
+        self._purge_expired()
+
+        job = Job(kind)
+        with self._lock:
+            if self._queued() >= self.max_pending:
+                self.rejected += 1
+                raise HTTPException(
+                    status_code=429,
+                    detail="Too many jobs are waiting. Please retry shortly.",
+                    headers={"Retry-After": "5"},
+                )
+            self._jobs[job.id] = job
+            self.submitted += 1
+
+        self.executor.submit(self._run, job, fn)
+        print(f"📌 Job {job.id} ({kind}) queued")
+        return job
+
+    def _run(self, job: Job, fn):
+        job._set(status=RUNNING, started_at=time.time())
+        try:
+            result = fn(progress=job.report)
+        except Exception as e:
+            print(f"⚠️ Job {job.id} ({job.kind}) failed: {str(e)}")
+            job._set(status=FAILED, error=_error_for(e), finished_at=time.time())
+        else:
+            job._set(status=SUCCEEDED, result=result, finished_at=time.time())
+            print(f"✅ Job {job.id} ({job.kind}) finished")
+
+    def get(self, job_id: str):
+        self._purge_expired()
+        return self._jobs.get(job_id)
+
+    async def events(self, job: Job):
+        """
+        Server-sent events for one job: a "progress" event with the job
+        snapshot whenever it changes, then a final "result" or "error" event.
+        """
+        listener = job.listen()
+        event = listener[1]
+        try:
+            sent = -1
+            while True:
+                event.clear()
+                if job.version != sent:
+                    sent = job.version
+                    snapshot = job.snapshot(include_result=False)
+
+                    if snapshot["status"] == SUCCEEDED:
+                        yield _sse("result", job.snapshot())
+                        return
+                    if snapshot["status"] == FAILED:
+                        yield _sse("error", snapshot)
+                        return
+                    yield _sse("progress", snapshot)
+
+                try:
+                    await asyncio.wait_for(event.wait(), timeout=SSE_KEEPALIVE)
+                except asyncio.TimeoutError:
+                    yield ": keep-alive\n\n"
+        finally:
+            job.unlisten(listener)
+
+    def stats(self) -> dict:
+        self._purge_expired()
+        with self._lock:
+            by_status = {}
+            for job in self._jobs.values():
+                by_status[job.status] = by_status.get(job.status, 0) + 1
+        return {
+            "workers": self.workers,
+            "max_pending": self.max_pending,
+            "result_ttl": self.result_ttl,
+            "jobs": by_status,
+            "submitted": self.submitted,
+            "rejected": self.rejected,
+            "expired": self.expired,
+        }
+
+    def shutdown(self):
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=False, cancel_futures=True)
+                self._executor = None
+
+
+def _sse(event: str, data: dict) -> str:
+    return f"event: {event}\ndata: {json.dumps(data, default=str)}\n\n"
+
+
+job_manager = JobManager(
+    workers=JOB_WORKERS,
+    max_pending=JOB_MAX_PENDING,
+    result_ttl=JOB_RESULT_TTL,
+)
@@ -0,0 +1,57 @@
+from fastapi import APIRouter, HTTPException
+from fastapi.responses import JSONResponse, StreamingResponse
+
+from .manager import job_manager
+
+router = APIRouter(prefix="/jobs", tags=["Jobs"])
+
+
+def accepted(job):
+    """
+    202 response for a freshly submitted job, with where to follow it.
+    """
+    return JSONResponse(
+        status_code=202,
+        content={
+            "success": True,
+            "job_id": job.id,
+            "status": job.status,
+            "status_url": f"/jobs/{job.id}",
+            "events_url": f"/jobs/{job.id}/events",
+        },
+    )
+
+
+@router.get("/stats")
+def job_stats():
+    """
+    Worker pool settings and job counts by status.
+    """
+    return job_manager.stats()
+
+
+@router.get("/{job_id}")
+def get_job(job_id: str):
+    """
+    Current status and per-stage progress; includes "result" once succeeded.
+    """
+    job = job_manager.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found or expired.")
+    return job.snapshot()
+
+
+@router.get("/{job_id}/events")
+async def job_events(job_id: str):
+    """
+    Server-sent events: "progress" on every change, then "result" or "error".
+    """
+    job = job_manager.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found or expired.")
+
+    return StreamingResponse(
+        job_manager.events(job),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
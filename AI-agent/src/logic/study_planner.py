@@ -1,6 +1,8 @@
 from datetime import datetime, timedelta
 from math import ceil
 from src.preprocessing.embedding_service import EmbeddingService
+from src import metrics
+from src.logic.topic_ranking import rank_matrix
 
 class StudyPlanner:
     def __init__(self):
@@ -8,23 +10,35 @@ class StudyPlanner:
 
     def generate_topic_embeddings(self, topics: list[str]):
         """Generate embeddings for each topic."""
-        embeddings = []
-        for t in topics:
-            vec = self.embedding_service.embed_text(t)
-            embeddings.append({"text": t, "vector": vec})
-        return embeddings
+        matrix = self.embedding_service.embed_batch(topics)
+        return [
+            {"text": t, "vector": matrix[i].tolist()}
+            for i, t in enumerate(topics)
+        ]
 
     def rank_topics(self, topics: list[str]):
-        """Rank topics by semantic complexity (using vector norm)."""
-        embedded = self.generate_topic_embeddings(topics)
-
-        # Norm as a simple difficulty proxy
-        for e in embedded:
-            e["difficulty"] = sum([x*x for x in e["vector"]]) ** 0.5
-
-        ranked = sorted(embedded, key=lambda x: x["difficulty"], reverse=True)
-        return ranked
-
+        """
+        Orders topics into study sequences: related topics are clustered by
+        embedding similarity and studied together, general topics first.
+        See src.logic.topic_ranking.
+        """
+        if not topics:
+            return []
+
+        matrix = self.embedding_service.embed_batch(topics)
+        with metrics.stage("topic_ranking"):
+            order, difficulty, clusters = rank_matrix(matrix)
+
+        return [
+            {
+                "text": topics[i],
+                "difficulty": float(difficulty[i]),
+                "cluster": int(clusters[i]),
+            }
+            for i in order
+        ]
+
+    @metrics.timed("scheduling")
     def create_schedule(self, topics: list[str], hours_per_day: int, exam_date: str):
         exam = datetime.strptime(exam_date, "%Y-%m-%d")
         today = datetime.now()
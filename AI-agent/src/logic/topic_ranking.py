@@ -0,0 +1,120 @@
+"""
+Vectorized topic ranking on the embedding matrix.
+
+Works on all topics at once: rows are L2-normalized, one matrix product gives
+the topic-to-topic cosine similarity matrix, and everything else (difficulty,
+clusters, study order) is read off that matrix with NumPy row operations.
+
+- difficulty: how distinct a topic is from the rest (1 - mean similarity).
+  Vector norms carry no signal here: sentence-transformer vectors are close
+  to unit length whatever the text.
+- clusters: leader clustering; each unassigned topic, in input order, takes
+  every unassigned topic at least `threshold` similar to it.
+- order: clusters are visited nearest-centroid first, starting from the most
+  central one; inside a cluster, the most central (most general) topic comes
+  first, then always the most similar topic not yet studied.
+"""
+
+from typing import List
+
+import numpy as np
+
+from src.config import TOPIC_CLUSTER_THRESHOLD
+
+
+def normalize_rows(matrix: np.ndarray) -> np.ndarray:
+    """float32 copy with unit-length rows (all-zero rows stay zero)."""
+    matrix = np.asarray(matrix, dtype=np.float32)
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    return matrix / np.maximum(norms, 1e-12)
+
+
+def similarity_matrix(matrix: np.ndarray) -> np.ndarray:
+    """Cosine similarity between every pair of rows, (n, n) float32."""
+    unit = normalize_rows(matrix)
+    return unit @ unit.T
+
+
+def mean_similarity(similarity: np.ndarray) -> np.ndarray:
+    """Each row's mean similarity to the other rows."""
+    n = similarity.shape[0]
+    if n < 2:
+        return np.ones(n, dtype=np.float32)
+    return (similarity.sum(axis=1) - np.diagonal(similarity)) / (n - 1)
+
+
+def difficulty_scores(similarity: np.ndarray) -> np.ndarray:
+    """Distinctiveness in [0, 2]: 1 - mean similarity to the other topics."""
+    return 1.0 - mean_similarity(similarity)
+
+
+def cluster_topics(similarity: np.ndarray, threshold: float = TOPIC_CLUSTER_THRESHOLD) -> np.ndarray:
+    """Cluster label per topic (0..k-1, numbered by first appearance)."""
+    n = similarity.shape[0]
+    labels = np.full(n, -1, dtype=np.int64)
+    cluster = 0
+    for leader in range(n):
+        if labels[leader] >= 0:
+            continue
+        joins = (labels < 0) & (similarity[leader] >= threshold)
+        joins[leader] = True
+        labels[joins] = cluster
+        cluster += 1
+    return labels
+
+
+def nearest_neighbour_order(similarity: np.ndarray, start: int) -> List[int]:
+    """Greedy path: from `start`, always step to the most similar unvisited row."""
+    n = similarity.shape[0]
+    visited = np.zeros(n, dtype=bool)
+    order = [start]
+    visited[start] = True
+    current = start
+    for _ in range(n - 1):
+        row = np.where(visited, -np.inf, similarity[current])
+        current = int(np.argmax(row))
+        visited[current] = True
+        order.append(current)
+    return order
+
+
+def study_order(unit: np.ndarray, similarity: np.ndarray, labels: np.ndarray) -> List[int]:
+    """
+    Topic indices in study order: cluster by cluster, related topics adjacent.
+    `unit` is the row-normalized embedding matrix behind `similarity`.
+    """
+    k = int(labels.max()) + 1 if labels.size else 0
+    if k == 0:
+        return []
+
+    # Mean similarity between two clusters is the dot product of their
+    # centroids, so clusters are ordered on a (k, k) matrix
+    counts = np.bincount(labels, minlength=k).astype(np.float32)
+    centroids = np.zeros((k, unit.shape[1]), dtype=np.float32)
+    np.add.at(centroids, labels, unit)
+    centroids /= counts[:, None]
+    between = centroids @ centroids.T
+    clusters = nearest_neighbour_order(between, int(np.argmax(mean_similarity(between))))
+
+    # Members of every cluster, in input order
+    by_label = np.argsort(labels, kind="stable")
+    members = np.split(by_label, np.cumsum(np.bincount(labels, minlength=k))[:-1])
+
+    order = []
+    for c in clusters:
+        group = members[c]
+        if group.size == 1:
+            order.append(int(group[0]))
+            continue
+        inner = similarity[np.ix_(group, group)]
+        path = nearest_neighbour_order(inner, int(np.argmax(mean_similarity(inner))))
+        order.extend(group[path].tolist())
+    return order
+
+
+def rank_matrix(matrix: np.ndarray, threshold: float = TOPIC_CLUSTER_THRESHOLD):
+    """(order, difficulty, labels) for an (n, dim) embedding matrix."""
+    unit = normalize_rows(matrix)
+    similarity = unit @ unit.T
+    labels = cluster_topics(similarity, threshold)
+    return study_order(unit, similarity, labels), difficulty_scores(similarity), labels
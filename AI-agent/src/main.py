@@ -1,10 +1,67 @@
 # am-prasad/ai-study-planner/AI-agent/src/main.py
 
+import time
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse, PlainTextResponse
+
+from src import metrics, resources
+from src.config import MAX_UPLOAD_BYTES, SERVER_TIMING_ENABLED, WARMUP_RESOURCES
+from src.jobs.manager import job_manager
+from src.pdf.page_pool import shutdown_page_pool, start_page_pool
+from src.processing import processing_stage
+
+@asynccontextmanager
+async def lifespan(app):
+    # Before any model threads exist
+    start_page_pool()
+    # Heavy models/clients load lazily on first use; optionally pre-build some
+    # of them in the background so the first request does not pay for it.
+    if WARMUP_RESOURCES:
+        resources.warm_up(WARMUP_RESOURCES, background=True)
+    yield
+    shutdown_page_pool()
+    processing_stage.shutdown()
+    job_manager.shutdown()
 
 # 1️⃣ Create app FIRST
-app = FastAPI(title="AI Study Planner API")
+app = FastAPI(title="AI Study Planner API", lifespan=lifespan)
+
+# Refuse oversized uploads from their Content-Length before the body is read.
+# Registered before CORS so CORS stays outermost and 413s carry its headers.
+# The slack covers multipart framing and base64-in-JSON (/schedule/generate).
+@app.middleware("http")
+async def reject_oversized_bodies(request, call_next):
+    length = request.headers.get("content-length")
+    if length and length.isdigit() and int(length) > MAX_UPLOAD_BYTES * 4 // 3 + 1024 * 1024:
+        return JSONResponse(status_code=413, content={"detail": "Request body too large."})
+    return await call_next(request)
+
+# Request counts, latency and in-flight gauge for /metrics, plus the optional
+# Server-Timing header. Outside the size check (413s are counted), inside CORS.
+@app.middleware("http")
+async def record_request_metrics(request, call_next):
+    token = metrics.start_request_timings() if SERVER_TIMING_ENABLED else None
+    metrics.HTTP_IN_FLIGHT.inc()
+    started = time.perf_counter()
+    status = 500
+    try:
+        response = await call_next(request)
+        status = response.status_code
+    finally:
+        elapsed = time.perf_counter() - started
+        metrics.HTTP_IN_FLIGHT.dec()
+        # Route template, not the raw path, so ids do not explode the labels
+        route = getattr(request.scope.get("route"), "path", "unmatched")
+        metrics.HTTP_REQUESTS.inc(method=request.method, route=route, status=status)
+        metrics.HTTP_SECONDS.observe(elapsed, method=request.method, route=route)
+        timings = metrics.finish_request_timings(token) if token is not None else None
+
+    if timings is not None:
+        response.headers["Server-Timing"] = metrics.server_timing_header(timings, elapsed)
+    return response
 
 # 2️⃣ Add CORS Middleware
 # Make sure the port matches your Vite frontend (usually 5173 or 8080)
@@ -20,12 +77,27 @@ app.add_middleware(
 # Ensure these routers have internal prefixes like router = APIRouter(prefix="/schedule")
 from src.schedule.router import router as schedule_router
 from src.pdf.router import router as pdf_router
+from src.jobs.router import router as jobs_router
 
 # 4️⃣ Include Routers
 # If your schedule/router.py already has prefix="/schedule", just include it like this:
 app.include_router(schedule_router)
 app.include_router(pdf_router)
+app.include_router(jobs_router)
 
 @app.get("/")
 def root():
-    return {"message": "AI Study Planner Running"}
\ No newline at end of file
+    return {"message": "AI Study Planner Running"}
+
+
+@app.get("/processing/stats")
+def processing_stats():
+    # Concurrency, queue depth and rejection counters for CPU-bound work
+    return processing_stage.stats()
+
+
+@app.get("/metrics")
+def prometheus_metrics():
+    # Stage histograms, request counters and gauges in the Prometheus text format
+    return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4")
+
@@ -0,0 +1,349 @@
+"""
+Process-wide metrics in the Prometheus text format.
+
+Blocking work is wrapped in named stages:
+
+    with metrics.stage("pdf_parse"):
+        ...
+
+    @metrics.timed("scheduling")
+    def build(...): ...
+
+Each stage is recorded in the `study_planner_stage_seconds` histogram, with
+an in-flight gauge per stage. Stages may nest: an outer stage includes the
+stages it calls unless it excludes them (Span.exclude).
+
+The HTTP middleware in src.main counts requests by route and status, times
+them and tracks requests in flight. With SERVER_TIMING_ENABLED it also
+returns the request's stages in a `Server-Timing` header. Stage timings
+reach the request through a contextvar, which processing_stage copies into
+its thread executor. Stages run on the job workers are recorded in the
+histograms only; stages inside other processes (process executor, page
+pool) are not seen, but the parent's stage around the call is.
+
+Gauges read from existing stats() (model load times, cache hit rates,
+queue depths) are collected at scrape time, so `render()` always reflects
+the current state. No client library is needed.
+"""
+
+import contextvars
+import functools
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+# Stage timings of the current request: a list of (stage, seconds), or None
+# when Server-Timing is off / outside a request
+_request_timings = contextvars.ContextVar("request_timings", default=None)
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(labels: dict) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{k}="{_escape(v)}"' for k, v in labels.items()) + "}"
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+# ----------- Metric types ---------------
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, help_text: str, labelnames=()):
+        self.name = name
+        self.help = help_text
+        self.labelnames = tuple(labelnames)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def _key(self, labels: dict) -> tuple:
+        return tuple(str(labels.get(name, "")) for name in self.labelnames)
+
+    def samples(self):
+        """(suffix, labels, value) triples."""
+        with self._lock:
+            items = list(self._values.items())
+        for key, value in items:
+            yield "", dict(zip(self.labelnames, key)), value
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def inc(self, amount: float = 1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+
+class Gauge(_Metric):
+    kind = "gauge"
+
+    def set(self, value: float, **labels):
+        with self._lock:
+            self._values[self._key(labels)] = value
+
+    def inc(self, amount: float = 1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def dec(self, amount: float = 1, **labels):
+        self.inc(-amount, **labels)
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name: str, help_text: str, labelnames=(), buckets=DEFAULT_BUCKETS):
+        super().__init__(name, help_text, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value: float, **labels):
+        key = self._key(labels)
+        with self._lock:
+            state = self._values.get(key)
+            if state is None:
+                # per-bucket counts (+Inf last), sum, count
+                state = self._values[key] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            state[0][bisect_left(self.buckets, value)] += 1
+            state[1] += value
+            state[2] += 1
+
+    def samples(self):
+        with self._lock:
+            items = [(key, (list(s[0]), s[1], s[2])) for key, s in self._values.items()]
+        for key, (counts, total, count) in items:
+            labels = dict(zip(self.labelnames, key))
+            running = 0
+            for bound, n in zip(self.buckets + (float("inf"),), counts):
+                running += n
+                yield "_bucket", dict(labels, le=_format_value(float(bound))), running
+            yield "_sum", labels, total
+            yield "_count", labels, count
+
+
+class Registry:
+
+    def __init__(self):
+        self._metrics = []
+        self._collectors = []
+
+    def register(self, metric: _Metric) -> _Metric:
+        self._metrics.append(metric)
+        return metric
+
+    def add_collector(self, collect):
+        """
+        `collect()` is called on every scrape and returns
+        (name, kind, help, [(labels, value), ...]) tuples.
+        """
+        self._collectors.append(collect)
+
+    def render(self) -> str:
+        lines = []
+        for metric in self._metrics:
+            lines.append(f"# HELP {metric.name} {metric.help}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            for suffix, labels, value in metric.samples():
+                lines.append(f"{metric.name}{suffix}{_format_labels(labels)} {_format_value(value)}")
+
+        for collect in self._collectors:
+            try:
+                families = list(collect())
+            except Exception as e:
+                print(f"⚠️ Metrics collector {getattr(collect, '__name__', collect)} failed: {e}")
+                continue
+            for name, kind, help_text, samples in families:
+                lines.append(f"# HELP {name} {help_text}")
+                lines.append(f"# TYPE {name} {kind}")
+                for labels, value in samples:
+                    lines.append(f"{name}{_format_labels(labels)} {_format_value(value)}")
+
+        return "\n".join(lines) + "\n"
+
+
+registry = Registry()
+
+STAGE_SECONDS = registry.register(Histogram(
+    "study_planner_stage_seconds", "Time spent in each processing stage.", ["stage"]
+))
+STAGE_IN_FLIGHT = registry.register(Gauge(
+    "study_planner_stage_in_flight", "Stages currently running.", ["stage"]
+))
+HTTP_REQUESTS = registry.register(Counter(
+    "study_planner_http_requests_total", "HTTP requests by route and status.", ["method", "route", "status"]
+))
+HTTP_SECONDS = registry.register(Histogram(
+    "study_planner_http_request_seconds", "HTTP request latency.", ["method", "route"]
+))
+HTTP_IN_FLIGHT = registry.register(Gauge(
+    "study_planner_http_requests_in_flight", "HTTP requests being served."
+))
+
+
+# ----------- Stage timing ---------------
+class Span:
+
+    def __init__(self, name: str):
+        self.name = name
+        self.excluded = 0.0
+
+    def exclude(self, seconds: float):
+        """Leaves `seconds` (time recorded as another stage) out of this one."""
+        self.excluded += seconds
+
+
+def observe_stage(name: str, seconds: float):
+    STAGE_SECONDS.observe(seconds, stage=name)
+    timings = _request_timings.get()
+    if timings is not None:
+        timings.append((name, seconds))
+
+
+@contextmanager
+def stage(name: str):
+    span = Span(name)
+    STAGE_IN_FLIGHT.inc(stage=name)
+    started = time.perf_counter()
+    try:
+        yield span
+    finally:
+        STAGE_IN_FLIGHT.dec(stage=name)
+        observe_stage(name, max(time.perf_counter() - started - span.excluded, 0.0))
+
+
+def timed(name: str):
+    """Decorator form of stage()."""
+    def decorate(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            with stage(name):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorate
+
+
+class TimedIter:
+    """
+    Wraps an iterator and adds up the time spent producing its items, for
+    lazy stages (a streamed spaCy pipeline) consumed by another stage.
+    """
+
+    def __init__(self, iterable):
+        self._iterator = iter(iterable)
+        self.elapsed = 0.0
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        started = time.perf_counter()
+        try:
+            return next(self._iterator)
+        finally:
+            self.elapsed += time.perf_counter() - started
+
+
+# ----------- Per-request timings (Server-Timing) ---------------
+def start_request_timings():
+    """Starts collecting this request's stages; returns a token for finish."""
+    return _request_timings.set([])
+
+
+def finish_request_timings(token) -> list:
+    timings = _request_timings.get() or []
+    _request_timings.reset(token)
+    return timings
+
+
+def server_timing_header(timings, total: float) -> str:
+    """`stage;dur=<ms>` per stage (repeats summed, in first-seen order) plus total."""
+    merged = {}
+    for name, seconds in timings:
+        merged[name] = merged.get(name, 0.0) + seconds
+    parts = [f"{name};dur={seconds * 1000:.1f}" for name, seconds in merged.items()]
+    parts.append(f"total;dur={total * 1000:.1f}")
+    return ", ".join(parts)
+
+
+def render() -> str:
+    return registry.render()
+
+
+# ----------- Gauges from existing stats ---------------
+def _collect_resources():
+    from src import resources
+
+    names = resources.registered()
+    yield ("study_planner_resource_loaded", "gauge", "Whether a lazy resource has been built.",
+           [({"resource": n}, int(resources.is_loaded(n))) for n in names])
+    yield ("study_planner_resource_load_seconds", "gauge", "Seconds it took to build each resource.",
+           [({"resource": n}, seconds) for n, seconds in dict(resources.load_times).items()])
+
+
+def _collect_caches():
+    from src import resources
+    from src.schedule.analysis_cache import analysis_cache
+
+    stats = analysis_cache.stats()
+    yield ("study_planner_analysis_cache_lookups_total", "counter", "PDF analysis cache lookups by result.",
+           [({"result": "memory_hit"}, stats["memory_hits"]),
+            ({"result": "disk_hit"}, stats["disk_hits"]),
+            ({"result": "miss"}, stats["misses"])])
+    yield ("study_planner_analysis_cache_hit_ratio", "gauge", "PDF analysis cache hit rate.",
+           [({}, stats["hit_rate"])])
+
+    embedding = [
+        resources.get(name).stats()
+        for name in resources.registered()
+        if name.startswith("embedding_cache:") and resources.is_loaded(name)
+    ]
+    yield ("study_planner_embedding_cache_lookups_total", "counter", "Embedding cache lookups by result.",
+           [({"model": s["model"], "result": r}, s[key]) for s in embedding
+            for r, key in (("hit", "hits"), ("miss", "misses"))])
+    yield ("study_planner_embedding_cache_hit_ratio", "gauge", "Embedding cache hit rate.",
+           [({"model": s["model"]}, s["hit_rate"]) for s in embedding])
+
+
+def _collect_queues():
+    from src import resources
+    from src.jobs.manager import job_manager
+    from src.processing import processing_stage
+
+    stage_stats = processing_stage.stats()
+    yield ("study_planner_processing_slots", "gauge", "Processing stage calls running or waiting for a slot.",
+           [({"state": "running"}, stage_stats["running"]), ({"state": "waiting"}, stage_stats["waiting"])])
+    yield ("study_planner_processing_calls_total", "counter", "Processing stage calls by outcome.",
+           [({"outcome": o}, stage_stats[o]) for o in ("completed", "rejected", "timed_out")])
+
+    job_stats = job_manager.stats()
+    yield ("study_planner_jobs", "gauge", "Background jobs by status.",
+           [({"status": status}, n) for status, n in job_stats["jobs"].items()])
+    yield ("study_planner_jobs_total", "counter", "Background jobs by outcome.",
+           [({"outcome": o}, job_stats[o]) for o in ("submitted", "rejected", "expired")])
+
+    if resources.is_loaded("embedding_batcher"):
+        batcher = resources.get("embedding_batcher").stats()
+        yield ("study_planner_embedding_queue_depth", "gauge", "Embedding requests waiting for a batch.",
+               [({}, batcher["queue_depth"])])
+        yield ("study_planner_embedding_pending_texts", "gauge", "Texts waiting to be embedded.",
+               [({}, batcher["pending_texts"])])
+        yield ("study_planner_embedding_batches_total", "counter", "Embedding batches run.",
+               [({}, batcher["batches"])])
+
+
+registry.add_collector(_collect_resources)
+registry.add_collector(_collect_caches)
+registry.add_collector(_collect_queues)
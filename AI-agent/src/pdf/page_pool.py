@@ -0,0 +1,99 @@
+"""
+Page-sharded PDF extraction.
+
+Large PDFs are split into contiguous page ranges which are processed on a
+reusable process pool. Each worker opens the document itself, handles its
+range and returns per-page results, which are merged back in page order.
+
+Workers are started with PDF_PARALLEL_START_METHOD ("forkserver" by default,
+"spawn" where that is unavailable), never forked from the API process and
+its model/client threads. The pool is created at app startup; scripts that
+never start the app get it on first use.
+"""
+
+import multiprocessing
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from math import ceil
+
+from src.config import PDF_PARALLEL_MIN_PAGES, PDF_PARALLEL_START_METHOD, PDF_PARALLEL_WORKERS
+
+# Imported once by the fork server, so its workers start with them loaded
+_WORKER_MODULES = ["src.pdf.pdf_service", "src.preprocessing.pdf_reader", "src.schedule.utils"]
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def _mp_context():
+    method = PDF_PARALLEL_START_METHOD
+    if method not in multiprocessing.get_all_start_methods():
+        method = "spawn"
+    context = multiprocessing.get_context(method)
+    if method == "forkserver":
+        context.set_forkserver_preload(_WORKER_MODULES)
+    return context
+
+
+def get_page_pool():
+    """Returns the shared process pool, creating it on first use."""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ProcessPoolExecutor(max_workers=PDF_PARALLEL_WORKERS, mp_context=_mp_context())
+        return _pool
+
+
+def start_page_pool():
+    """
+    Creates the pool and starts its workers up front (app startup) when PDFs
+    may be sharded, so the first large upload does not wait for them.
+    """
+    if PDF_PARALLEL_WORKERS > 1:
+        pool = get_page_pool()
+        for _ in range(PDF_PARALLEL_WORKERS):
+            pool.submit(int)  # no-op; each one needs a worker to be started
+
+
+def shutdown_page_pool():
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.shutdown(wait=False, cancel_futures=True)
+            _pool = None
+
+
+def should_shard(page_count: int) -> bool:
+    return PDF_PARALLEL_WORKERS > 1 and page_count >= PDF_PARALLEL_MIN_PAGES
+
+
+def page_ranges(page_count: int, shards: int):
+    """
+    Splits [0, page_count) into at most `shards` contiguous (start, end) ranges.
+    """
+    if page_count <= 0:
+        return []
+    size = ceil(page_count / max(shards, 1))
+    return [(start, min(start + size, page_count)) for start in range(0, page_count, size)]
+
+
+def map_page_ranges(fn, source, page_count: int, on_pages_done=None) -> list:
+    """
+    Runs fn(source, start, end) for every page range on the pool.
+
+    `fn` must be a module-level function returning a list of per-page results;
+    the lists are concatenated in document order. `on_pages_done(n)` is called
+    with the number of pages merged so far after each range.
+    """
+    pool = get_page_pool()
+    futures = [
+        pool.submit(fn, source, start, end)
+        for start, end in page_ranges(page_count, PDF_PARALLEL_WORKERS)
+    ]
+
+    results = []
+    for future in futures:
+        results.extend(future.result())
+        if on_pages_done:
+            on_pages_done(len(results))
+    return results
@@ -1,20 +1,53 @@
 import fitz  # PyMuPDF
 
+from src import metrics
+from src.extraction.heading_dedup import consolidate_headings, heading_span
+from .page_pool import should_shard, map_page_ranges
+
+
+def _page_headings(page):
+    headings = []
+    blocks = page.get_text("dict")["blocks"]
+    for block in blocks:
+        if "lines" in block:
+            for line in block["lines"]:
+                for span in line["spans"]:
+                    text = span["text"].strip()
+                    if span["size"] > 12 and text:  # simple heading detection
+                        headings.append(heading_span(span, text))
+    return page.rect.height, headings
+
+
+def _headings_in_range(pdf_path, start, end):
+    """Per-page headings for pages [start, end). Runs inside page-pool workers."""
+    with fitz.open(pdf_path) as doc:
+        return [_page_headings(doc[i]) for i in range(start, end)]
+
+
 class PDFService:
 
     @staticmethod
-    def extract_headings(pdf_path):
-        doc = fitz.open(pdf_path)
-        headings = []
-
-        for page in doc:
-            blocks = page.get_text("dict")["blocks"]
-            for block in blocks:
-                if "lines" in block:
-                    for line in block["lines"]:
-                        for span in line["spans"]:
-                            if span["size"] > 12:  # simple heading detection
-                                headings.append(span["text"])
-
-        # remove duplicates
-        return list(dict.fromkeys(headings))
+    @metrics.timed("pdf_parse")
+    def extract_headings(pdf_path, progress=None):
+        """
+        :param progress: optional callable(stage, **counts), told how many
+                         pages have been parsed so far
+        """
+        def pages_done(n):
+            if progress:
+                progress("parsing", pages_parsed=n, pages_total=page_count)
+
+        with fitz.open(pdf_path) as doc:
+            page_count = doc.page_count
+            sharded = should_shard(page_count)
+            if not sharded:
+                pages = []
+                for page in doc:
+                    pages.append(_page_headings(page))
+                    pages_done(len(pages))
+
+        if sharded:
+            pages = map_page_ranges(_headings_in_range, pdf_path, page_count, on_pages_done=pages_done)
+
+        # Document order; running headers, fragments and duplicates consolidated
+        return consolidate_headings(pages)
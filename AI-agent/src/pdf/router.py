@@ -1,44 +1,82 @@
-from fastapi import APIRouter, UploadFile, File
+from fastapi import APIRouter, UploadFile, File, Query, HTTPException
 from .pdf_service import PDFService
-from src.preprocessing.embedding_service import EmbeddingService
+from src.preprocessing.embedding_service import get_embedding_service
+from src.preprocessing.embedding_batcher import get_embedding_batcher
 from src.schedule.generator import ScheduleGenerator
-from src.config import PINECONE_INDEX
+from src.vectorstore.sync import SyncPlan, apply_sync, plan_sync, with_content_ids
+from src import metrics
+from src.processing import processing_stage
+from src.pipeline.study_plan_pipeline import index_pdf_headings
+from src.jobs.manager import job_manager
+from src.jobs.router import accepted
+from src.pdf.spool import spool_upload
 
 router = APIRouter()
 
 @router.post("/upload-pdf")
-async def upload_pdf(file: UploadFile = File(...)):
-    temp_path = f"temp/{file.filename}"
-    with open(temp_path, "wb") as buffer:
-        buffer.write(await file.read())
-
-    # Step 1: Extract headings
-    headings = PDFService.extract_headings(temp_path)
-
-    # Step 2: Embed headings
-    embeddings = EmbeddingService.embed_text(headings)
-
-    # Step 3: Store in Pinecone
-    vectors = []
-    for i, h in enumerate(headings):
-        vectors.append({
-            "id": f"{file.filename}-{i}",
-            "values": embeddings[i],
-            "metadata": {
-                "pdf": file.filename,
-                "heading": h
-            }
-        })
-
-    PINECONE_INDEX.upsert(vectors)
-
-    # Step 4: Convert headings to topic format
+async def upload_pdf(file: UploadFile = File(...), job: bool = Query(False), sync: bool = Query(True)):
+    """
+    Headings are stored under content-hash ids scoped to the file name. With
+    sync (the default), re-uploading a file only embeds and writes headings
+    that are new or changed and deletes the ones it no longer has.
+    """
+    # Copy the upload to the spool dir in chunks (413 past MAX_UPLOAD_BYTES)
+    try:
+        with metrics.stage("spool"):
+            spool = await spool_upload(file)
+    finally:
+        await file.close()
+
+    # Job mode: reply 202 now, run the whole pipeline on the job workers
+    if job:
+        filename = file.filename
+
+        def run(progress):
+            with spool:
+                return index_pdf_headings(spool.path, filename, progress=progress, sync=sync)
+
+        try:
+            return accepted(job_manager.submit("upload-pdf", run))
+        except HTTPException:
+            spool.discard()
+            raise
+
+    # Step 1: Extract headings (off the event loop)
+    with spool:
+        headings = await processing_stage.run(PDFService.extract_headings, spool.path)
+
+    # Step 2: Work out which headings are not stored yet
+    embedding_service = get_embedding_service()
+    items = [
+        {"text": h, "metadata": {"pdf": file.filename, "heading": h}}
+        for h in headings
+    ]
+    if sync:
+        plan = await processing_stage.run(plan_sync, embedding_service.index, file.filename, items,
+                                          legacy_prefix=f"{file.filename}-")
+    else:
+        plan = SyncPlan(upsert=with_content_ids(file.filename, items), delete=[], kept=0)
+
+    # Step 3: Embed only those (batched together with concurrent requests)
+    # (the "embedding_batch" stage includes the wait for a batch to fill)
+    with metrics.stage("embedding_batch"):
+        embeddings = await get_embedding_batcher().embed([item["text"] for item in plan.upsert])
+    vectors = [
+        dict(item, values=embeddings[i].tolist())
+        for i, item in enumerate(plan.upsert)
+        if embeddings[i].any()
+    ]
+
+    # Step 4: Write new headings to Pinecone, delete stale ones
+    await processing_stage.run(apply_sync, embedding_service.index, plan._replace(upsert=vectors))
+
+    # Step 5: Convert headings to topic format
     topics = [
         {"name": h, "hours_required": 2}
         for h in headings
     ]
 
-    # Step 5: Generate schedule
+    # Step 6: Generate schedule
     schedule = ScheduleGenerator.create_schedule(
         topics=topics,
         daily_hours=3,
@@ -51,3 +89,11 @@ async def upload_pdf(file: UploadFile = File(...)):
         "headings": headings,
         "schedule": schedule
     }
+
+
+@router.get("/embeddings/stats")
+def embedding_stats():
+    """
+    Micro-batcher tunables, queue depth and batch counters.
+    """
+    return get_embedding_batcher().stats()
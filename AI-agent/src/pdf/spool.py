@@ -0,0 +1,165 @@
+"""
+Streaming upload spooling.
+
+Request bodies (multipart files, raw application/pdf bodies and base64
+strings) are copied to a file under UPLOAD_SPOOL_DIR in UPLOAD_CHUNK_BYTES
+pieces, hashing as they go. The size limit is checked per chunk, so an
+oversized upload fails with 413 as soon as it crosses MAX_UPLOAD_BYTES.
+The PDF code then opens the spooled file by path; no full bytes copy of the
+upload is ever held in memory.
+"""
+
+import base64
+import hashlib
+import os
+import re
+import uuid
+
+from fastapi import HTTPException
+
+from src.config import MAX_UPLOAD_BYTES, UPLOAD_CHUNK_BYTES, UPLOAD_SPOOL_DIR
+
+_NON_ALPHABET = re.compile(r"[^A-Za-z0-9+/=]+")
+
+
+class SpooledPDF:
+    """
+    A spooled upload on disk: `path`, `size` in bytes and the SHA-256
+    `digest` of its content. Removing the file is the owner's job
+    (`discard()`, or use it as a context manager).
+    """
+
+    def __init__(self, path: str, size: int, digest: str, filename: str = None):
+        self.path = path
+        self.size = size
+        self.digest = digest
+        self.filename = filename
+
+    def discard(self):
+        try:
+            os.remove(self.path)
+        except FileNotFoundError:
+            pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.discard()
+
+
+def too_large():
+    return HTTPException(
+        status_code=413,
+        detail=f"Upload exceeds the {MAX_UPLOAD_BYTES // (1024 * 1024)} MB limit."
+    )
+
+
+def check_content_length(headers, max_bytes: int = MAX_UPLOAD_BYTES, overhead: int = 0):
+    """
+    Rejects a request up front when its declared Content-Length is over the
+    limit (plus `overhead` for multipart framing or base64/JSON expansion).
+    """
+    length = headers.get("content-length")
+    if length and length.isdigit() and int(length) > max_bytes + overhead:
+        raise too_large()
+
+
+class _SpoolWriter:
+
+    def __init__(self, max_bytes: int, filename: str = None):
+        os.makedirs(UPLOAD_SPOOL_DIR, exist_ok=True)
+        self.path = os.path.join(UPLOAD_SPOOL_DIR, f"{uuid.uuid4().hex}.pdf")
+        self.filename = filename
+        self.max_bytes = max_bytes
+        self.size = 0
+        self._hash = hashlib.sha256()
+        self._file = open(self.path, "wb")
+
+    def write(self, chunk: bytes):
+        self.size += len(chunk)
+        if self.size > self.max_bytes:
+            raise too_large()
+        self._hash.update(chunk)
+        self._file.write(chunk)
+
+    def finish(self) -> SpooledPDF:
+        self._file.close()
+        return SpooledPDF(self.path, self.size, self._hash.hexdigest(), self.filename)
+
+    def abort(self):
+        self._file.close()
+        try:
+            os.remove(self.path)
+        except FileNotFoundError:
+            pass
+
+
+async def spool_upload(file, max_bytes: int = MAX_UPLOAD_BYTES) -> SpooledPDF:
+    """
+    Copies a FastAPI UploadFile to the spool dir chunk by chunk.
+    """
+    writer = _SpoolWriter(max_bytes, filename=file.filename)
+    try:
+        while True:
+            chunk = await file.read(UPLOAD_CHUNK_BYTES)
+            if not chunk:
+                break
+            writer.write(chunk)
+    except BaseException:
+        writer.abort()
+        raise
+    return writer.finish()
+
+
+async def spool_stream(chunks, max_bytes: int = MAX_UPLOAD_BYTES, filename: str = None) -> SpooledPDF:
+    """
+    Spools an async iterator of bytes, e.g. `request.stream()` for a raw
+    application/pdf body.
+    """
+    writer = _SpoolWriter(max_bytes, filename=filename)
+    try:
+        async for chunk in chunks:
+            if chunk:
+                writer.write(chunk)
+    except BaseException:
+        writer.abort()
+        raise
+    return writer.finish()
+
+
+def spool_base64(data: str, max_bytes: int = MAX_UPLOAD_BYTES, filename: str = None) -> SpooledPDF:
+    """
+    Decodes a base64 string to the spool dir a chunk at a time instead of
+    materialising the whole decoded PDF. Characters outside the base64
+    alphabet (line breaks etc.) are skipped, as base64.b64decode does.
+    """
+    # Decoded size is ~3/4 of the encoded length; refuse before decoding
+    if len(data) * 3 // 4 > max_bytes + 3:
+        raise too_large()
+
+    writer = _SpoolWriter(max_bytes, filename=filename)
+    step = (UPLOAD_CHUNK_BYTES // 3) * 4  # whole base64 quanta
+    carry = ""
+    try:
+        for start in range(0, len(data), step):
+            piece = carry + _NON_ALPHABET.sub("", data[start:start + step])
+            usable = len(piece) - len(piece) % 4
+            carry = piece[usable:]
+            if usable:
+                writer.write(base64.b64decode(piece[:usable]))
+        if carry:
+            writer.write(base64.b64decode(carry + "=" * (-len(carry) % 4)))
+    except BaseException:
+        writer.abort()
+        raise
+    return writer.finish()
+
+
+def file_digest(path: str) -> str:
+    """SHA-256 of a file, read in chunks."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(UPLOAD_CHUNK_BYTES), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
@@ -0,0 +1,157 @@
+"""
+Blocking study-plan pipelines.
+
+Each function runs one request's heavy work end to end (PDF parsing, NLP
+difficulty scoring, scheduling) on an upload the route has already spooled
+to disk (src.pdf.spool). Route handlers run them through
+`src.processing.processing_stage` so the event loop never does this work
+itself; they are module-level so they also work with the process executor.
+The background job API (src.jobs) runs the same functions with a `progress`
+callable(stage, **counts) that feeds its status and event stream.
+"""
+
+from src.pdf.pdf_service import PDFService
+from src.preprocessing.embedding_service import get_embedding_service
+from src.schedule.generator import (
+    ScheduleGenerator,
+    generate_schedule_from_headings,
+    generate_dynamic_schedule,
+)
+from src.schedule.engine import ScheduleConstraintError
+from src.schedule.utils import analyze_pdf
+from src.vectorstore.sync import store_document
+
+
+class NoUsableContentError(ValueError):
+    """The input has nothing to build a plan from (reported as HTTP 422)."""
+
+
+def _dynamic_content(pdf, raw_data, pdf_digest=None):
+    """(headings, full_text) for /schedule/generate, from a PDF or raw text."""
+    headings = []
+    full_text = ""
+
+    if pdf:  # If PDF content is provided
+        analysis = analyze_pdf(pdf, with_difficulty=False, digest=pdf_digest)
+        headings = analysis["headings"]
+        full_text = analysis["full_text"]
+    elif raw_data:  # If rawData is text
+        headings = [line.strip() for line in raw_data.split('\n') if line.strip()]
+        full_text = raw_data
+
+    if not headings and not full_text:  # If neither text nor PDF provided usable content
+        raise NoUsableContentError(
+            "No usable content for timetable generation. Please provide text or a valid PDF."
+        )
+    return headings, full_text
+
+
+def build_dynamic_timetable(user_id, pdf, raw_data, availability, start_date, study_time, pdf_digest=None):
+    """
+    /schedule/generate: headings from a PDF (spooled file path or bytes) or
+    raw text -> timetable.
+    """
+    headings, full_text = _dynamic_content(pdf, raw_data, pdf_digest)
+
+    return generate_dynamic_schedule(
+        content=full_text,
+        headings=headings,
+        availability=availability,
+        startDate=start_date,
+        studyTime=study_time,
+        userId=user_id
+    )
+
+
+def build_dynamic_timetables(users, pdf=None, raw_data=None, pdf_digest=None):
+    """
+    /schedule/generate-batch: one document (PDF or raw text) shared by many
+    users is extracted once, then scheduled for each user.
+
+    :param users: dicts with user_id, availability, start_date, study_time
+    :return: one entry per user, in order: the timetable, or the
+        ScheduleConstraintError that user's availability raised
+    """
+    headings, full_text = _dynamic_content(pdf, raw_data, pdf_digest)
+
+    results = []
+    for user in users:
+        try:
+            results.append(generate_dynamic_schedule(
+                content=full_text,
+                headings=headings,
+                availability=user["availability"],
+                startDate=user["start_date"],
+                studyTime=user["study_time"],
+                userId=user["user_id"]
+            ))
+        except ScheduleConstraintError as e:
+            results.append(e)
+    return results
+
+
+def build_pdf_schedule(pdf, total_hours: float, start_date=None, progress=None, pdf_digest=None,
+                       daily_hours=None, exam_date=None):
+    """
+    /schedule/upload-pdf: PDF (spooled file path or bytes) -> difficulty-weighted
+    dated schedule.
+    """
+    # Extract headings/text and compute NLP difficulty (cached by content hash)
+    analysis = analyze_pdf(pdf, progress=progress, digest=pdf_digest)
+    headings = analysis["headings"]
+
+    if not headings:
+        raise NoUsableContentError("No headings could be extracted from this PDF.")
+
+    # Generate schedule with sequential dates and weighted hours
+    schedule = generate_schedule_from_headings(
+        headings=headings,
+        total_hours=total_hours,
+        difficulty_scores=analysis["difficulty_scores"],
+        start_date_str=start_date,
+        daily_hours=daily_hours,
+        exam_date=exam_date
+    )
+    if progress:
+        progress("scheduling", sessions=len(schedule))
+    return schedule
+
+
+def index_pdf_headings(pdf_path: str, filename: str, progress=None, sync: bool = True):
+    """
+    /upload-pdf (job mode): headings -> embeddings -> vector store -> 7-day
+    schedule, returning the same body as the synchronous route. With `sync`,
+    only headings not stored for this file yet are embedded and written, and
+    the file's stale ones (and its old "<filename>-<n>" ids) are deleted
+    (src.vectorstore.sync).
+    """
+    headings = PDFService.extract_headings(pdf_path, progress=progress)
+    if progress:
+        progress("headings", found=len(headings))
+
+    embedding_service = get_embedding_service()
+    items = [
+        {"text": h, "metadata": {"pdf": filename, "heading": h}}
+        for h in headings
+    ]
+    store_document(embedding_service.index, filename, items, embed_fn=embedding_service.embed_batch,
+                   sync=sync, progress=progress, legacy_prefix=f"{filename}-")
+
+    topics = [
+        {"name": h, "hours_required": 2}
+        for h in headings
+    ]
+    schedule = ScheduleGenerator.create_schedule(
+        topics=topics,
+        daily_hours=3,
+        days=7
+    )
+    if progress:
+        progress("scheduling", sessions=len(schedule))
+
+    return {
+        "pdf": filename,
+        "headings_stored": len(headings),
+        "headings": headings,
+        "schedule": schedule
+    }
@@ -0,0 +1,146 @@
+"""
+Cross-request dynamic micro-batching for embeddings.
+
+Concurrent requests each submit their texts to one asyncio queue. A single
+worker task drains the queue, merging jobs until it has EMBED_BATCHER_MAX_TEXTS
+texts or the first job has waited EMBED_BATCHER_MAX_WAIT_MS, runs one batched
+encode in a thread (off the event loop) and hands every caller its own slice
+of the result matrix.
+
+The encode runs on the loop's default executor, outside the processing
+stage's concurrency limit (src.processing); the single worker keeps it to
+one encode at a time.
+"""
+
+import asyncio
+import threading
+
+import numpy as np
+
+from src import resources
+from src.config import EMBED_BATCHER_MAX_TEXTS, EMBED_BATCHER_MAX_WAIT_MS
+from src.preprocessing.embedding_service import get_embedding_service
+
+
+class EmbeddingBatcher:
+
+    def __init__(self, encode_fn, max_batch_texts: int, max_wait_ms: float):
+        """
+        :param encode_fn: callable(list[str]) -> np.ndarray with one row per text
+        """
+        self.encode_fn = encode_fn
+        self.max_batch_texts = max_batch_texts
+        self.max_wait_ms = max_wait_ms
+
+        self._loop = None
+        self._queue = None
+        self._worker = None
+        self._start_lock = threading.Lock()
+
+        self.pending_texts = 0
+        self.batches = 0
+        self.texts = 0
+        self.jobs = 0
+        self.largest_batch = 0
+
+    async def embed(self, texts: list[str]) -> np.ndarray:
+        """Embeds `texts`, sharing the encode call with other concurrent callers."""
+        texts = list(texts)
+        if not texts:
+            return np.zeros((0, 0), dtype=np.float32)
+
+        self._ensure_worker()
+        future = self._loop.create_future()
+
+        self.pending_texts += len(texts)
+        await self._queue.put((texts, future))
+        return await future
+
+    def stats(self) -> dict:
+        return {
+            "max_batch_texts": self.max_batch_texts,
+            "max_wait_ms": self.max_wait_ms,
+            "queue_depth": self._queue.qsize() if self._queue is not None else 0,
+            "pending_texts": self.pending_texts,
+            "jobs": self.jobs,
+            "batches": self.batches,
+            "texts": self.texts,
+            "avg_batch_texts": round(self.texts / self.batches, 2) if self.batches else 0.0,
+            "largest_batch": self.largest_batch,
+        }
+
+    # ----------------------------------------------------
+    # Worker
+    # ----------------------------------------------------
+
+    def _ensure_worker(self):
+        loop = asyncio.get_running_loop()
+        with self._start_lock:
+            # (Re)bind to the running loop, e.g. after a test client restart
+            if self._loop is not loop or self._worker is None or self._worker.done():
+                self._loop = loop
+                self._queue = asyncio.Queue()
+                self._worker = loop.create_task(self._run())
+
+    async def _collect(self):
+        """Waits for one job, then keeps merging jobs until size or time runs out."""
+        batch = [await self._queue.get()]
+        count = len(batch[0][0])
+        deadline = self._loop.time() + self.max_wait_ms / 1000
+
+        while count < self.max_batch_texts:
+            timeout = deadline - self._loop.time()
+            if timeout <= 0:
+                break
+            try:
+                job = await asyncio.wait_for(self._queue.get(), timeout)
+            except asyncio.TimeoutError:
+                break
+            batch.append(job)
+            count += len(job[0])
+
+        return batch, count
+
+    async def _run(self):
+        while True:
+            batch, count = await self._collect()
+            texts = [t for job_texts, _ in batch for t in job_texts]
+
+            try:
+                matrix = await self._loop.run_in_executor(None, self.encode_fn, texts)
+            except Exception as e:
+                matrix = None
+                error = e
+
+            self.pending_texts -= count
+            self.batches += 1
+            self.jobs += len(batch)
+            self.texts += count
+            self.largest_batch = max(self.largest_batch, count)
+
+            offset = 0
+            for job_texts, future in batch:
+                if future.cancelled():
+                    offset += len(job_texts)
+                    continue
+                if matrix is None:
+                    future.set_exception(error)
+                else:
+                    future.set_result(matrix[offset:offset + len(job_texts)])
+                offset += len(job_texts)
+
+
+def _encode(texts):
+    return get_embedding_service().embed_batch(texts)
+
+
+def _create_batcher():
+    return EmbeddingBatcher(
+        encode_fn=_encode,
+        max_batch_texts=EMBED_BATCHER_MAX_TEXTS,
+        max_wait_ms=EMBED_BATCHER_MAX_WAIT_MS,
+    )
+
+
+def get_embedding_batcher() -> EmbeddingBatcher:
+    return resources.get_or_create("embedding_batcher", _create_batcher)
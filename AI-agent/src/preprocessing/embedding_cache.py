@@ -0,0 +1,252 @@
+"""
+Persistent embedding cache keyed by (model name, normalized text hash).
+
+Vectors live in a fixed-size memory-mapped file (one row per slot, float16 or
+float32) and a SQLite table beside it maps text hashes to slots and tracks
+when each slot was last used. When the file is full the least recently used
+slot is overwritten.
+
+Both files are shared by every worker process on the host. Writers take an
+exclusive SQLite lock before touching the vector file, and readers copy rows
+out while holding a shared lock, so a slot is never read while another
+process is overwriting it. The vector file is never resized once it exists:
+a process configured with another capacity uses the file's own (other
+workers have it memory-mapped), until the cache files are removed.
+
+Each model's embedding dimension is recorded next to its cache, so a later
+process can open the cache, and serve hits, without loading the model.
+"""
+
+import hashlib
+import os
+import re
+import sqlite3
+import threading
+import time
+import unicodedata
+
+import numpy as np
+
+from src import resources
+from src.config import (
+    EMBEDDING_CACHE_CAPACITY,
+    EMBEDDING_CACHE_DIR,
+    EMBEDDING_CACHE_DTYPE,
+    EMBEDDING_CACHE_ENABLED,
+)
+
+
+def normalize_text(text: str) -> str:
+    """Unicode NFC + collapsed whitespace; case is kept because models are case-aware."""
+    return " ".join(unicodedata.normalize("NFC", text).split())
+
+
+class EmbeddingCache:
+
+    def __init__(self, directory: str, model_name: str, dim: int, capacity: int, dtype: str = "float16"):
+        self.model_name = model_name
+        self.dim = dim
+        self.capacity = capacity
+        self.dtype = np.dtype(dtype)
+
+        slug = _slug(model_name)
+        base = os.path.join(directory, f"{slug}-{dim}-{self.dtype.name}")
+        self.vectors_path = f"{base}.mmap"
+        self.index_path = f"{base}.sqlite"
+
+        os.makedirs(directory, exist_ok=True)
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(self.index_path, timeout=30, isolation_level=None, check_same_thread=False)
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS entries ("
+            " key TEXT PRIMARY KEY, slot INTEGER NOT NULL UNIQUE, last_used REAL NOT NULL)"
+        )
+        self._db.execute("CREATE INDEX IF NOT EXISTS entries_last_used ON entries (last_used)")
+        self._vectors = self._open_vectors()
+        _record_dimension(directory, model_name, dim)
+
+        self.hits = 0
+        self.misses = 0
+
+    def _open_vectors(self):
+        row_bytes = self.dim * self.dtype.itemsize
+
+        with self._lock:
+            self._db.execute("BEGIN EXCLUSIVE")
+            try:
+                if not os.path.exists(self.vectors_path):
+                    # New cache: an empty (sparse) file
+                    with open(self.vectors_path, "wb") as f:
+                        f.truncate(self.capacity * row_bytes)
+                    self._db.execute("DELETE FROM entries")
+                else:
+                    size = os.path.getsize(self.vectors_path)
+                    if size == 0 or size % row_bytes:
+                        raise RuntimeError(
+                            f"Embedding cache file {self.vectors_path} has {size} bytes, not a whole "
+                            f"number of {row_bytes}-byte rows; remove it and its .sqlite index"
+                        )
+                    if size != self.capacity * row_bytes:
+                        # Resizing would truncate the file under other workers' memmaps
+                        print(f"⚠️ Embedding cache {self.vectors_path} holds {size // row_bytes} vectors; "
+                              f"EMBEDDING_CACHE_CAPACITY={self.capacity} applies once it is removed")
+                        self.capacity = size // row_bytes
+                self._db.execute("COMMIT")
+            except Exception:
+                self._db.execute("ROLLBACK")
+                raise
+
+        return np.memmap(self.vectors_path, dtype=self.dtype, mode="r+", shape=(self.capacity, self.dim))
+
+    def key_for(self, text: str) -> str:
+        return hashlib.sha256(normalize_text(text).encode("utf-8")).hexdigest()
+
+    # ----------- Lookup ---------------
+    def lookup(self, texts: list[str]) -> dict:
+        """
+        Returns {position: float32 vector} for every text already cached.
+        """
+        keys = [self.key_for(t) for t in texts]
+        found = {}
+
+        with self._lock:
+            self._db.execute("BEGIN")
+            try:
+                slots = self._slots_for(keys)
+                for i, key in enumerate(keys):
+                    slot = slots.get(key)
+                    if slot is not None:
+                        found[i] = np.asarray(self._vectors[slot], dtype=np.float32)
+            finally:
+                self._db.execute("COMMIT")
+
+            if slots:
+                self._touch(list(slots))
+
+            self.hits += len(found)
+            self.misses += len(keys) - len(found)
+
+        return found
+
+    def _slots_for(self, keys) -> dict:
+        slots = {}
+        for start in range(0, len(keys), 500):
+            chunk = keys[start:start + 500]
+            rows = self._db.execute(
+                f"SELECT key, slot FROM entries WHERE key IN ({','.join('?' * len(chunk))})",
+                chunk,
+            ).fetchall()
+            slots.update(rows)
+        return slots
+
+    def _touch(self, keys):
+        # Best-effort LRU bookkeeping; skipped if another process holds the lock too long
+        now = time.time()
+        try:
+            self._db.executemany("UPDATE entries SET last_used = ? WHERE key = ?", [(now, k) for k in keys])
+        except sqlite3.OperationalError:
+            pass
+
+    # ----------- Insert ---------------
+    def store(self, texts: list[str], matrix: np.ndarray):
+        """Caches matrix[i] as the embedding of texts[i]."""
+        entries = {self.key_for(t): i for i, t in enumerate(texts)}
+        if not entries:
+            return
+
+        with self._lock:
+            self._db.execute("BEGIN EXCLUSIVE")
+            try:
+                existing = self._slots_for(list(entries))
+                new_keys = [k for k in entries if k not in existing]
+
+                # Slots are only ever freed by eviction and immediately reused,
+                # so occupied slots are always exactly 0 .. used-1.
+                used = self._db.execute("SELECT COUNT(*) FROM entries").fetchone()[0]
+                free_slots = list(range(used, min(used + len(new_keys), self.capacity)))
+
+                evict_count = min(len(new_keys) - len(free_slots), self.capacity)
+                if evict_count > 0:
+                    victims = self._db.execute(
+                        "SELECT key, slot FROM entries ORDER BY last_used LIMIT ?", (evict_count,)
+                    ).fetchall()
+                    self._db.executemany("DELETE FROM entries WHERE key = ?", [(k,) for k, _ in victims])
+                    free_slots.extend(slot for _, slot in victims)
+
+                now = time.time()
+                rows = []
+                for key, slot in zip(new_keys, free_slots):
+                    self._vectors[slot] = matrix[entries[key]]
+                    rows.append((key, slot, now))
+
+                self._vectors.flush()
+                self._db.executemany("INSERT INTO entries (key, slot, last_used) VALUES (?, ?, ?)", rows)
+                self._db.execute("COMMIT")
+            except Exception:
+                self._db.execute("ROLLBACK")
+                raise
+
+    def stats(self) -> dict:
+        with self._lock:
+            size = self._db.execute("SELECT COUNT(*) FROM entries").fetchone()[0]
+            lookups = self.hits + self.misses
+            return {
+                "model": self.model_name,
+                "entries": size,
+                "capacity": self.capacity,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            }
+
+
+def _slug(model_name: str) -> str:
+    return re.sub(r"[^A-Za-z0-9]+", "-", model_name).strip("-")
+
+
+def _dimension_path(directory: str, model_name: str) -> str:
+    return os.path.join(directory, f"{_slug(model_name)}.dim")
+
+
+def _record_dimension(directory: str, model_name: str, dim: int):
+    path = _dimension_path(directory, model_name)
+    if recorded_dimension(model_name, directory) == dim:
+        return
+    temp = f"{path}.{os.getpid()}.tmp"
+    with open(temp, "w") as f:
+        f.write(str(dim))
+    os.replace(temp, path)
+
+
+def recorded_dimension(model_name: str, directory: str = None):
+    """The model's embedding dimension as recorded by its cache, or None."""
+    try:
+        with open(_dimension_path(directory or EMBEDDING_CACHE_DIR, model_name)) as f:
+            return int(f.read())
+    except (OSError, ValueError):
+        return None
+
+
+def get_embedding_cache(model_name: str, dim: int = None):
+    """
+    Shared cache for one model, or None when EMBEDDING_CACHE_ENABLED is off.
+    Without `dim`, the dimension recorded by an earlier cache is used (None
+    if there is none yet), so the model does not have to be loaded.
+    """
+    if not EMBEDDING_CACHE_ENABLED:
+        return None
+    if dim is None:
+        dim = recorded_dimension(model_name)
+        if dim is None:
+            return None
+
+    def _create():
+        return EmbeddingCache(
+            directory=EMBEDDING_CACHE_DIR,
+            model_name=model_name,
+            dim=dim,
+            capacity=EMBEDDING_CACHE_CAPACITY,
+            dtype=EMBEDDING_CACHE_DTYPE,
+        )
+
+    return resources.get_or_create(f"embedding_cache:{model_name}", _create)
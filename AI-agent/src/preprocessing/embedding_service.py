@@ -1,11 +1,89 @@
 import os
+import numpy as np
 from dotenv import load_dotenv
-from pinecone import Pinecone, ServerlessSpec
-from sentence_transformers import SentenceTransformer
+
+from src import metrics, resources
+from src.config import (
+    CHUNK_MAX_TOKENS,
+    CHUNK_OVERLAP_TOKENS,
+    EMBEDDING_MODEL_NAME,
+    EMBEDDING_BATCH_SIZE,
+    VECTOR_STORE_BACKEND,
+)
+from src.preprocessing.embedding_cache import get_embedding_cache
+from src.preprocessing.text_chunker import iter_token_chunks, model_max_tokens, model_token_spans
+from src.vectorstore.pinecone_client import get_pinecone_client
+from src.vectorstore.store import get_vector_store
+from src.vectorstore.bulk_upsert import bulk_upsert
+from src.vectorstore.sync import store_document
 
 # Load environment variables
 load_dotenv()
 
+
+def _load_embedding_model():
+    from sentence_transformers import SentenceTransformer
+    return SentenceTransformer(EMBEDDING_MODEL_NAME)
+
+
+resources.register("embedding_model", _load_embedding_model)
+
+
+def encode_batch(model, texts, batch_size: int = EMBEDDING_BATCH_SIZE, cache=None) -> np.ndarray:
+    """
+    Encodes a list of strings with a SentenceTransformer in batches.
+
+    Returns a contiguous float32 matrix with one row per input. Empty or
+    whitespace-only strings are not sent to the model and get an all-zero row,
+    so row i always belongs to texts[i]. With an EmbeddingCache, cached texts
+    are served from it and only the misses go through the model.
+
+    :param model: the SentenceTransformer, or a callable returning it; with a
+                  cache, it is only called when some text is not cached
+    """
+    load_model = (lambda: model) if hasattr(model, "encode") else model
+
+    texts = list(texts)
+    dim = cache.dim if cache is not None else load_model().get_sentence_embedding_dimension()
+    matrix = np.zeros((len(texts), dim), dtype=np.float32)
+
+    positions = [i for i, t in enumerate(texts) if t and t.strip()]
+
+    if cache is not None and positions:
+        cached = cache.lookup([texts[i] for i in positions])
+        for j, vector in cached.items():
+            matrix[positions[j]] = vector
+        positions = [p for j, p in enumerate(positions) if j not in cached]
+
+    if positions:
+        missing = [texts[i] for i in positions]
+        with metrics.stage("embedding"):
+            encoded = load_model().encode(
+                missing,
+                batch_size=batch_size,
+                convert_to_numpy=True,
+                show_progress_bar=False,
+            )
+        matrix[positions] = encoded
+
+        if cache is not None:
+            cache.store(missing, encoded)
+
+    return matrix
+
+
+def embed_cached(model_name: str, load_model, texts, batch_size: int = EMBEDDING_BATCH_SIZE) -> np.ndarray:
+    """
+    encode_batch() through the model's shared cache. `load_model()` is only
+    called for cache misses, or to learn the dimension of a model that has
+    never been cached.
+    """
+    cache = get_embedding_cache(model_name)
+    if cache is None:
+        cache = get_embedding_cache(model_name, load_model().get_sentence_embedding_dimension())
+    return encode_batch(load_model, texts, batch_size, cache=cache)
+
+
 class EmbeddingService:
     def __init__(self):
         # Load keys from .env
@@ -13,23 +91,31 @@ class EmbeddingService:
         self.index_name = os.getenv("PINECONE_INDEX_NAME", "syllabus-index")
         self.environment = os.getenv("PINECONE_ENVIRONMENT", "us-east-1")
 
-        if not self.api_key:
+        if not self.api_key and VECTOR_STORE_BACKEND == "pinecone":
             raise ValueError("❌ PINECONE_API_KEY is missing in .env")
 
-        # Initialize embedding model
-        self.embedding_model = SentenceTransformer("sentence-transformers/all-mpnet-base-v2")
+    # ----------- Lazily Loaded Resources ---------------
+    @property
+    def embedding_model(self):
+        return resources.get("embedding_model")
 
-        # Initialize Pinecone client
-        self.pc = Pinecone(api_key=self.api_key)
+    @property
+    def pc(self):
+        return get_pinecone_client()
 
-        # Create index if not exists
-        self._setup_index()
+    @property
+    def index(self):
+        # Configured vector store; for Pinecone the index is created if missing
+        # and connected once per process
+        return get_vector_store(self.index_name, self._connect_index)
 
-        # Connect to the index
-        self.index = self.pc.Index(self.index_name)
+    def _connect_index(self):
+        self._setup_index()
+        return self.pc.Index(self.index_name)
 
     # ----------- Create Index If Missing ---------------
     def _setup_index(self):
+        from pinecone import ServerlessSpec
 
         existing_indexes = [i["name"] for i in self.pc.list_indexes()]
 
@@ -54,27 +140,87 @@ class EmbeddingService:
         print("✅ Index created successfully!")
 
     # ----------- Create Embeddings ---------------
+    def embed_batch(self, texts: list[str], batch_size: int = None) -> np.ndarray:
+        """
+        Embeds many texts at once; see encode_batch() for the empty-string rule.
+        When every text is cached the model is not loaded.
+        """
+        return embed_cached(EMBEDDING_MODEL_NAME, lambda: self.embedding_model, texts,
+                            batch_size or EMBEDDING_BATCH_SIZE)
+
     def embed_text(self, text: str):
         if not text.strip():
             return None
 
-        embedding = self.embedding_model.encode(text).tolist()
+        embedding = self.embed_batch([text])[0].tolist()
         return embedding
 
     # ----------- Insert into Pinecone ------------
     def upsert_chunk(self, chunk_id: str, text: str):
-        vector = self.embed_text(text)
-
-        if vector is None:
+        if not text.strip():
             print("⚠️ Empty text chunk skipped")
             return
 
-        self.index.upsert([
-            {"id": chunk_id, "values": vector, "metadata": {"text": text}}
-        ])
+        self.upsert_chunks([(chunk_id, text)])
 
         print(f"📌 Upserted chunk → {chunk_id}")
 
+    def upsert_chunks(self, chunks):
+        """
+        Embeds and upserts many (chunk_id, text) pairs through the bulk-write
+        pipeline. Empty chunks are skipped. Returns throughput stats.
+        """
+        items = (
+            {"id": chunk_id, "text": text, "metadata": {"text": text}}
+            for chunk_id, text in chunks
+        )
+        return bulk_upsert(self.index, items, embed_fn=self.embed_batch)
+
+    def iter_chunks(self, pages, max_tokens: int = None, overlap: int = CHUNK_OVERLAP_TOKENS):
+        """
+        Streams token-aware chunks of `pages` sized for this service's model,
+        so no chunk is truncated at encode time. Boundaries are
+        content-defined (between 2/3 and all of `max_tokens`), so editing a
+        document leaves the chunks away from the edit unchanged.
+        """
+        model = self.embedding_model
+        limit = model_max_tokens(model)
+        max_tokens = min(max_tokens or CHUNK_MAX_TOKENS or limit, limit)
+        return iter_token_chunks(
+            pages,
+            token_spans=model_token_spans(model),
+            max_tokens=max_tokens,
+            overlap=overlap,
+            min_tokens=max_tokens * 2 // 3,
+        )
+
+    def upsert_document(self, doc_id: str, pages, metadata: dict = None, progress=None, sync: bool = True):
+        """
+        Chunks, embeds and upserts a whole document; chunks are streamed and
+        embedded group by group, so neither the text nor the vectors ever all
+        sit in memory (sync keeps only the document's chunk ids).
+
+        Chunks get content-hash ids scoped to `doc_id` and made from their
+        text and `metadata` only; offsets and page spans are stored with the
+        vector but left out of the id, so a chunk that merely moved keeps its
+        id (and its stored offsets are those of the upload that wrote it).
+        With `sync`, only chunks not stored yet are embedded and written and
+        the document's stale chunks are deleted (src.vectorstore.sync).
+
+        :param pages: iterable of page strings or (page_number, text) pairs,
+                      e.g. PDFReader().iter_pages(path); read lazily
+        :return: {"kept", "upserted", "deleted"}
+        """
+        items = (
+            {
+                "text": chunk.text,
+                "metadata": {**(metadata or {}), "doc": doc_id, "text": chunk.text},
+                "location": chunk.metadata(),
+            }
+            for chunk in self.iter_chunks(pages)
+        )
+        return store_document(self.index, doc_id, items, embed_fn=self.embed_batch, sync=sync, progress=progress)
+
     # ----------- Semantic Search -----------------
     def search(self, query: str, top_k=5):
         query_vector = self.embed_text(query)
@@ -86,3 +232,8 @@ class EmbeddingService:
         )
 
         return results
+
+
+def get_embedding_service() -> EmbeddingService:
+    """Process-wide EmbeddingService, created on first use."""
+    return resources.get_or_create("embedding_service", EmbeddingService)
@@ -2,6 +2,21 @@ import pdfplumber
 import os
 from typing import List
 
+from src import metrics
+from src.pdf.page_pool import should_shard, map_page_ranges
+
+
+def _read_page_range(file_path: str, start: int, end: int) -> List[str]:
+    """
+    Extracts cleaned text for pages [start, end). Runs inside page-pool workers.
+    """
+    texts = []
+    with pdfplumber.open(file_path) as pdf:
+        for page in pdf.pages[start:end]:
+            text = page.extract_text()
+            texts.append(PDFReader._clean_text(text) if text else "")
+    return texts
+
 
 class PDFReader:
     """
@@ -11,11 +26,13 @@ class PDFReader:
     - Reads multi-page PDFs
     - Handles broken/non-standard PDFs using fallback extraction
     - Removes empty lines automatically
+    - Splits large PDFs into page ranges processed in parallel
     """
 
     def __init__(self):
         pass
 
+    @metrics.timed("pdfplumber")
     def read_pdf(self, file_path: str) -> str:
         """
         Reads a PDF and returns extracted text.
@@ -28,15 +45,22 @@ class PDFReader:
 
         try:
             with pdfplumber.open(file_path) as pdf:
+                page_count = len(pdf.pages)
+                sharded = should_shard(page_count)
                 all_text = []
 
-                for page in pdf.pages:
-                    text = page.extract_text()
-                    if text:
-                        cleaned = self._clean_text(text)
-                        all_text.append(cleaned)
+                if not sharded:
+                    for page in pdf.pages:
+                        text = page.extract_text()
+                        if text:
+                            cleaned = self._clean_text(text)
+                            all_text.append(cleaned)
+
+            if sharded:
+                texts = map_page_ranges(_read_page_range, file_path, page_count)
+                all_text = [t for t in texts if t]
 
-                return "\n".join(all_text)
+            return "\n".join(all_text)
 
         except Exception as e:
             print(f"[PDFReader] pdfplumber failed. Error: {e}")
@@ -44,7 +68,22 @@ class PDFReader:
 
             return self._fallback_extract(file_path)
 
-    def _clean_text(self, text: str) -> str:
+    def iter_pages(self, file_path: str):
+        """
+        Yields (page_number, cleaned text) one page at a time, for streaming
+        consumers such as the token chunker. Empty pages yield "".
+        """
+        if not os.path.exists(file_path):
+            raise FileNotFoundError(f"PDF not found: {file_path}")
+
+        with pdfplumber.open(file_path) as pdf:
+            for number, page in enumerate(pdf.pages, start=1):
+                text = page.extract_text()
+                yield number, self._clean_text(text) if text else ""
+                page.flush_cache()  # drop parsed layout objects of this page
+
+    @staticmethod
+    def _clean_text(text: str) -> str:
         """
         Removes unnecessary empty lines.
         """
@@ -1 +1 @@
-from vectorstore.pinecone_handler import store_sections
+from src.vectorstore.pinecone_handler import store_sections
@@ -2,8 +2,20 @@
 """
 Splits cleaned text into small, meaningful chunks
 for better embedding + retrieval quality.
+
+`iter_token_chunks` is the streaming variant used for indexing: it sizes
+chunks in tokens of the embedding model (so nothing is silently truncated),
+consumes pages lazily and yields TextChunk records that point into the page
+strings instead of copying them. With `min_tokens` its chunk boundaries are
+content-defined, so an edit only changes the chunks around it.
 """
 
+import re
+import zlib
+
+_WORD = re.compile(r"\S+")
+
+
 def chunk_text(text, chunk_size=300, overlap=50):
     """
     Splits text into chunks with overlap.
@@ -37,6 +49,164 @@ def chunk_text(text, chunk_size=300, overlap=50):
     return chunks
 
 
+# ------------------------------------------------
+# 🔹 Token-aware streaming chunks
+# ------------------------------------------------
+class TextChunk:
+    """
+    One chunk of a document, stored as offsets.
+
+    char_start/char_end are offsets into the document as if its pages were
+    joined with "\\n"; page_start/page_end are the page numbers it spans.
+    `text` is only built when asked for.
+    """
+
+    __slots__ = ("index", "char_start", "char_end", "page_start", "page_end", "n_tokens", "_segments")
+
+    def __init__(self, index, char_start, char_end, page_start, page_end, n_tokens, segments):
+        self.index = index
+        self.char_start = char_start
+        self.char_end = char_end
+        self.page_start = page_start
+        self.page_end = page_end
+        self.n_tokens = n_tokens
+        self._segments = segments  # [(page_text, start, end)], references only
+
+    @property
+    def text(self) -> str:
+        return "\n".join(page_text[start:end] for page_text, start, end in self._segments)
+
+    def metadata(self) -> dict:
+        return {
+            "char_start": self.char_start,
+            "char_end": self.char_end,
+            "page_start": self.page_start,
+            "page_end": self.page_end,
+            "tokens": self.n_tokens,
+        }
+
+
+def whitespace_token_spans(text: str):
+    """(start, end) of every whitespace-separated word; a tokenizer-free fallback."""
+    return [m.span() for m in _WORD.finditer(text)]
+
+
+def model_token_spans(model):
+    """
+    Token-span function for a SentenceTransformer, using its (fast) tokenizer's
+    offset mapping. Special tokens are not included.
+    """
+    tokenizer = model.tokenizer
+
+    def spans(text: str):
+        encoded = tokenizer(
+            text,
+            add_special_tokens=False,
+            return_offsets_mapping=True,
+            verbose=False,
+        )
+        return [(start, end) for start, end in encoded["offset_mapping"] if end > start]
+
+    return spans
+
+
+def model_max_tokens(model) -> int:
+    """Tokens that fit in one forward pass, leaving room for [CLS]/[SEP]."""
+    return max(1, model.max_seq_length - 2)
+
+
+def iter_token_chunks(pages, token_spans=whitespace_token_spans, max_tokens: int = 256, overlap: int = 32,
+                      min_tokens: int = None):
+    """
+    Yields TextChunks of at most `max_tokens` tokens, consecutive chunks
+    sharing `overlap` tokens. Chunks may cross page boundaries.
+
+    Without `min_tokens` every chunk has `max_tokens` tokens, so inserting a
+    word shifts every later chunk. With it, a chunk ends at the first "cut"
+    token (picked by a hash of the token's text) once it has `min_tokens`
+    tokens, or at `max_tokens` if none comes: after an edit the boundaries
+    fall back on the same cut tokens within a chunk or two, and the chunks
+    after that are unchanged.
+
+    :param pages: iterable of page strings or (page_number, text) pairs;
+                  consumed lazily, one page at a time
+    :param token_spans: callable(text) -> [(start, end)] character spans of
+                        the tokens, e.g. model_token_spans(model)
+    :param min_tokens: smallest content-defined chunk (raised above `overlap`)
+    """
+    overlap = max(0, min(overlap, max_tokens - 1))
+    if min_tokens is not None:
+        min_tokens = max(overlap + 1, min(min_tokens, max_tokens))
+        # ~1 cut per `spacing` tokens: few chunks run to max_tokens without one
+        spacing = max(2, (max_tokens - min_tokens) // 3)
+
+    window = []  # (page_slot, start, end, is_cut) per token
+    page_info = {}  # page_slot -> (page_number, text, document offset)
+    fresh = 0  # tokens in the window not yet emitted
+    index = 0
+    offset = 0
+
+    def next_chunk_size():
+        """Tokens in the next chunk, or 0 while more tokens are needed."""
+        if min_tokens is not None:
+            for i in range(min_tokens - 1, min(len(window), max_tokens)):
+                if window[i][3]:
+                    return i + 1
+        return max_tokens if len(window) >= max_tokens else 0
+
+    def emit(count):
+        first_slot, first_start, _, _ = window[0]
+        last_slot, _, last_end, _ = window[count - 1]
+
+        segments = []
+        for slot in range(first_slot, last_slot + 1):
+            _, text, _ = page_info[slot]
+            start = first_start if slot == first_slot else 0
+            end = last_end if slot == last_slot else len(text)
+            segments.append((text, start, end))
+
+        return TextChunk(
+            index=index,
+            char_start=page_info[first_slot][2] + first_start,
+            char_end=page_info[last_slot][2] + last_end,
+            page_start=page_info[first_slot][0],
+            page_end=page_info[last_slot][0],
+            n_tokens=count,
+            segments=segments,
+        )
+
+    for slot, page in enumerate(pages):
+        page_number, text = page if isinstance(page, tuple) else (slot + 1, page)
+        page_info[slot] = (page_number, text, offset)
+        offset += len(text) + 1
+
+        spans = token_spans(text) if text else []
+        if min_tokens is None:
+            window.extend((slot, start, end, False) for start, end in spans)
+        else:
+            window.extend(
+                (slot, start, end, zlib.crc32(text[start:end].encode("utf-8")) % spacing == 0)
+                for start, end in spans
+            )
+        fresh += len(spans)
+
+        count = next_chunk_size()
+        while count:
+            yield emit(count)
+            index += 1
+            del window[:count - overlap]
+            fresh = len(window) - overlap
+            count = next_chunk_size()
+
+        # Forget pages no token in the window points into any more
+        oldest = window[0][0] if window else slot + 1
+        for old in [s for s in page_info if s < oldest]:
+            del page_info[old]
+
+    if window and fresh > 0:
+        yield emit(len(window))
+
+
 if __name__ == "__main__":
     sample_text = "This is a sample text to test chunking logic. " * 20
     chunks = chunk_text(sample_text)
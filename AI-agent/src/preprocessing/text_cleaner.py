@@ -1,5 +1,41 @@
 import re
-from typing import List
+from typing import Iterable, Iterator
+
+
+# ----------------------------------------------------
+# Patterns (compiled once)
+# ----------------------------------------------------
+
+# Standalone page numbers like 'Page 1', '1', '-1-', '1 / 10'. These run in
+# order, one after another: a later pattern may match a line an earlier one
+# has just emptied.
+#
+# 'Page' is matched without a leading \b so the regex engine can jump between
+# occurrences of the literal; the word boundary is checked in _drop_page_word.
+_PAGE_WORD = re.compile(r"Page\s*\d+\b")
+_PAGE_BARE = re.compile(r"^\s*\d+\s*$", re.MULTILINE)
+_PAGE_DASHED = re.compile(r"^\s*-\d+-\s*$", re.MULTILINE)
+_PAGE_FRACTION = re.compile(r"^\s*\d+\s*/\s*\d+\s*$", re.MULTILINE)
+_WORD_CHAR = re.compile(r"\w")
+
+# Bullets •, *, –, ●, ▪, → become '-' ('-' itself is left alone instead of
+# being rewritten to itself); then any other non-text symbol becomes a space
+_BULLETS = re.compile(r"[•\*\–\●\▪\→]")
+_SYMBOLS = re.compile(r"[^\w\s\.\,\-\:\;\(\)\[\]\/]")
+
+# Whitespace runs -> one space; a space after a period followed by a letter.
+# After the first rule no run of two or more newlines is left, so the old
+# '\n{2,}' pass never changed anything and is gone.
+_SPACE_RUNS = re.compile(r"\s{2,}")
+_PERIOD_LETTER = re.compile(r"\.(?=[A-Za-z])")
+
+
+def _drop_page_word(match) -> str:
+    # Same as a leading \b: 'Page' must not follow a word character
+    start = match.start()
+    if start and _WORD_CHAR.match(match.string, start - 1):
+        return match.group()
+    return ""
 
 
 class TextCleaner:
@@ -27,10 +63,17 @@ class TextCleaner:
         text = self._fix_bullets(text)
         text = self._remove_weird_symbols(text)
         text = self._normalize_spaces(text)
-        text = self._remove_multiple_newlines(text)
 
         return text.strip()
 
+    def clean_iter(self, pages: Iterable[str]) -> Iterator[str]:
+        """
+        Cleans page-by-page input lazily, yielding clean(page) for each page,
+        so memory stays bounded by the largest page.
+        """
+        for page in pages:
+            yield self.clean(page)
+
     # ----------------------------------------------------
     # Cleaning utilities
     # ----------------------------------------------------
@@ -40,15 +83,14 @@ class TextCleaner:
         Removes standalone page numbers like:
         'Page 1', '1', '-1-', '1 / 10'
         """
-        patterns = [
-            r"\bPage\s*\d+\b",
-            r"^\s*\d+\s*$",
-            r"^\s*-\d+-\s*$",
-            r"^\s*\d+\s*/\s*\d+\s*$"
-        ]
-
-        for pattern in patterns:
-            text = re.sub(pattern, "", text, flags=re.MULTILINE)
+        # Patterns needing a literal the text does not contain are skipped
+        if "Page" in text:
+            text = _PAGE_WORD.sub(_drop_page_word, text)
+        text = _PAGE_BARE.sub("", text)
+        if "-" in text:
+            text = _PAGE_DASHED.sub("", text)
+        if "/" in text:
+            text = _PAGE_FRACTION.sub("", text)
 
         return text
 
@@ -57,28 +99,21 @@ class TextCleaner:
         Standardizes bullet points:
         •, -, –, *, →  become '-'
         """
-        bullet_symbols = r"[•\*\-\–\●\▪\→]"
-        return re.sub(bullet_symbols, "-", text)
+        return _BULLETS.sub("-", text)
 
     def _remove_weird_symbols(self, text: str) -> str:
         """
         Removes non-text symbols but keeps useful characters.
         """
-        text = re.sub(r"[^\w\s\.\,\-\:\;\(\)\[\]\/]", " ", text)
-        return text
+        return _SYMBOLS.sub(" ", text)
 
     def _normalize_spaces(self, text: str) -> str:
         """
         Fixes spacing issues like:
-        - double spaces
+        - double spaces and blank lines
         - missing spaces after punctuation
         """
-        text = re.sub(r"\s{2,}", " ", text)
-        text = re.sub(r"\.(?=[A-Za-z])", ". ", text)
+        text = _SPACE_RUNS.sub(" ", text)
+        if "." in text:
+            text = _PERIOD_LETTER.sub(". ", text)
         return text
-
-    def _remove_multiple_newlines(self, text: str) -> str:
-        """
-        Converts long blank spaces to a single newline.
-        """
-        return re.sub(r"\n{2,}", "\n", text)
@@ -0,0 +1,151 @@
+"""
+Bounded processing stage for CPU-bound request work.
+
+Route handlers hand blocking work (fitz, spaCy, scikit-learn, sentence
+transformers, scheduling) to `processing_stage.run(fn, ...)`, which runs it
+on a thread or process executor so the event loop keeps serving other
+requests. At most PROCESSING_MAX_CONCURRENCY calls run at once; up to
+PROCESSING_MAX_QUEUE more may wait for a slot. Beyond that requests are
+rejected right away with 429, and a request that waits longer than
+PROCESSING_QUEUE_TIMEOUT gets a 503.
+
+A slot is held until the work itself finishes on the executor, not until the
+awaiting request does: a cancelled request (client gone, /generate-batch
+stopping its groups) keeps its slot while its call is still running.
+
+Outside this limit, each with its own bound:
+- the embedding batcher runs one batched encode at a time on the loop's
+  default executor (src.preprocessing.embedding_batcher);
+- background jobs run on JOB_WORKERS threads of their own (src.jobs.manager).
+"""
+
+import asyncio
+import contextvars
+import functools
+import threading
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+from fastapi import HTTPException
+
+from src.config import (
+    PROCESSING_EXECUTOR,
+    PROCESSING_MAX_CONCURRENCY,
+    PROCESSING_MAX_QUEUE,
+    PROCESSING_QUEUE_TIMEOUT,
+)
+
+
+class ProcessingStage:
+
+    def __init__(self, max_concurrency: int, max_queue: int, queue_timeout: float, executor_kind: str = "thread"):
+        self.max_concurrency = max(1, max_concurrency)
+        self.max_queue = max(0, max_queue)
+        self.queue_timeout = queue_timeout
+        self.executor_kind = executor_kind
+
+        self._executor = None
+        self._executor_lock = threading.Lock()
+        self._loop = None
+        self._slots = None
+
+        self.running = 0
+        self.waiting = 0
+        self.completed = 0
+        self.rejected = 0
+        self.timed_out = 0
+
+    @property
+    def executor(self):
+        with self._executor_lock:
+            if self._executor is None:
+                if self.executor_kind == "process":
+                    self._executor = ProcessPoolExecutor(max_workers=self.max_concurrency)
+                else:
+                    self._executor = ThreadPoolExecutor(
+                        max_workers=self.max_concurrency, thread_name_prefix="processing"
+                    )
+            return self._executor
+
+    def _semaphore(self):
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            self._loop = loop
+            self._slots = asyncio.Semaphore(self.max_concurrency)
+        return self._slots
+
+    async def run(self, fn, *args, **kwargs):
+        """
+        Runs fn(*args, **kwargs) on the executor once a slot is free.
+        With the process executor, `fn` and its arguments must be picklable.
+        """
+        slots = self._semaphore()
+
+        if self.running + self.waiting >= self.max_concurrency + self.max_queue:
+            self.rejected += 1
+            raise HTTPException(
+                status_code=429,
+                detail="Server is busy processing other requests. Please retry shortly.",
+                headers={"Retry-After": "2"},
+            )
+
+        self.waiting += 1
+        try:
+            await asyncio.wait_for(slots.acquire(), timeout=self.queue_timeout)
+        except asyncio.TimeoutError:
+            self.timed_out += 1
+            raise HTTPException(
+                status_code=503,
+                detail="Timed out waiting for a processing slot. Please retry later.",
+                headers={"Retry-After": "5"},
+            )
+        finally:
+            self.waiting -= 1
+
+        self.running += 1
+        try:
+            loop = asyncio.get_running_loop()
+            call = functools.partial(fn, *args, **kwargs)
+            if self.executor_kind != "process":
+                # Carry the request's context (metrics stage timings) into the thread
+                call = functools.partial(contextvars.copy_context().run, call)
+            future = loop.run_in_executor(self.executor, call)
+        except BaseException:
+            self._release(slots)
+            raise
+
+        # Free the slot when the call finishes, even if this request is cancelled first
+        future.add_done_callback(lambda done: self._release(slots, done))
+        return await asyncio.shield(future)
+
+    def _release(self, slots, done=None):
+        if done is not None and not done.cancelled():
+            done.exception()  # retrieved here in case the awaiting request is gone
+        self.running -= 1
+        self.completed += 1
+        slots.release()
+
+    def stats(self) -> dict:
+        return {
+            "executor": self.executor_kind,
+            "max_concurrency": self.max_concurrency,
+            "max_queue": self.max_queue,
+            "running": self.running,
+            "waiting": self.waiting,
+            "completed": self.completed,
+            "rejected": self.rejected,
+            "timed_out": self.timed_out,
+        }
+
+    def shutdown(self):
+        with self._executor_lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=False, cancel_futures=True)
+                self._executor = None
+
+
+processing_stage = ProcessingStage(
+    max_concurrency=PROCESSING_MAX_CONCURRENCY,
+    max_queue=PROCESSING_MAX_QUEUE,
+    queue_timeout=PROCESSING_QUEUE_TIMEOUT,
+    executor_kind=PROCESSING_EXECUTOR,
+)
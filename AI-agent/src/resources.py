@@ -0,0 +1,90 @@
+"""
+Lazy registry for heavy, process-wide resources.
+
+Modules register a factory for each expensive object (spaCy pipeline,
+SentenceTransformer models, Pinecone clients and indexes) at import time,
+which is cheap. The object itself is built once, on first `get()`, and then
+shared. `warm_up()` can build a set of resources in a background thread so
+the first real request does not pay for it.
+"""
+
+import threading
+import time
+
+_factories = {}
+_instances = {}
+_locks = {}
+_registry_lock = threading.Lock()
+
+# Seconds spent building each resource, filled in as they load
+load_times = {}
+
+
+def register(name: str, factory):
+    """Registers (or replaces) the factory for a resource. Does not build it."""
+    with _registry_lock:
+        _factories[name] = factory
+        _locks.setdefault(name, threading.Lock())
+
+
+def get(name: str):
+    """Returns the resource, building it on first use."""
+    instance = _instances.get(name)
+    if instance is not None:
+        return instance
+
+    with _registry_lock:
+        if name not in _factories:
+            raise KeyError(f"Unknown resource: {name}")
+        lock = _locks[name]
+
+    with lock:
+        instance = _instances.get(name)
+        if instance is None:
+            started = time.perf_counter()
+            instance = _factories[name]()
+            load_times[name] = round(time.perf_counter() - started, 3)
+            _instances[name] = instance
+            print(f"✅ Loaded {name} in {load_times[name]}s")
+        return instance
+
+
+def get_or_create(name: str, factory):
+    """Registers `factory` under `name` if nothing is registered yet, then gets it."""
+    with _registry_lock:
+        if name not in _factories:
+            _factories[name] = factory
+            _locks[name] = threading.Lock()
+    return get(name)
+
+
+def is_loaded(name: str) -> bool:
+    return name in _instances
+
+
+def registered() -> list:
+    with _registry_lock:
+        return list(_factories)
+
+
+def warm_up(names=None, background: bool = True):
+    """
+    Builds the named resources (all registered ones if `names` is None).
+    Failures are logged and do not stop the remaining resources.
+    """
+    names = list(names) if names is not None else registered()
+
+    def _run():
+        for name in names:
+            try:
+                get(name)
+            except Exception as e:
+                print(f"⚠️ Warm-up of {name} failed: {e}")
+
+    if not background:
+        _run()
+        return None
+
+    thread = threading.Thread(target=_run, name="resource-warmup", daemon=True)
+    thread.start()
+    return thread
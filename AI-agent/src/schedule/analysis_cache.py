@@ -0,0 +1,175 @@
+"""
+Content-addressed cache for PDF analysis results.
+
+Entries are keyed by the SHA-256 of the PDF bytes and hold the extracted
+headings, full text, technical terms and difficulty scores. Lookups hit a
+small in-memory LRU first and fall back to gzip'd JSON files on disk; the
+disk tier evicts least recently used files once it grows past its byte
+budget.
+"""
+
+import gzip
+import hashlib
+import json
+import os
+import threading
+from collections import OrderedDict
+
+from src.config import (
+    ANALYSIS_CACHE_DIR,
+    ANALYSIS_CACHE_MEMORY_ITEMS,
+    ANALYSIS_CACHE_MAX_BYTES,
+)
+
+# Bump when extraction or scoring changes so stale entries are ignored
+CACHE_VERSION = "v5"
+
+
+class AnalysisCache:
+
+    def __init__(self, directory: str, max_memory_items: int, max_disk_bytes: int):
+        self.directory = directory
+        self.max_memory_items = max_memory_items
+        self.max_disk_bytes = max_disk_bytes
+
+        self._memory = OrderedDict()
+        self._lock = threading.Lock()
+        self._disk_bytes = None  # computed lazily from the directory
+
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def key_for(pdf_bytes: bytes) -> str:
+        return AnalysisCache.key_for_digest(hashlib.sha256(pdf_bytes).hexdigest())
+
+    @staticmethod
+    def key_for_digest(digest: str) -> str:
+        """Key for content whose SHA-256 hex digest is already known."""
+        return f"{CACHE_VERSION}-{digest}"
+
+    # ----------- Lookup ---------------
+    def get(self, key: str):
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                self._memory.move_to_end(key)
+                self.memory_hits += 1
+                return entry
+
+        entry = self._read_disk(key)
+
+        with self._lock:
+            if entry is None:
+                self.misses += 1
+                return None
+            self.disk_hits += 1
+            self._remember(key, entry)
+            return entry
+
+    def put(self, key: str, entry: dict):
+        with self._lock:
+            self._remember(key, entry)
+        self._write_disk(key, entry)
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.memory_hits + self.disk_hits + self.misses
+            hits = self.memory_hits + self.disk_hits
+            return {
+                "memory_hits": self.memory_hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "hit_rate": round(hits / lookups, 4) if lookups else 0.0,
+                "memory_items": len(self._memory),
+                "disk_bytes": self._disk_bytes or 0,
+            }
+
+    # ----------- Memory tier ---------------
+    def _remember(self, key, entry):
+        self._memory[key] = entry
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_memory_items:
+            self._memory.popitem(last=False)
+
+    # ----------- Disk tier ---------------
+    def _path(self, key):
+        return os.path.join(self.directory, f"{key}.json.gz")
+
+    def _read_disk(self, key):
+        path = self._path(key)
+        try:
+            with gzip.open(path, "rt", encoding="utf-8") as f:
+                entry = json.load(f)
+            os.utime(path)  # mark as recently used for eviction
+            return entry
+        except (OSError, ValueError):
+            return None
+
+    def _write_disk(self, key, entry):
+        if self.max_disk_bytes <= 0:
+            return
+
+        os.makedirs(self.directory, exist_ok=True)
+        path = self._path(key)
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+
+        try:
+            old_size = os.path.getsize(path) if os.path.exists(path) else 0
+            with gzip.open(tmp_path, "wt", encoding="utf-8") as f:
+                json.dump(entry, f)
+            os.replace(tmp_path, path)
+            new_size = os.path.getsize(path)
+        except OSError as e:
+            print(f"[AnalysisCache] Failed to write {key}: {e}")
+            return
+
+        with self._lock:
+            if self._disk_bytes is None:
+                self._disk_bytes = self._scan_disk_bytes()
+            else:
+                self._disk_bytes += new_size - old_size
+
+            if self._disk_bytes > self.max_disk_bytes:
+                self._evict_disk()
+
+    def _scan_disk_bytes(self):
+        total = 0
+        for name in os.listdir(self.directory):
+            if name.endswith(".json.gz"):
+                total += os.path.getsize(os.path.join(self.directory, name))
+        return total
+
+    def _evict_disk(self):
+        files = []
+        for name in os.listdir(self.directory):
+            if not name.endswith(".json.gz"):
+                continue
+            path = os.path.join(self.directory, name)
+            try:
+                st = os.stat(path)
+            except OSError:
+                continue
+            files.append((st.st_mtime, st.st_size, path))
+
+        files.sort()
+        total = sum(size for _, size, _ in files)
+
+        for _, size, path in files:
+            if total <= self.max_disk_bytes:
+                break
+            try:
+                os.remove(path)
+                total -= size
+            except OSError:
+                pass
+
+        self._disk_bytes = total
+
+
+analysis_cache = AnalysisCache(
+    directory=ANALYSIS_CACHE_DIR,
+    max_memory_items=ANALYSIS_CACHE_MEMORY_ITEMS,
+    max_disk_bytes=ANALYSIS_CACHE_MAX_BYTES,
+)
@@ -0,0 +1,219 @@
+"""
+Availability calendars compiled to capacity arrays.
+
+The free-text `availability` ("Mon-Fri 9AM-5PM, Weekends flexible") and
+`studyTime` ("3 hours/day", "15 hours/week") strings are compiled once per
+distinct string into a weekly pattern: the study hours available on each
+weekday (Mon=0 .. Sun=6). `capacity_array()` tiles that pattern over a
+planning horizon as a NumPy array, which the scheduling engine packs topics
+into with cumulative sums instead of a day-by-day Python loop.
+
+Parsing rules, per comma/semicolon separated clause:
+- days: "Mon", "Mon-Fri", "Tue to Thu", "weekdays", "weekends", "daily"
+- a time window ("9AM-5PM", "18:00-21:00", "7-9pm") or an hour count
+  ("4 hours") caps those days; "flexible"/"free"/"anytime" leaves them
+  uncapped; "off"/"busy"/"unavailable" makes them 0
+- a clause with days but nothing else shares the next clause's window
+  ("Mon, Wed 6-8pm"); a window without days applies to every day
+- once any day is named, days never named are unavailable; a string with
+  nothing recognisable means every day is available
+"""
+
+import re
+from datetime import date, datetime
+from functools import lru_cache
+from typing import Optional
+
+import numpy as np
+
+from src.config import DEFAULT_DAILY_HOURS
+
+_DAYS = ["mon", "tue", "wed", "thu", "fri", "sat", "sun"]
+_DAY = r"(mon|tue|wed|thu|fri|sat|sun)(?:day|sday|nesday|rsday|rs|r|s|urday)?\b\.?"
+_DAY_RANGE = re.compile(rf"\b{_DAY}\s*(?:-|–|to|through|thru)\s*{_DAY}", re.IGNORECASE)
+_DAY_SINGLE = re.compile(rf"\b{_DAY}", re.IGNORECASE)
+_DAY_GROUPS = [
+    (re.compile(r"\bweekdays?\b", re.IGNORECASE), range(0, 5)),
+    (re.compile(r"\bweekends?\b", re.IGNORECASE), range(5, 7)),
+    (re.compile(r"\b(daily|every\s*day|everyday|all\s*week)\b", re.IGNORECASE), range(0, 7)),
+]
+
+_TIME = r"(\d{1,2})(?::(\d{2}))?\s*(am|pm)?"
+_WINDOW = re.compile(rf"{_TIME}\s*(?:-|–|to)\s*{_TIME}", re.IGNORECASE)
+_HOURS = re.compile(r"(\d+(?:\.\d+)?)\s*(?:h|hr|hrs|hours?)\b", re.IGNORECASE)
+_FLEXIBLE = re.compile(r"\b(flexible|free|any\s*time|anytime|open)\b", re.IGNORECASE)
+_OFF = re.compile(r"\b(off|busy|unavailable|not\s+available|no\s+study|none)\b", re.IGNORECASE)
+
+_STUDY_TIME = re.compile(
+    r"(\d+(?:\.\d+)?)\s*(h|hr|hrs|hours?|m|min|mins|minutes?)?", re.IGNORECASE
+)
+
+
+# ------------------------------------------------
+# 🔹 Parsing (cached per distinct string)
+# ------------------------------------------------
+def _clock(hour: str, minute: Optional[str], meridiem: Optional[str]) -> float:
+    value = int(hour) % 24 + (int(minute) / 60 if minute else 0)
+    if meridiem:
+        meridiem = meridiem.lower()
+        if meridiem == "pm" and value < 12:
+            value += 12
+        elif meridiem == "am" and value >= 12:
+            value -= 12
+    return value
+
+
+def _window_hours(match) -> float:
+    h1, m1, ap1, h2, m2, ap2 = match.groups()
+    # "7-9pm": the start shares the end's am/pm when that keeps it before the end
+    if ap2 and not ap1:
+        same = _clock(h1, m1, ap2)
+        ap1 = ap2 if same < _clock(h2, m2, ap2) else None
+    start = _clock(h1, m1, ap1)
+    end = _clock(h2, m2, ap2)
+    if end <= start:
+        end += 24  # overnight window
+    return end - start
+
+
+def _clause_days(clause: str) -> set:
+    days = set()
+    for pattern, group in _DAY_GROUPS:
+        if pattern.search(clause):
+            days.update(group)
+
+    for match in _DAY_RANGE.finditer(clause):
+        first = _DAYS.index(match.group(1).lower())
+        last = _DAYS.index(match.group(2).lower())
+        days.update((first + i) % 7 for i in range((last - first) % 7 + 1))
+
+    days.update(_DAYS.index(m.group(1).lower()) for m in _DAY_SINGLE.finditer(clause))
+    return days
+
+
+def _clause_cap(clause: str) -> Optional[float]:
+    """Hours cap a clause sets: float, inf (flexible) or None (nothing said)."""
+    if _OFF.search(clause):
+        return 0.0
+    windows = list(_WINDOW.finditer(clause))
+    if windows:
+        return float(sum(_window_hours(m) for m in windows))
+    hours = _HOURS.search(clause)
+    if hours:
+        return float(hours.group(1))
+    if _FLEXIBLE.search(clause):
+        return float("inf")
+    return None
+
+
+@lru_cache(maxsize=1024)
+def compile_availability(availability: Optional[str]) -> np.ndarray:
+    """
+    Hours the student is free on each weekday (Mon..Sun; inf = uncapped).
+    Read-only; cached per string.
+    """
+    windows = np.full(7, np.nan)
+    pending = set()
+
+    for clause in re.split(r"[,;\n]+", availability or ""):
+        days = _clause_days(clause)
+        cap = _clause_cap(clause)
+
+        if cap is None:
+            pending |= days  # "Mon, Wed 6-8pm": wait for the window
+            continue
+
+        targets = days | pending
+        if not targets:
+            # A window with no days applies to every day not yet described
+            targets = {d for d in range(7) if np.isnan(windows[d])} or set(range(7))
+        for day in targets:
+            # Windows on the same day add up; "off" overrides earlier clauses
+            windows[day] = cap if np.isnan(windows[day]) or cap == 0 else windows[day] + cap
+        pending = set()
+
+    for day in pending:
+        if np.isnan(windows[day]):
+            windows[day] = np.inf
+
+    if np.isnan(windows).all():
+        windows[:] = np.inf  # nothing recognisable: every day is open
+    else:
+        windows[np.isnan(windows)] = 0.0  # days never named are unavailable
+
+    windows = np.minimum(windows, 24.0)
+    windows.setflags(write=False)
+    return windows
+
+
+@lru_cache(maxsize=1024)
+def compile_study_time(study_time: Optional[str]):
+    """
+    (hours, per_week) from "3 hours/day", "90 min", "15 hours/week" or "2";
+    None when no number is given. Cached per string.
+    """
+    match = _STUDY_TIME.search(study_time or "")
+    if match is None:
+        return None
+
+    hours = float(match.group(1))
+    unit = (match.group(2) or "h").lower()
+    if unit.startswith("m"):
+        hours /= 60
+    if hours <= 0:
+        return None
+    return hours, "week" in study_time.lower()
+
+
+@lru_cache(maxsize=1024)
+def weekly_capacity(availability: Optional[str], study_time: Optional[str]) -> np.ndarray:
+    """
+    Study hours to plan on each weekday (Mon..Sun): the study-time budget
+    spread over the free days and capped by each day's free hours.
+    Read-only; cached per (availability, studyTime) pair.
+    """
+    windows = compile_availability(availability)
+    budget = compile_study_time(study_time)
+
+    if budget is None:
+        capacity = np.minimum(windows, DEFAULT_DAILY_HOURS)
+    elif not budget[1]:
+        capacity = np.minimum(windows, budget[0])
+    else:
+        # Weekly total: share it evenly over the free days, handing what a
+        # short day cannot take to the remaining days
+        capacity = np.zeros(7)
+        remaining = budget[0]
+        open_days = windows > 0
+        while remaining > 1e-9 and open_days.any():
+            share = remaining / open_days.sum()
+            room = np.where(open_days, windows - capacity, 0.0)
+            take = np.minimum(room, share)
+            capacity += take
+            remaining -= take.sum()
+            open_days &= (windows - capacity) > 1e-9
+
+    capacity = np.where(np.isfinite(capacity), capacity, 0.0)
+    capacity.setflags(write=False)
+    return capacity
+
+
+# ------------------------------------------------
+# 🔹 Capacity over a planning horizon
+# ------------------------------------------------
+def capacity_array(availability: Optional[str], study_time: Optional[str], start, days: int) -> np.ndarray:
+    """
+    Study hours for each of `days` consecutive days from `start`
+    (a date/datetime), as a float64 array.
+    """
+    weekday = start.weekday() if isinstance(start, (date, datetime)) else 0
+    weekly = np.roll(weekly_capacity(availability, study_time), -weekday)
+    return np.resize(weekly, max(days, 0)).astype(np.float64)
+
+
+def horizon_for(total_hours: float, weekly: np.ndarray, slack_days: int = 7) -> int:
+    """Days needed to fit `total_hours` at this weekly capacity (plus slack)."""
+    per_week = float(weekly.sum())
+    if per_week <= 0:
+        return 0
+    return int(np.ceil(total_hours / per_week * 7)) + slack_days
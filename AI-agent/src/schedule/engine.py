@@ -0,0 +1,189 @@
+"""
+Capacity-aware scheduling engine.
+
+Topics are packed, in order, into each day's available study hours. A topic
+that does not fit in what is left of a day is split and continues on the
+next day. With a deadline (exam date or a fixed number of days), all topic
+hours are scaled down proportionally when they would not fit before it, so
+the plan always ends on time. Day capacities can be uniform or a per-day
+array compiled from the student's availability (see availability.py);
+packing is vectorized over cumulative sums of both.
+"""
+
+import logging
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+from src.config import DEFAULT_DAILY_HOURS, MAX_SCHEDULE_DAYS
+
+logger = logging.getLogger(__name__)
+
+# Hours below this are treated as zero (float noise from splitting/scaling)
+_EPSILON = 1e-9
+
+
+class ScheduleConstraintError(ValueError):
+    """The requested constraints cannot produce a plan (reported as HTTP 422)."""
+
+
+def parse_date(value: Optional[str], default: datetime = None) -> Optional[datetime]:
+    """'YYYY-MM-DD' -> datetime; `default` for a missing or malformed value."""
+    if not value:
+        return default
+    try:
+        return datetime.strptime(value, "%Y-%m-%d")
+    except ValueError:
+        return default
+
+
+def days_until(start: datetime, exam_date: Optional[str]) -> Optional[int]:
+    """
+    Study days from `start` up to (not including) the exam date, or None
+    without an exam date.
+    """
+    exam = parse_date(exam_date)
+    if exam is None:
+        if exam_date:
+            raise ScheduleConstraintError("exam_date must be in YYYY-MM-DD format.")
+        return None
+
+    days = (exam.date() - start.date()).days
+    if days <= 0:
+        raise ScheduleConstraintError("exam_date must be after the start date.")
+    return days
+
+
+def check_horizon(days: int):
+    """Rejects plans longer than MAX_SCHEDULE_DAYS before anything is allocated."""
+    if days > MAX_SCHEDULE_DAYS:
+        raise ScheduleConstraintError(
+            f"The plan would span {days} days; at most {MAX_SCHEDULE_DAYS} are supported. "
+            "Increase the daily study hours."
+        )
+
+
+def pack_sessions(
+    hours: Sequence[float],
+    capacity: Union[float, np.ndarray],
+    max_days: Optional[int] = None,
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Packs topics (given by their hours, in study order) into days.
+
+    Topic i covers [S_i, E_i) on the cumulative-hours axis and day d covers
+    [C_{d-1}, C_d) on the cumulative-capacity axis; a session is their
+    overlap. Both axes are cumulative sums, so the first and last day of
+    every topic come from two searchsorted calls and the sessions from one
+    np.repeat, with no Python loop over days or topics.
+
+    :param capacity: hours per day - one number for every day, or an array
+                     (e.g. availability.capacity_array) whose length is the
+                     deadline
+    :param max_days: deadline in days for a uniform capacity; hours are
+                     compressed to fit if needed
+    :return: (day_index, topic_index, hours) arrays, ordered by day. A topic
+             split across days yields one session per day; a topic with no
+             hours still gets a zero-hour session.
+    :raises ScheduleConstraintError: no capacity, or more than
+             MAX_SCHEDULE_DAYS days would be needed
+    """
+    hours = np.maximum(np.asarray(hours, dtype=np.float64), 0.0)
+    ends = np.cumsum(hours)
+    total = float(ends[-1]) if len(ends) else 0.0
+
+    if np.ndim(capacity) == 0:
+        if capacity <= 0:
+            raise ScheduleConstraintError("Daily study hours must be greater than zero.")
+        days = int(np.ceil(total / capacity * (1 + _EPSILON))) + 1
+        if max_days is not None:
+            # Days past the ones the topics need would stay empty
+            days = min(max_days, days)
+        check_horizon(days)
+        capacity = np.full(max(days, 1), float(capacity))
+    else:
+        check_horizon(len(capacity))
+        capacity = np.maximum(np.asarray(capacity, dtype=np.float64), 0.0)
+
+    bounds = np.cumsum(capacity)
+    available = float(bounds[-1]) if len(bounds) else 0.0
+    if available <= _EPSILON:
+        raise ScheduleConstraintError("The availability leaves no study time before the deadline.")
+
+    if total > available * (1 + _EPSILON):
+        scale = available / total
+        logger.warning("%.1fh of topics exceed the %.1fh available before the deadline; compressing to %.0f%%",
+                       total, available, scale * 100)
+        hours = hours * scale
+        ends = ends * scale
+
+    starts = np.concatenate(([0.0], ends))[:-1]
+    last_day = len(bounds) - 1
+    empty = hours <= _EPSILON
+
+    # First day ending after the topic starts; last day reaching its end
+    first = np.minimum(np.searchsorted(bounds, starts + _EPSILON, side="left"), last_day)
+    last = np.minimum(np.searchsorted(bounds, ends - _EPSILON, side="left"), last_day)
+    last = np.where(empty, first, np.maximum(last, first))
+
+    counts = last - first + 1
+    topics = np.repeat(np.arange(len(hours)), counts)
+    offsets = np.arange(len(topics)) - np.repeat(np.cumsum(counts) - counts, counts)
+    days = np.repeat(first, counts) + offsets
+
+    taken = np.minimum(ends[topics], bounds[days]) - np.maximum(starts[topics], bounds[days] - capacity[days])
+    # Days without capacity inside a topic's span add nothing; drop them
+    keep = (taken > _EPSILON) | empty[topics]
+    taken = np.where(empty[topics], 0.0, taken)
+    return days[keep], topics[keep], taken[keep]
+
+
+def rounded_hours(hours: np.ndarray, ndigits: int = 2) -> List[float]:
+    """
+    Rounds session hours for display by rounding the running total, so
+    rounding errors do not pile up: day totals and the plan total stay exact
+    to `ndigits` even with thousands of small sessions.
+    """
+    running = np.round(np.cumsum(hours), ndigits)
+    return np.round(np.diff(running, prepend=0.0), ndigits).tolist()
+
+
+def resolve_daily_hours(total_hours: float, daily_hours: Optional[float], max_days: Optional[int]) -> float:
+    """
+    Daily capacity when the caller did not give one: spread the total evenly
+    up to the deadline, else DEFAULT_DAILY_HOURS.
+    """
+    if daily_hours:
+        return daily_hours
+    if max_days:
+        return max(total_hours / max_days, _EPSILON)
+    return DEFAULT_DAILY_HOURS
+
+
+def dated_sessions(
+    topics: List[Dict],
+    start: datetime,
+    capacity: Union[float, np.ndarray],
+    max_days: Optional[int] = None,
+) -> List[Dict]:
+    """
+    Packs {"title", "hours", ...} topics and returns
+    {"date", "topic", "hours", ...extra topic fields} rows in date order.
+    """
+    days, indexes, hours = pack_sessions([t["hours"] for t in topics], capacity, max_days)
+
+    dates = {}
+    rows = []
+    for day, index, shown in zip(days.tolist(), indexes.tolist(), rounded_hours(hours)):
+        if day not in dates:
+            dates[day] = (start + timedelta(days=day)).strftime("%Y-%m-%d")
+        item = topics[index]
+        row = {
+            "date": dates[day],
+            "topic": item["title"],
+            "hours": shown,
+        }
+        row.update({k: v for k, v in item.items() if k not in ("title", "hours")})
+        rows.append(row)
+    return rows
@@ -1,8 +1,26 @@
 # am-prasad/ai-study-planner/AI-agent/src/schedule/generator.py
 
+import logging
+import re
 from datetime import datetime, timedelta
 from typing import List, Dict, Any, Optional
 from .schemas import Topic
+from src import metrics
+from src.config import DYNAMIC_TOPIC_HOURS
+from .availability import capacity_array, compile_study_time, horizon_for, weekly_capacity
+from .engine import (
+    ScheduleConstraintError,
+    pack_sessions,
+    rounded_hours,
+    dated_sessions,
+    days_until,
+    parse_date,
+    resolve_daily_hours,
+    check_horizon,
+)
+from .timetable import Timetable
+
+logger = logging.getLogger(__name__)
 
 class ScheduleGenerator:
     """
@@ -10,46 +28,54 @@ class ScheduleGenerator:
     """
 
     @staticmethod
+    @metrics.timed("scheduling")
     def create_schedule(
         topics: List[Any],
         daily_hours: float,
         days: int,
     ) -> List[Dict[str, Any]]:
-        schedule: List[Dict[str, Any]] = []
-        day_count = 1
-
+        """
+        Packs topics into `days` days of `daily_hours` each, splitting topics
+        across days; hours are compressed when they do not fit in `days`.
+        """
+        names = []
+        hours = []
         for topic in topics:
-            if day_count > days:
-                break
-            
             # Handle both Pydantic models and raw dicts
-            name = topic.name if hasattr(topic, 'name') else topic.get('name')
-            hours = getattr(topic, 'hours_required', None) or topic.get('hours_required') or daily_hours
-
-            schedule.append({
-                "day": day_count,
-                "topic": name,
-                "hours": hours,
-            })
-            day_count += 1
-        return schedule
-
+            names.append(topic.name if hasattr(topic, 'name') else topic.get('name'))
+            hours.append(
+                getattr(topic, 'hours_required', None)
+                or (topic.get('hours_required') if isinstance(topic, dict) else None)
+                or daily_hours
+            )
+
+        day_indexes, topic_indexes, allocated = pack_sessions(hours, daily_hours, max_days=days)
+        return [
+            {
+                "day": day + 1,
+                "topic": names[index],
+                "hours": shown,
+            }
+            for day, index, shown in zip(day_indexes.tolist(), topic_indexes.tolist(), rounded_hours(allocated))
+        ]
+
+@metrics.timed("scheduling")
 def generate_schedule_from_headings(
     headings: List[str],
     total_hours: float,
     difficulty_scores: Dict[str, float],
-    start_date_str: str = None
+    start_date_str: str = None,
+    daily_hours: Optional[float] = None,
+    exam_date: Optional[str] = None
 ) -> List[Dict[str, Any]]:
     """
-    Creates a study plan where hours are allotted by difficulty and dates are sequential.
+    Creates a study plan where hours are allotted by difficulty and packed
+    into each day's study hours, in heading order. Topics longer than what is
+    left of a day continue on the next day. With an exam date the plan ends
+    the day before it (hours are compressed if they would not fit).
     """
-    if start_date_str:
-        try:
-            current_date = datetime.strptime(start_date_str, "%Y-%m-%d")
-        except ValueError:
-            current_date = datetime.now()
-    else:
-        current_date = datetime.now()
+    start = parse_date(start_date_str, default=None) or datetime.now()
+    max_days = days_until(start, exam_date)
 
     enriched = []
     for h in headings:
@@ -57,24 +83,20 @@ def generate_schedule_from_headings(
         enriched.append({"title": h, "difficulty": max(diff, 1.0)})
 
     total_diff = sum(h["difficulty"] for h in enriched) or 1
-    schedule = []
 
     for h in enriched:
         # Allot hours based on difficulty portion
-        portion = h["difficulty"] / total_diff
-        allocated_hours = round(total_hours * portion, 2)
-        
-        schedule.append({
-            "date": current_date.strftime("%Y-%m-%d"),
-            "topic": h["title"],
-            "hours": allocated_hours,
-            "difficulty": round(h["difficulty"], 1)
-        })
-        # Move to the next day for the next topic
-        current_date += timedelta(days=1)
+        h["hours"] = total_hours * h["difficulty"] / total_diff
+        h["difficulty"] = round(h["difficulty"], 1)
 
-    return schedule
+    return dated_sessions(
+        enriched,
+        start=start,
+        capacity=resolve_daily_hours(total_hours, daily_hours, max_days),
+        max_days=max_days
+    )
 
+@metrics.timed("scheduling")
 def generate_dynamic_schedule(
     content: str,
     headings: List[str],
@@ -84,79 +106,107 @@ def generate_dynamic_schedule(
     userId: str
 ) -> Dict[str, Any]:
     """
-    Placeholder for AI logic to generate a dynamic study schedule considering all user inputs.
-    This function would contain the sophisticated AI logic to parse content, availability,
-    and study goals to produce an optimized timetable.
-    """
-    # For demonstration, a simple mock schedule is returned.
-    # In a real application, the AI would process:
-    # - 'content' (from text input or parsed PDF)
-    # - 'headings' (extracted topics)
-    # - 'availability' (e.g., "Mon-Fri 9AM-5PM, Weekends flexible")
-    # - 'startDate' (e.g., "2026-01-01")
-    # - 'studyTime' (e.g., "3 hours/day", "15 hours/week")
-    # to create a detailed, optimized timetable.
-
-    print(f"Generating dynamic schedule for user {userId} starting {startDate}...")
-    print(f"Content: {content[:100]}...")
-    print(f"Availability: {availability}, Study Time: {studyTime}")
-
-    # This is a very basic placeholder. Your AI would do the actual complex scheduling.
-    mock_schedule = {
-        "Day 1": [
-            {"id": "task-intro", "description": f"Study Introduction to {headings[0] if headings else 'Subject 1'}", "hours": 2, "completed": False}
-        ],
-        "Day 2": [
-            {"id": "task-deep-dive", "description": f"Deep Dive into {headings[1] if len(headings) > 1 else 'Subject 2'}", "hours": 3, "completed": False}
-        ],
-        "Day 3": [
-            {"id": "task-review-start", "description": f"Review {headings[0] if headings else 'Subject 1'} and start {headings[2] if len(headings) > 2 else 'Subject 3'}", "hours": 2, "completed": False}
-        ],
-    }
-    return mock_schedule
+    Plans DYNAMIC_TOPIC_HOURS per heading, in order, into the days the
+    student is available. `availability` and `studyTime` are compiled (once
+    per distinct string) into a capacity array over the horizon, so a day off
+    gets nothing and a topic longer than a day's study time is split.
 
+    Returns {"Day N": [task, ...]} where N counts calendar days from
+    startDate; split topics get one "part" task per day.
+    """
+    logger.debug("Generating dynamic schedule for user %s starting %s", userId, startDate)
+
+    topics = headings or ["Course material"]
+    start = parse_date(startDate, default=None) or datetime.now()
+
+    hours = [DYNAMIC_TOPIC_HOURS] * len(topics)
+    horizon = horizon_for(sum(hours), weekly_capacity(availability, studyTime))
+    if horizon == 0:
+        raise ScheduleConstraintError("The availability and study time leave no time to study.")
+    check_horizon(horizon)
+
+    day_indexes, topic_indexes, allocated = pack_sessions(
+        hours, capacity_array(availability, studyTime, start, horizon)
+    )
+
+    topic_indexes = topic_indexes.tolist()
+    parts = {}
+    for index in topic_indexes:
+        parts[index] = parts.get(index, 0) + 1
+
+    timetable = {}
+    seen = {}
+    for day, index, shown in zip(day_indexes.tolist(), topic_indexes, rounded_hours(allocated)):
+        task_id = f"task-{index + 1}"
+        description = f"Study {topics[index]}"
+        if parts[index] > 1:
+            seen[index] = part = seen.get(index, 0) + 1
+            task_id = f"{task_id}-{part}"
+            description = f"{description} (part {part}/{parts[index]})"
+
+        timetable.setdefault(f"Day {day + 1}", []).append(
+            {"id": task_id, "description": description, "hours": shown, "completed": False}
+        )
+    return timetable
+
+def _day_number(day_key: str, position: int) -> int:
+    """N of a "Day N" / "dayN" key; the day's position for other keys."""
+    match = re.search(r"(\d+)\s*$", day_key)
+    return int(match.group(1)) if match else position + 1
+
+@metrics.timed("realign")
 def realign_schedule(
-    current_timetable: Dict[str, List[Dict[str, Any]]],
+    current_timetable: Dict[str, List[Any]],
     missed_task_id: Optional[str],
     availability: str,
     study_time: str,
-    userId: str
-) -> Dict[str, List[Dict[str, Any]]]:
+    userId: str,
+    return_diff: bool = False,
+    start_date: Optional[str] = None
+) -> Dict[str, Any]:
     """
-    Placeholder for AI logic to realign the study schedule.
-    This function would re-evaluate the timetable based on missed tasks and user inputs.
+    Re-schedules a missed task: the first task with `missed_task_id` that is
+    not completed. The lookup stops at that task and only the days that
+    change are copied; the rest of the plan is passed through untouched.
+    Tasks may be dicts or pydantic models.
+
+    The missed task is marked as rescheduled and a copy is placed on the first
+    later day with room under that day's study time, or on a new day. "Day N"
+    is the Nth calendar day from start_date (default: today, as in
+    generate_dynamic_schedule), so its capacity is the one compiled from
+    availability/studyTime for that weekday.
+    Returns the whole timetable, or with return_diff only the edits
+    ({"added", "changed", "days"}).
     """
-    print(f"Realigning schedule for user {userId} due to missed task {missed_task_id}...")
-    print(f"Current Timetable: {current_timetable}")
-    print(f"Availability: {availability}, Study Time: {study_time}")
-
-    # Deep copy the current timetable to avoid modifying it directly
-    realigned_timetable = {day: [task.copy() for task in tasks] for day, tasks in current_timetable.items()}
-    
-    if missed_task_id:
-        found_and_realigned = False
-        for day, tasks in realigned_timetable.items():
-            for i, task in enumerate(tasks):
-                if task.get('id') == missed_task_id and task.get('completed') == False:
-                    # Simple re-alignment: move the missed task to a new 'future' day
-                    # In a real AI, this would involve smart rescheduling based on availability
-                    new_day_key = f"day{len(realigned_timetable) + 1}"
-                    realigned_timetable.setdefault(new_day_key, []).append({
-                        "id": f"{missed_task_id}-realigned",
-                        "description": f"Realigned: {task.get('description', '' )}",
-                        "hours": task.get('hours', 0),
-                        "completed": False,
-                    })
-                    # Optionally remove from original spot or mark as rescheduled
-                    # For simplicity, we just add it to a new day here.
-                    tasks[i]['description'] = f"[RESCHEDULED] {task.get('description', '')}"
-                    tasks[i]['rescheduled'] = True
-                    found_and_realigned = True
-                    break
-            if found_and_realigned:
-                break
-
-    # Further AI logic would go here to intelligently re-distribute tasks
-    # based on availability and study time constraints.
-    
-    return realigned_timetable
\ No newline at end of file
+    logger.debug("Realigning schedule for user %s due to missed task %s", userId, missed_task_id)
+
+    timetable = Timetable(current_timetable)
+
+    task = timetable.get(missed_task_id, open_only=True) if missed_task_id else None
+    if task is not None:
+        day, _ = timetable.locate(missed_task_id, open_only=True)
+        hours = task.get('hours', 0)
+
+        new_day_key = None
+        if compile_study_time(study_time):
+            start = parse_date(start_date, default=None) or datetime.now()
+            week = capacity_array(availability, study_time, start, 7)
+            new_day_key = timetable.first_day_with_room(
+                day, hours, lambda key, position: week[(_day_number(key, position) - 1) % 7]
+            )
+        if new_day_key is None:
+            new_day_key = f"day{len(timetable.days()) + 1}"
+
+        timetable.add(new_day_key, {
+            "id": f"{missed_task_id}-realigned",
+            "description": f"Realigned: {task.get('description', '' )}",
+            "hours": hours,
+            "completed": False,
+        })
+        timetable.update(
+            missed_task_id,
+            description=f"[RESCHEDULED] {task.get('description', '')}",
+            rescheduled=True
+        )
+
+    return timetable.diff() if return_diff else timetable.to_dict()
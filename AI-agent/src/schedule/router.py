@@ -1,16 +1,28 @@
 # am-prasad/ai-study-planner/AI-agent/src/schedule/router.py
 
 import os
-from fastapi import APIRouter, UploadFile, File, Form, HTTPException
+import asyncio
+import binascii
+import json
+from fastapi import APIRouter, UploadFile, File, Form, HTTPException, Query, Request
+from fastapi.responses import StreamingResponse
 from typing import Optional, List, Dict
-from src.schedule.generator import generate_schedule_from_headings, generate_dynamic_schedule
-from src.schedule.utils import (
-    extract_pdf_headings,
-    extract_full_text,
-    compute_topic_difficulty,
+from src.schedule.generator import realign_schedule
+from src.schedule.analysis_cache import analysis_cache
+from src.schedule.engine import ScheduleConstraintError
+from src.pipeline.study_plan_pipeline import (
+    NoUsableContentError,
+    build_dynamic_timetable,
+    build_dynamic_timetables,
+    build_pdf_schedule,
 )
+from src import metrics
+from src.config import MIN_DAILY_HOURS, SCHEDULE_BATCH_MAX_ITEMS
+from src.processing import processing_stage
+from src.jobs.manager import job_manager
+from src.jobs.router import accepted
+from src.pdf.spool import check_content_length, spool_base64, spool_stream, spool_upload
 from pydantic import BaseModel
-import base64 # Import base64 for decoding PDF content
 
 router = APIRouter(prefix="/schedule", tags=["Schedule"])
 
@@ -22,6 +34,9 @@ class TimetableGenerationRequest(BaseModel):
     startDate: str
     studyTime: str
 
+class TimetableBatchRequest(BaseModel):
+    requests: List[TimetableGenerationRequest]
+
 class TimetableTask(BaseModel):
     id: str
     description: str
@@ -34,118 +49,346 @@ class RealignTimetableRequest(BaseModel):
     missedTaskId: Optional[str] = None # Or other context for re-alignment
     availability: str
     studyTime: str
+    startDate: Optional[str] = None # Day 1 of currentTimetable, to map days to weekdays
 
-@router.post("/generate")
-async def generate_timetable(
-    request: TimetableGenerationRequest
-):
-    """
-    Generates a study timetable based on user input, including optional PDF syllabus.
-    """
+async def _generate(user_id, spool, raw_data, availability, start_date, study_time):
     try:
-        headings = []
-        full_text = ""
-        pdf_content = None
-
-        if request.pdfContent: # If base64 encoded PDF content is provided
-            pdf_content = base64.b64decode(request.pdfContent)
-            headings = extract_pdf_headings(pdf_content)
-            full_text = extract_full_text(pdf_content)
-        elif request.rawData: # If rawData is text
-            headings = [line.strip() for line in request.rawData.split('\n') if line.strip()]
-            full_text = request.rawData
-
-        if not headings and not full_text: # If neither text nor PDF provided usable content
-            raise HTTPException(status_code=422, detail="No usable content for timetable generation. Please provide text or a valid PDF.")
-
-        generated_schedule = generate_dynamic_schedule(
-            content=full_text, 
-            headings=headings,
-            availability=request.availability,
-            startDate=request.startDate,
-            studyTime=request.studyTime,
-            userId=request.userId
+        # PDF parsing and scheduling run off the event loop
+        generated_schedule = await processing_stage.run(
+            build_dynamic_timetable,
+            user_id=user_id,
+            pdf=spool.path if spool else None,
+            raw_data=raw_data,
+            availability=availability,
+            start_date=start_date,
+            study_time=study_time,
+            pdf_digest=spool.digest if spool else None
         )
 
         return {
             "success": True,
-            "userId": request.userId,
+            "userId": user_id,
             "timetable": generated_schedule
         }
 
+    except HTTPException:
+        raise
+    except (NoUsableContentError, ScheduleConstraintError) as e:
+        raise HTTPException(status_code=422, detail=str(e))
     except Exception as e:
         print(f"Error generating timetable: {str(e)}")
         raise HTTPException(status_code=500, detail=f"Internal Server Error: {str(e)}")
+    finally:
+        if spool:
+            spool.discard()
+
+@router.post("/generate")
+async def generate_timetable(
+    request: TimetableGenerationRequest
+):
+    """
+    Generates a study timetable based on user input, including optional PDF syllabus.
+    """
+    spool = None
+    if request.pdfContent:
+        # Decode the base64 PDF to disk in chunks rather than into one bytes object
+        try:
+            with metrics.stage("spool"):
+                spool = await processing_stage.run(spool_base64, request.pdfContent)
+        except (binascii.Error, ValueError):
+            raise HTTPException(status_code=422, detail="pdfContent is not valid base64.")
+        if not spool.size:
+            spool.discard()
+            raise HTTPException(status_code=422, detail="pdfContent decoded to an empty file.")
+
+    return await _generate(
+        request.userId, spool, request.rawData,
+        request.availability, request.startDate, request.studyTime
+    )
+
+@router.post("/generate/raw")
+async def generate_timetable_raw(
+    request: Request,
+    userId: str = Query(...),
+    availability: str = Query(...),
+    startDate: str = Query(...),
+    studyTime: str = Query(...)
+):
+    """
+    Same as /generate, with the PDF sent as the raw request body
+    (Content-Type: application/pdf) instead of base64 inside JSON.
+    """
+    check_content_length(request.headers)
+    with metrics.stage("spool"):
+        spool = await spool_stream(request.stream())
+    if not spool.size:
+        spool.discard()
+        raise HTTPException(status_code=400, detail="Request body is empty; send the PDF as application/pdf.")
+
+    return await _generate(userId, spool, None, availability, startDate, studyTime)
+
+def _generate_group(pdf_content, raw_data, users):
+    """
+    One /generate-batch group on the processing stage: decodes the shared
+    pdfContent (if any) and builds every user's timetable from it.
+    """
+    spool = None
+    if pdf_content:
+        try:
+            with metrics.stage("spool"):
+                spool = spool_base64(pdf_content)
+        except (binascii.Error, ValueError):
+            raise NoUsableContentError("pdfContent is not valid base64.")
+        if not spool.size:
+            spool.discard()
+            raise NoUsableContentError("pdfContent decoded to an empty file.")
+
+    try:
+        return build_dynamic_timetables(
+            users,
+            pdf=spool.path if spool else None,
+            raw_data=raw_data,
+            pdf_digest=spool.digest if spool else None
+        )
+    finally:
+        if spool:
+            spool.discard()
+
+def _batch_error(index, user_id, error):
+    if isinstance(error, HTTPException):
+        status, detail = error.status_code, error.detail
+    elif isinstance(error, (NoUsableContentError, ScheduleConstraintError)):
+        status, detail = 422, str(error)
+    else:
+        print(f"Error generating timetable: {str(error)}")
+        status, detail = 500, f"Internal Server Error: {str(error)}"
+    return {"index": index, "success": False, "userId": user_id, "status": status, "detail": detail}
+
+@router.post("/generate-batch")
+async def generate_timetable_batch(
+    batch: TimetableBatchRequest
+):
+    """
+    /generate for many users in one call (e.g. a whole class). Requests with
+    the same content (identical pdfContent, else identical rawData) form one
+    group whose document is decoded and extracted once for all its users.
+
+    Results stream back as NDJSON, one line per request as its group finishes:
+    {"index", "success": true, "userId", "timetable"} or
+    {"index", "success": false, "userId", "status", "detail"}, where `index`
+    is the request's position in the batch. A last line
+    {"done": true, "total", "failed", "documents"} ends the stream.
+    """
+    items = batch.requests
+    if not items:
+        raise HTTPException(status_code=422, detail="requests must not be empty.")
+    if len(items) > SCHEDULE_BATCH_MAX_ITEMS:
+        raise HTTPException(
+            status_code=413,
+            detail=f"At most {SCHEDULE_BATCH_MAX_ITEMS} requests are accepted per batch."
+        )
+
+    # pdfContent wins over rawData, as in /generate
+    groups: Dict[tuple, List[int]] = {}
+    for index, item in enumerate(items):
+        key = ("pdf", item.pdfContent) if item.pdfContent else ("text", item.rawData or "")
+        groups.setdefault(key, []).append(index)
+
+    # Never hold more processing slots than the stage has, so a large batch
+    # waits its turn instead of overflowing the queue with 429s
+    slots = asyncio.Semaphore(processing_stage.max_concurrency)
+
+    async def run_group(key, indices):
+        kind, content = key
+        users = [
+            {
+                "user_id": items[i].userId,
+                "availability": items[i].availability,
+                "start_date": items[i].startDate,
+                "study_time": items[i].studyTime,
+            }
+            for i in indices
+        ]
+        async with slots:
+            try:
+                results = await processing_stage.run(
+                    _generate_group,
+                    content if kind == "pdf" else None,
+                    content if kind == "text" else None,
+                    users
+                )
+            except Exception as e:
+                results = [e] * len(indices)
+        return indices, results
+
+    async def stream():
+        tasks = [asyncio.create_task(run_group(key, indices)) for key, indices in groups.items()]
+        failed = 0
+        try:
+            for finished in asyncio.as_completed(tasks):
+                indices, results = await finished
+                lines = []
+                for index, result in zip(indices, results):
+                    if isinstance(result, Exception):
+                        failed += 1
+                        line = _batch_error(index, items[index].userId, result)
+                    else:
+                        line = {"index": index, "success": True, "userId": items[index].userId, "timetable": result}
+                    lines.append(json.dumps(line) + "\n")
+                yield "".join(lines)
+            yield json.dumps({"done": True, "total": len(items), "failed": failed, "documents": len(groups)}) + "\n"
+        finally:
+            # Client went away: stop groups that have not started yet
+            for task in tasks:
+                task.cancel()
+
+    return StreamingResponse(stream(), media_type="application/x-ndjson")
 
 @router.post("/realign")
-async def realign_timetable(
-    request: RealignTimetableRequest
+def realign_timetable(
+    request: RealignTimetableRequest,
+    diff: bool = Query(False)
 ):
     """
     Re-aligns the study timetable based on missed tasks or updated availability.
+    With ?diff=true the response carries only the edits ("diff": added and
+    changed tasks plus the touched days) instead of the whole plan.
     """
     try:
-        # In a real scenario, this would involve complex AI logic to re-schedule.
-        # For now, we'll use a simple placeholder.
-        realigned_schedule = realign_schedule(
+        # Realignment is incremental (the lookup stops at the missed task, only
+        # affected days are copied), so it skips the processing stage rather
+        # than queue behind PDF work. Tasks stay models; only edited ones are dumped.
+        realigned = realign_schedule(
             current_timetable=request.currentTimetable,
             missed_task_id=request.missedTaskId,
             availability=request.availability,
             study_time=request.studyTime,
-            userId=request.userId
+            userId=request.userId,
+            return_diff=diff,
+            start_date=request.startDate
         )
 
         return {
             "success": True,
             "userId": request.userId,
-            "timetable": realigned_schedule
+            ("diff" if diff else "timetable"): realigned
         }
+    except HTTPException:
+        raise
     except Exception as e:
         print(f"Error realigning timetable: {str(e)}")
         raise HTTPException(status_code=500, detail=f"Internal Server Error: {str(e)}")
 
+async def _schedule_pdf(spool, filename, total_hours, start_date, daily_hours, exam_date, job):
+    if job:
+        def run(progress):
+            try:
+                schedule = build_pdf_schedule(
+                    pdf=spool.path,
+                    total_hours=total_hours,
+                    start_date=start_date,
+                    progress=progress,
+                    pdf_digest=spool.digest,
+                    daily_hours=daily_hours,
+                    exam_date=exam_date
+                )
+            finally:
+                spool.discard()
+            return {
+                "success": True,
+                "filename": filename,
+                "generated_schedule": schedule
+            }
+
+        try:
+            return accepted(job_manager.submit("schedule-upload-pdf", run))
+        except HTTPException:
+            spool.discard()
+            raise
+
+    try:
+        # Extraction, NLP difficulty and scheduling run off the event loop
+        schedule = await processing_stage.run(
+            build_pdf_schedule,
+            pdf=spool.path,
+            total_hours=total_hours,
+            start_date=start_date,
+            pdf_digest=spool.digest,
+            daily_hours=daily_hours,
+            exam_date=exam_date
+        )
+
+        return {
+            "success": True,
+            "filename": filename,
+            "generated_schedule": schedule
+        }
+
+    except HTTPException:
+        raise
+    except (NoUsableContentError, ScheduleConstraintError) as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    except Exception as e:
+        print(f"Error processing PDF: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Internal Server Error: {str(e)}")
+    finally:
+        spool.discard()
+
 @router.post("/upload-pdf")
 async def upload_pdf(
     file: UploadFile = File(...),
     total_hours: float = Form(...),
-    start_date: Optional[str] = Form(None)
+    start_date: Optional[str] = Form(None),
+    daily_hours: Optional[float] = Form(None, ge=MIN_DAILY_HOURS, le=24),
+    exam_date: Optional[str] = Form(None),
+    job: bool = Query(False)
 ):
     """
-    Processes PDF in memory to generate a difficulty-aware study plan.
+    Processes an uploaded PDF to generate a difficulty-aware study plan.
+    The upload is spooled to disk in chunks and parsed from there. Topics are
+    packed into `daily_hours` per day (default: spread up to `exam_date`, or
+    DEFAULT_DAILY_HOURS) and the plan ends before `exam_date` when given.
+    With ?job=true, returns 202 with a job id right away; follow it at
+    /jobs/{job_id} or /jobs/{job_id}/events.
     """
     if not file.filename.endswith(".pdf"):
         raise HTTPException(status_code=400, detail="Please upload a PDF file.")
 
     try:
-        # Read file content directly into memory
-        pdf_content = await file.read()
+        with metrics.stage("spool"):
+            spool = await spool_upload(file)
+    finally:
+        await file.close()
 
-        # 1. Extract headings and full text from bytes
-        headings = extract_pdf_headings(pdf_content)
-        full_text = extract_full_text(pdf_content)
+    return await _schedule_pdf(spool, file.filename, total_hours, start_date, daily_hours, exam_date, job)
 
-        if not headings:
-            raise HTTPException(status_code=422, detail="No headings could be extracted from this PDF.")
+@router.post("/upload-pdf/raw")
+async def upload_pdf_raw(
+    request: Request,
+    total_hours: float = Query(...),
+    start_date: Optional[str] = Query(None),
+    daily_hours: Optional[float] = Query(None, ge=MIN_DAILY_HOURS, le=24),
+    exam_date: Optional[str] = Query(None),
+    filename: str = Query("upload.pdf"),
+    job: bool = Query(False)
+):
+    """
+    Same as /upload-pdf, with the PDF sent as the raw request body
+    (Content-Type: application/pdf) instead of multipart form data.
+    """
+    check_content_length(request.headers)
+    with metrics.stage("spool"):
+        spool = await spool_stream(request.stream(), filename=filename)
+    if not spool.size:
+        spool.discard()
+        raise HTTPException(status_code=400, detail="Request body is empty; send the PDF as application/pdf.")
 
-        # 2. Compute difficulty based on NLP analysis
-        difficulty_scores = compute_topic_difficulty(headings, full_text)
+    return await _schedule_pdf(spool, filename, total_hours, start_date, daily_hours, exam_date, job)
 
-        # 3. Generate schedule with sequential dates and weighted hours
-        schedule = generate_schedule_from_headings(
-            headings=headings,
-            total_hours=total_hours,
-            difficulty_scores=difficulty_scores,
-            start_date_str=start_date
-        )
 
-        return {
-            "success": True,
-            "filename": file.filename,
-            "generated_schedule": schedule
-        }
-
-    except Exception as e:
-        print(f"Error processing PDF: {str(e)}")
-        raise HTTPException(status_code=500, detail=f"Internal Server Error: {str(e)}")
-    finally:
-        await file.close()
\ No newline at end of file
+@router.get("/cache-stats")
+def cache_stats():
+    """
+    Hit/miss counters for the PDF analysis cache.
+    """
+    return analysis_cache.stats()
@@ -0,0 +1,132 @@
+"""
+Indexed timetable for incremental edits.
+
+Wraps a {day: [task, ...]} timetable without copying it. Tasks may be dicts
+or pydantic models (e.g. the request's TimetableTask objects); only the tasks
+that are edited are turned into dicts. A task is found by one scan that
+stops at the match, and its position is then remembered; per-day hour totals
+are computed on demand. Edits are copy-on-write per day: only the day lists
+(and task dicts) that change are copied; untouched days keep pointing at the
+input. Every edit is recorded so callers can return a compact diff instead
+of the plan.
+"""
+
+from typing import Any, Callable, Dict, List, Optional
+
+
+def _field(task, name: str):
+    return task.get(name) if isinstance(task, dict) else getattr(task, name, None)
+
+
+def _as_dict(task) -> Dict[str, Any]:
+    return task if isinstance(task, dict) else task.model_dump()
+
+
+class Timetable:
+
+    def __init__(self, days: Dict[str, List[Any]]):
+        self._days = dict(days)  # day -> list (the input's lists until touched)
+        self._owned = set()  # days whose list has been copied
+        self._totals = {}  # day -> hours, filled lazily
+        self._index = {}  # task id -> (day, position), for located and added tasks
+
+        self.added = []
+        self.changed = {}
+
+    # ----------- Lookup ---------------
+    def locate(self, task_id: str, open_only: bool = False):
+        """
+        (day, position) of the first task with this id, or None. With
+        open_only, the first one that is not completed (completed == False).
+        """
+        found = self._index.get(task_id)
+        if found is not None and not (open_only and self._completed(found)):
+            return found
+
+        for day, tasks in self._days.items():
+            for position, task in enumerate(tasks):
+                if _field(task, "id") != task_id:
+                    continue
+                if open_only and _field(task, "completed") is not False:
+                    continue
+                self._index[task_id] = (day, position)
+                return day, position
+        return None
+
+    def _completed(self, found) -> bool:
+        day, position = found
+        return _field(self._days[day][position], "completed") is not False
+
+    def get(self, task_id: str, open_only: bool = False) -> Optional[Dict[str, Any]]:
+        found = self.locate(task_id, open_only)
+        if found is None:
+            return None
+        day, position = found
+        return _as_dict(self._days[day][position])
+
+    def day_hours(self, day: str) -> float:
+        total = self._totals.get(day)
+        if total is None:
+            total = sum(_field(task, "hours") or 0 for task in self._days.get(day, ()))
+            self._totals[day] = total
+        return total
+
+    def days(self) -> List[str]:
+        return list(self._days)
+
+    # ----------- Copy-on-write edits ---------------
+    def _own(self, day: str) -> List[Dict[str, Any]]:
+        if day not in self._owned:
+            self._days[day] = list(self._days.get(day, ()))
+            self._owned.add(day)
+        return self._days[day]
+
+    def update(self, task_id: str, **fields) -> Dict[str, Any]:
+        """
+        Sets fields on a task (copying just that task) and returns it; the
+        task last located under `task_id`, else the first one.
+        """
+        day, position = self._index.get(task_id) or self.locate(task_id)
+        tasks = self._own(day)
+        task = dict(_as_dict(tasks[position]), **fields)
+        tasks[position] = task
+
+        if "hours" in fields:
+            self._totals.pop(day, None)
+        self.changed[task_id] = (day, task)
+        return task
+
+    def add(self, day: str, task: Dict[str, Any]):
+        tasks = self._own(day)
+        tasks.append(task)
+        if task.get("id") is not None:
+            self._index[task["id"]] = (day, len(tasks) - 1)
+        if day in self._totals:
+            self._totals[day] += task.get("hours") or 0
+        self.added.append((day, task))
+
+    def first_day_with_room(self, after_day: str, hours: float,
+                            capacity: Callable[[str, int], float]) -> Optional[str]:
+        """
+        First day after `after_day` whose total leaves room for `hours` under
+        `capacity(day, position)`. Only the days up to that one are summed.
+        """
+        days = list(self._days)
+        start = days.index(after_day) + 1 if after_day in self._days else len(days)
+        for position in range(start, len(days)):
+            day = days[position]
+            if self.day_hours(day) + hours <= capacity(day, position):
+                return day
+        return None
+
+    # ----------- Output ---------------
+    def to_dict(self) -> Dict[str, List[Dict[str, Any]]]:
+        return {day: [_as_dict(task) for task in tasks] for day, tasks in self._days.items()}
+
+    def diff(self) -> Dict[str, Any]:
+        """The edits made so far: added and changed tasks."""
+        return {
+            "added": [{"day": day, "task": task} for day, task in self.added],
+            "changed": [{"day": day, "task": task} for day, task in self.changed.values()],
+            "days": sorted(self._owned, key=list(self._days).index),
+        }
@@ -1,20 +1,31 @@
+import os
+
 import fitz  # PyMuPDF
-from pinecone import Pinecone
 
-from src.config import PINECONE_API_KEY, PINECONE_INDEX, PINECONE_NAMESPACE
+from src import metrics
+from src.config import PINECONE_INDEX, PINECONE_NAMESPACE
+from src.extraction.heading_dedup import consolidate_headings, heading_span
+from src.extraction.keyword_extractor import iter_noun_phrases
+from src.extraction.term_matcher import count_terms, word_stats
+from src.pdf.page_pool import should_shard, map_page_ranges
+from src.pdf.spool import file_digest
+from src.schedule.analysis_cache import analysis_cache
+from src.vectorstore.pinecone_client import get_pinecone_client
+from src.vectorstore.store import get_vector_store
+from src.vectorstore.sync import store_document, with_content_ids
 import re
-from io import BytesIO
-import pdfplumber
-import spacy
+import numpy as np
 from sklearn.feature_extraction.text import TfidfVectorizer
 
 # ---------------------
-# 🔹 Initialize Services
+# 🔹 Services (built lazily on first use)
 # ---------------------
-pc = Pinecone(api_key=PINECONE_API_KEY)
-index = pc.Index(PINECONE_INDEX)
+def _connect_headings_index():
+    return get_pinecone_client().Index(PINECONE_INDEX)
+
 
-nlp = spacy.load("en_core_web_sm")
+def get_headings_store():
+    return get_vector_store(PINECONE_INDEX or PINECONE_NAMESPACE, _connect_headings_index)
 
 
 # ------------------------------------------------
@@ -35,30 +46,109 @@ def distribute_hours(total_hours: float, daily_hours: float, days: int):
 
 
 # ------------------------------------------------
-# 🔹 Extract headings from PDF using font size/bold
+# 🔹 Single-pass PDF ingestion (headings + text + page info)
 # ------------------------------------------------
-def extract_pdf_headings(pdf_bytes):
-    doc = fitz.open(stream=pdf_bytes, filetype="pdf")
+def _is_heading_span(span, text):
+    # simple heuristic: large or bold text = heading
+    is_large = span["size"] > 12
+    is_bold = span["font"].lower().startswith("bold")
+    return (is_large or is_bold) and len(text) > 3
+
+
+def _scan_page(page, page_number):
+    """
+    Walks one page's text dict once and returns its heading spans, plain
+    text and a small metadata record.
+    """
     headings = []
+    lines = []
+
+    for b in page.get_text("dict")["blocks"]:
+        if "lines" not in b:
+            continue
+        for line in b["lines"]:
+            line_text = []
+            for span in line["spans"]:
+                line_text.append(span["text"])
+                text = span["text"].strip()
+                if _is_heading_span(span, text):
+                    headings.append(heading_span(span, text))
+            lines.append("".join(line_text))
+
+    page_text = "\n".join(lines) + "\n" if lines else ""
+    meta = {
+        "page": page_number,
+        "chars": len(page_text),
+        "headings": len(headings),
+        "width": page.rect.width,
+        "height": page.rect.height,
+    }
+    return headings, page_text, meta
+
+
+def _open_pdf(source):
+    """Opens a PDF from a file path (read from disk on demand) or from bytes."""
+    if isinstance(source, (str, os.PathLike)):
+        return fitz.open(source, filetype="pdf")
+    return fitz.open(stream=source, filetype="pdf")
+
+
+def _ingest_page_range(source, start, end):
+    """
+    Scans pages [start, end) of the PDF. Runs inside page-pool workers.
+    """
+    with _open_pdf(source) as doc:
+        return [_scan_page(doc[i], i + 1) for i in range(start, end)]
 
-    for page in doc:
-        blocks = page.get_text("dict")["blocks"]
-        for b in blocks:
-            if "lines" in b:
-                for line in b["lines"]:
-                    for span in line["spans"]:
-                        text = span["text"].strip()
 
-                        # simple heuristic: large or bold text = heading
-                        is_large = span["size"] > 12
-                        is_bold = span["font"].lower().startswith("bold")
+@metrics.timed("pdf_parse")
+def ingest_pdf(source, progress=None):
+    """
+    Opens the PDF (a file path or bytes) once and returns everything the
+    schedule routes need:
+    {"headings": [...], "full_text": str, "pages": [{page, chars, headings, ...}]}
 
-                        if (is_large or is_bold) and len(text) > 3:
-                            headings.append(text)
+    Documents above PDF_PARALLEL_MIN_PAGES are scanned in page shards on the
+    shared process pool. `progress(stage, **counts)`, if given, is told how
+    many pages have been parsed so far.
+    """
+    def pages_done(n):
+        if progress:
+            progress("parsing", pages_parsed=n, pages_total=page_count)
+
+    with _open_pdf(source) as doc:
+        page_count = doc.page_count
+        sharded = should_shard(page_count)
+        if not sharded:
+            records = []
+            for i, page in enumerate(doc):
+                records.append(_scan_page(page, i + 1))
+                pages_done(len(records))
+
+    if sharded:
+        records = map_page_ranges(_ingest_page_range, source, page_count, on_pages_done=pages_done)
+
+    spans = []
+    texts = []
+    pages = []
+    for page_headings, page_text, meta in records:
+        spans.append((meta["height"], page_headings))
+        texts.append(page_text)
+        pages.append(meta)
+
+    return {
+        # Document order; running headers, fragments and duplicates consolidated
+        "headings": consolidate_headings(spans),
+        "full_text": "".join(texts),
+        "pages": pages,
+    }
 
-    return list(set(headings))  # remove duplicates
 
-from sklearn.feature_extraction.text import TfidfVectorizer
+# ------------------------------------------------
+# 🔹 Extract headings from PDF using font size/bold
+# ------------------------------------------------
+def extract_pdf_headings(pdf_bytes):
+    return ingest_pdf(pdf_bytes)["headings"]
 
 def extract_keywords_from_pdf_text(text, top_n=30):
     """
@@ -74,30 +164,41 @@ def extract_keywords_from_pdf_text(text, top_n=30):
     return list(keywords)
 
 def extract_full_text(pdf_bytes):
-    text = ""
-    with pdfplumber.open(BytesIO(pdf_bytes)) as pdf:
-        for page in pdf.pages:
-            text += page.extract_text() or ""
-    return text
+    return ingest_pdf(pdf_bytes)["full_text"]
 
 def extract_technical_terms(full_text, top_k=40):
     """
     NLP-based technical term extraction using noun phrases + TF-IDF
     """
-    doc = nlp(full_text)
+    # Noun phrases are streamed from a lean spaCy pipeline, piece by piece;
+    # TF-IDF pulls them, so spaCy's share is timed separately and excluded
+    noun_phrases = metrics.TimedIter(iter_noun_phrases(full_text))
+
+    cleaned = (t for t in noun_phrases if len(t) > 3 and not t.isdigit())
+
+    with metrics.stage("tfidf") as span:
+        terms = rank_terms(cleaned, top_k)
+        span.exclude(noun_phrases.elapsed)
+    metrics.observe_stage("spacy", noun_phrases.elapsed)
+    return terms
 
-    noun_phrases = [chunk.text.lower() for chunk in doc.noun_chunks]
 
-    cleaned = [t for t in noun_phrases if len(t) > 3 and not t.isdigit()]
+def rank_terms(phrases, top_k=40):
+    """
+    Top-k TF-IDF vocabulary terms over a stream of noun phrases.
 
+    Column scores are summed straight from the sparse matrix; the
+    phrases x vocabulary matrix is never densified.
+    """
     vectorizer = TfidfVectorizer(stop_words="english")
     try:
-        tfidf = vectorizer.fit_transform(cleaned)
+        tfidf = vectorizer.fit_transform(phrases)
     except ValueError:
         return []  # avoids crash if pdf text is too small
 
     feature_names = vectorizer.get_feature_names_out()
-    scores = tfidf.toarray().sum(axis=0)
+    # Same per-column, row-order accumulation as tfidf.toarray().sum(axis=0)
+    scores = np.bincount(tfidf.indices, weights=tfidf.data, minlength=len(feature_names))
 
     term_scores = sorted(
         zip(feature_names, scores),
@@ -112,18 +213,20 @@ def extract_technical_terms(full_text, top_k=40):
 # --------------------------
 # STEP 3: Difficulty Scoring
 # --------------------------
-def compute_topic_difficulty(headings, full_text):
-    tech_terms = extract_technical_terms(full_text)
-
+@metrics.timed("difficulty")
+def compute_topic_difficulty(headings, full_text, tech_terms=None):
+    if tech_terms is None:
+        tech_terms = extract_technical_terms(full_text)
+
+    # Each distinct heading once; term and word counts for all of them at once
+    unique = list(dict.fromkeys(headings))
+    lowered = [heading.lower() for heading in unique]
+    term_counts = count_terms(lowered, tech_terms)
+    word_chars, word_counts = word_stats(lowered)
     difficulty_scores = {}
 
-    for heading in headings:
-        h = heading.lower()
-
-        term_count = sum(1 for t in tech_terms if t in h)
-
-        words = re.findall(r"\w+", h)
-        avg_length = sum(len(w) for w in words) / (len(words) + 1)
+    for heading, term_count, n_chars, n_words in zip(unique, term_counts, word_chars, word_counts):
+        avg_length = n_chars / (n_words + 1)
 
         score = (term_count * 3) + (avg_length * 0.8)
 
@@ -131,11 +234,56 @@ def compute_topic_difficulty(headings, full_text):
 
     return difficulty_scores
 
+
 # ------------------------------------------------
-# 🔹 Embed text using OpenAI
+# 🔹 Cached PDF analysis (ingest + terms + difficulty)
 # ------------------------------------------------
-import random
+def analyze_pdf(source, with_difficulty=True, progress=None, digest=None):
+    """
+    Returns the ingest_pdf() result for this PDF (a file path or bytes), plus
+    "technical_terms" and "difficulty_scores" when with_difficulty is set.
+    Results are cached by content hash, so a repeat upload of the same PDF
+    skips extraction and NLP. The returned dict is shared with the cache and
+    must not be mutated.
+
+    :param digest: SHA-256 hex digest of the content, if already known
+                   (spooled uploads hash while writing)
+    :param progress: optional callable(stage, **counts) for the "parsing",
+                     "headings" and "difficulty" stages
+    """
+    if digest is None:
+        digest = file_digest(source) if isinstance(source, (str, os.PathLike)) else None
+    key = analysis_cache.key_for_digest(digest) if digest else analysis_cache.key_for(source)
+    entry = analysis_cache.get(key)
+
+    if entry is not None:
+        if progress:
+            pages = len(entry["pages"])
+            progress("parsing", pages_parsed=pages, pages_total=pages, cached=True)
+            progress("headings", found=len(entry["headings"]))
+        if not with_difficulty or "difficulty_scores" in entry:
+            return entry
+        entry = dict(entry)
+    else:
+        entry = ingest_pdf(source, progress=progress)
+        if progress:
+            progress("headings", found=len(entry["headings"]))
+
+    if with_difficulty:
+        tech_terms = extract_technical_terms(entry["full_text"])
+        entry["technical_terms"] = tech_terms
+        entry["difficulty_scores"] = compute_topic_difficulty(
+            entry["headings"], entry["full_text"], tech_terms=tech_terms
+        )
+        if progress:
+            progress("difficulty", technical_terms=len(tech_terms), scored=len(entry["difficulty_scores"]))
+
+    analysis_cache.put(key, entry)
+    return entry
 
+# ------------------------------------------------
+# 🔹 Embed text using OpenAI
+# ------------------------------------------------
 def embed_text(text: str):
     # 768-dimensional fake vector to match Pinecone index
     dim = 768
@@ -143,40 +291,24 @@ def embed_text(text: str):
     return [value] * dim
 
 
-
 # ------------------------------------------------
 # 🔹 Store headings in Pinecone
 # ------------------------------------------------
-def store_headings_in_pinecone(headings: list[str]):
-    ids: list[str] = []
-    vectors: list[dict] = []
-
-    for i, h in enumerate(headings):
-        vec = embed_text(h)  # e.g. list[float] or np.array
-
-        # Skip None or empty embeddings
-        if vec is None or len(vec) == 0:
-            continue
-
-        # Skip all-zero vectors to avoid Pinecone 400 error
-        if not any(v != 0.0 for v in vec):
+def store_headings_in_pinecone(headings: list[str], doc_id: str, sync: bool = True):
+    """
+    Stores the headings of one document (`doc_id`, e.g. the PDF's name;
+    required, so documents never share ids) through store_document: with
+    `sync`, unchanged headings are not rewritten and the document's stale
+    ones are deleted. Returns the headings' vector ids.
+    """
+    vectors = []
+    for h in headings:
+        vec = embed_text(h)
+        # Skip empty and all-zero embeddings (Pinecone rejects them with a 400)
+        if vec is None or len(vec) == 0 or not any(v != 0.0 for v in vec):
             continue
-
-        vec_id = f"heading-{i}"
-        ids.append(vec_id)
-
-        vectors.append(
-            {
-                "id": vec_id,
-                "values": vec,
-                "metadata": {"heading": h},
-            }
-        )
+        vectors.append({"text": h, "values": vec, "metadata": {"heading": h}})
 
     if vectors:
-        index.upsert(
-            vectors=vectors,
-            namespace=PINECONE_NAMESPACE,
-        )
-
-    return ids
+        store_document(get_headings_store(), doc_id, vectors, namespace=PINECONE_NAMESPACE, sync=sync)
+    return [v["id"] for v in with_content_ids(doc_id, vectors)]
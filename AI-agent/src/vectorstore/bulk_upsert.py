@@ -0,0 +1,172 @@
+"""
+Pipelined bulk writes to a VectorStore.
+
+Vectors are split into request-sized batches (bounded by count and by an
+estimate of the JSON payload size) and sent on a small thread pool with a
+bounded number of requests in flight. Failed requests are retried with
+exponential backoff. When the items still need embedding, the next group is
+embedded on the calling thread while the previous group is uploading.
+Deletes go out in batches of VECTOR_DELETE_BATCH_SIZE ids with the same
+retries (bulk_delete).
+"""
+
+import json
+import random
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from src import metrics
+from src.config import (
+    VECTOR_DELETE_BATCH_SIZE,
+    VECTOR_UPSERT_BATCH_SIZE,
+    VECTOR_UPSERT_MAX_BYTES,
+    VECTOR_UPSERT_MAX_IN_FLIGHT,
+    VECTOR_UPSERT_MAX_RETRIES,
+)
+
+# Rough JSON size of one float in a Pinecone request body
+_BYTES_PER_VALUE = 12
+
+
+def _estimate_bytes(vector: dict) -> int:
+    metadata = vector.get("metadata")
+    return (
+        len(vector["values"]) * _BYTES_PER_VALUE
+        + len(str(vector["id"]))
+        + (len(json.dumps(metadata)) if metadata else 0)
+        + 64
+    )
+
+
+def split_batches(vectors, max_count: int = VECTOR_UPSERT_BATCH_SIZE,
+                  max_bytes: int = VECTOR_UPSERT_MAX_BYTES):
+    """Yields lists of vectors bounded by count and estimated payload size."""
+    batch = []
+    size = 0
+    for vector in vectors:
+        vector_bytes = _estimate_bytes(vector)
+        if batch and (len(batch) >= max_count or size + vector_bytes > max_bytes):
+            yield batch
+            batch = []
+            size = 0
+        batch.append(vector)
+        size += vector_bytes
+    if batch:
+        yield batch
+
+
+def _with_retries(call, max_retries: int) -> int:
+    """Runs call(), retrying with jittered exponential backoff; returns the retries used."""
+    for attempt in range(max_retries + 1):
+        try:
+            call()
+            return attempt
+        except Exception:
+            if attempt == max_retries:
+                raise
+            time.sleep(min(0.25 * (2 ** attempt), 8.0) * (0.5 + random.random()))
+
+
+def _groups(items, size: int):
+    group = []
+    for item in items:
+        group.append(item)
+        if len(group) >= size:
+            yield group
+            group = []
+    if group:
+        yield group
+
+
+def _embedded(group: list, embed_fn) -> list:
+    """Turns {"id", "text", "metadata"} items into vectors, dropping empty texts."""
+    matrix = embed_fn([item["text"] for item in group])
+    vectors = []
+    for item, row in zip(group, matrix):
+        if not np.any(row):
+            continue
+        vectors.append({
+            "id": item["id"],
+            "values": row.tolist(),
+            "metadata": item.get("metadata") or {},
+        })
+    return vectors
+
+
+@metrics.timed("vector_upsert")
+def bulk_upsert(store, items, namespace: str = None, embed_fn=None, embed_batch_size: int = 256,
+                max_in_flight: int = VECTOR_UPSERT_MAX_IN_FLIGHT,
+                max_retries: int = VECTOR_UPSERT_MAX_RETRIES, progress=None) -> dict:
+    """
+    Upserts `items` into `store` and returns throughput stats.
+
+    :param items: iterable of ready vectors ({"id", "values", "metadata"}), or
+                  of {"id", "text", "metadata"} when `embed_fn` is given
+    :param embed_fn: callable(list[str]) -> np.ndarray; items are embedded in
+                     groups of `embed_batch_size`, overlapping with uploads
+    :param progress: optional callable(stage, **counts), told how many vectors
+                     have been stored after every completed batch
+    """
+    started = time.perf_counter()
+    stats = {"vectors": 0, "batches": 0, "retries": 0}
+    in_flight = []
+    errors = []
+
+    def _send(batch):
+        return len(batch), _with_retries(lambda: store.upsert(batch, namespace=namespace), max_retries)
+
+    def _collect(future):
+        try:
+            count, retries = future.result()
+            stats["vectors"] += count
+            stats["batches"] += 1
+            stats["retries"] += retries
+            if progress:
+                progress("vectors", stored=stats["vectors"])
+        except Exception as e:
+            errors.append(e)
+
+    groups = _groups(items, embed_batch_size) if embed_fn else [items]
+
+    with ThreadPoolExecutor(max_workers=max(1, max_in_flight)) as pool:
+        for group in groups:
+            vectors = _embedded(group, embed_fn) if embed_fn else group
+
+            for batch in split_batches(vectors):
+                # Keep at most `max_in_flight` requests outstanding
+                while len(in_flight) >= max_in_flight:
+                    _collect(in_flight.pop(0))
+                in_flight.append(pool.submit(_send, batch))
+
+        for future in in_flight:
+            _collect(future)
+
+    elapsed = time.perf_counter() - started
+    stats["seconds"] = round(elapsed, 3)
+    stats["vectors_per_sec"] = round(stats["vectors"] / elapsed, 1) if elapsed > 0 else 0.0
+
+    if errors:
+        raise RuntimeError(
+            f"{len(errors)} upsert batch(es) failed after {max_retries} retries: {errors[0]}"
+        ) from errors[0]
+
+    print(f"📌 Upserted {stats['vectors']} vectors in {stats['batches']} batches "
+          f"({stats['vectors_per_sec']} vectors/sec)")
+    return stats
+
+
+@metrics.timed("vector_delete")
+def bulk_delete(store, ids, namespace: str = None, batch_size: int = VECTOR_DELETE_BATCH_SIZE,
+                max_retries: int = VECTOR_UPSERT_MAX_RETRIES) -> dict:
+    """Deletes `ids` from `store` in batches; returns {"deleted", "batches", "retries"}."""
+    stats = {"deleted": 0, "batches": 0, "retries": 0}
+    for batch in _groups(ids, max(1, batch_size)):
+        stats["retries"] += _with_retries(lambda: store.delete(batch, namespace=namespace), max_retries)
+        stats["deleted"] += len(batch)
+        stats["batches"] += 1
+
+    if stats["deleted"]:
+        print(f"📌 Deleted {stats['deleted']} vectors in {stats['batches']} batches")
+    return stats
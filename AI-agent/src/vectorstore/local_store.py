@@ -0,0 +1,439 @@
+"""
+In-process vector store, used instead of Pinecone when
+VECTOR_STORE_BACKEND=local.
+
+Each namespace is two append-only files under the store directory:
+
+    <namespace>.f32    raw float32 rows (unit-normalized), memory-mapped
+    <namespace>.jsonl  operation log: which id/metadata lives in which row,
+                       and which ids were deleted
+
+Upserting an existing id appends a new row and retires the old one; the
+files are compacted once retired rows outnumber live ones.
+
+Several processes (e.g. uvicorn workers) may share a store directory:
+writes hold an exclusive flock on <namespace>.lock, take their row numbers
+from the vectors file itself and first replay whatever other processes
+appended to the log; reads take the lock shared and replay the same way.
+Without fcntl (Windows) the store is single-process only.
+
+Queries use exact cosine similarity (one matrix-vector product) for small
+namespaces and an IVF index (k-means coarse quantizer, probing the closest
+lists) once a namespace reaches LOCAL_VECTOR_STORE_ANN_THRESHOLD vectors.
+Metadata filters support Pinecone's equality operators: {"pdf": "x"}, $eq,
+$ne, $in, $nin. A filtered IVF query widens the probe until top_k rows pass
+the filter.
+"""
+
+import json
+import os
+import re
+import threading
+from contextlib import contextmanager
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+
+import numpy as np
+
+from src.config import LOCAL_VECTOR_STORE_ANN_THRESHOLD, LOCAL_VECTOR_STORE_NPROBE
+from src.vectorstore.store import VectorStore
+
+DEFAULT_NAMESPACE = "__default__"
+
+
+def _normalize_rows(matrix: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return matrix / norms
+
+
+class _IVFIndex:
+    """
+    Inverted-file index over a snapshot of the namespace: rows are grouped
+    by their nearest k-means centroid and a query scans only the lists whose
+    centroids are closest to it.
+    """
+
+    def __init__(self, vectors: np.ndarray, rows: np.ndarray, iterations: int = 8, seed: int = 0):
+        rng = np.random.default_rng(seed)
+        n = len(rows)
+        nlist = max(1, int(np.sqrt(n)))
+
+        sample_rows = rng.choice(n, size=min(n, nlist * 64), replace=False)
+        sample = np.asarray(vectors[rows[sample_rows]])
+        centroids = sample[rng.choice(len(sample), size=nlist, replace=False)]
+
+        for _ in range(iterations):
+            labels = np.argmax(sample @ centroids.T, axis=1)
+            sums = np.zeros_like(centroids)
+            np.add.at(sums, labels, sample)
+            counts = np.bincount(labels, minlength=nlist)
+            filled = counts > 0
+            centroids[filled] = _normalize_rows(sums[filled])
+
+        labels = np.empty(n, dtype=np.int64)
+        for start in range(0, n, 8192):
+            block = np.asarray(vectors[rows[start:start + 8192]])
+            labels[start:start + 8192] = np.argmax(block @ centroids.T, axis=1)
+
+        order = np.argsort(labels, kind="stable")
+        bounds = np.searchsorted(labels[order], np.arange(nlist + 1))
+
+        self.centroids = centroids
+        self.lists = [rows[order[bounds[c]:bounds[c + 1]]] for c in range(nlist)]
+        self.built_rows = int(rows.max()) + 1 if n else 0
+        self.size = n
+
+    def candidates(self, query: np.ndarray, nprobe: int) -> np.ndarray:
+        nprobe = min(nprobe, len(self.lists))
+        closest = np.argpartition(-(self.centroids @ query), nprobe - 1)[:nprobe]
+        return np.concatenate([self.lists[c] for c in closest])
+
+
+class _Namespace:
+
+    def __init__(self, prefix: str, dimension: int):
+        self.vectors_path = f"{prefix}.f32"
+        self.log_path = f"{prefix}.jsonl"
+        self.lock_path = f"{prefix}.lock"
+        self.dimension = dimension
+        self._reset()
+
+    # ----------- Persistence ---------------
+    @contextmanager
+    def locked(self, exclusive: bool):
+        """flock shared by every process using this namespace."""
+        if fcntl is None:
+            yield
+            return
+        with open(self.lock_path, "a") as f:
+            fcntl.flock(f, fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH)
+            try:
+                yield
+            finally:
+                fcntl.flock(f, fcntl.LOCK_UN)
+
+    def _reset(self):
+        self.ids = []        # row -> id
+        self.metadata = []   # row -> metadata dict
+        self.rows = {}       # id -> live row
+        self.live = np.zeros(0, dtype=bool)
+        self.vectors = np.zeros((0, self.dimension), dtype=np.float32)
+
+        self._field_index = {}
+        self._ivf = None
+        self._log_inode = None
+        self._log_offset = 0  # bytes of the log already replayed
+
+    def refresh(self):
+        """
+        Replays log lines appended since the last call, by this process or
+        another one. A compaction elsewhere replaces the log, so a new inode
+        means starting over. Call with the lock held.
+        """
+        try:
+            stat = os.stat(self.log_path)
+        except FileNotFoundError:
+            return
+        if stat.st_ino != self._log_inode or stat.st_size < self._log_offset:
+            self._reset()
+            self._log_inode = stat.st_ino
+        if stat.st_size == self._log_offset:
+            return
+
+        with open(self.log_path, "rb") as f:
+            f.seek(self._log_offset)
+            data = f.read()
+        complete = data.rfind(b"\n") + 1  # a torn last line is left for later
+        self._log_offset += complete
+
+        # Vectors are written before their log lines, so every row named below exists
+        row_count = os.path.getsize(self.vectors_path) // (self.dimension * 4)
+        grow = row_count - len(self.ids)
+        self.ids.extend([None] * grow)
+        self.metadata.extend([None] * grow)
+        live = np.concatenate([self.live, np.zeros(grow, dtype=bool)])
+
+        for line in data[:complete].splitlines():
+            try:
+                op = json.loads(line)
+            except ValueError:
+                continue
+            if op["op"] == "u" and op["row"] < row_count:
+                old = self.rows.get(op["id"])
+                if old is not None:
+                    live[old] = False
+                self.rows[op["id"]] = op["row"]
+                self.ids[op["row"]] = op["id"]
+                self.metadata[op["row"]] = op.get("metadata") or {}
+                live[op["row"]] = True
+            elif op["op"] == "d":
+                old = self.rows.pop(op["id"], None)
+                if old is not None:
+                    live[old] = False
+
+        self.live = live
+        self._remap(row_count)
+        self._field_index = {}
+
+    def _remap(self, row_count: int):
+        if row_count == 0:
+            self.vectors = np.zeros((0, self.dimension), dtype=np.float32)
+        else:
+            self.vectors = np.memmap(self.vectors_path, dtype=np.float32, mode="r",
+                                     shape=(row_count, self.dimension))
+
+    def _append_log(self, ops: list):
+        with open(self.log_path, "ab") as f:
+            f.writelines((json.dumps(op) + "\n").encode("utf-8") for op in ops)
+            end = f.tell()
+        if self._log_inode is None:
+            self._log_inode = os.stat(self.log_path).st_ino
+        self._log_offset = end  # refresh() ran under the same lock: nothing in between
+
+    def _compact(self):
+        rows = np.flatnonzero(self.live)
+        tmp_vectors = f"{self.vectors_path}.tmp"
+        tmp_log = f"{self.log_path}.tmp"
+
+        with open(tmp_vectors, "wb") as f:
+            for start in range(0, len(rows), 8192):
+                f.write(np.asarray(self.vectors[rows[start:start + 8192]]).tobytes())
+        with open(tmp_log, "w", encoding="utf-8") as f:
+            for new_row, row in enumerate(rows):
+                f.write(json.dumps({"op": "u", "id": self.ids[row], "row": new_row,
+                                    "metadata": self.metadata[row]}) + "\n")
+
+        os.replace(tmp_vectors, self.vectors_path)
+        os.replace(tmp_log, self.log_path)
+        stat = os.stat(self.log_path)
+        self._log_inode, self._log_offset = stat.st_ino, stat.st_size
+
+        self.ids = [self.ids[r] for r in rows]
+        self.metadata = [self.metadata[r] for r in rows]
+        self.rows = {vec_id: i for i, vec_id in enumerate(self.ids)}
+        self.live = np.ones(len(rows), dtype=bool)
+        self._remap(len(rows))
+        self._field_index = {}
+        self._ivf = None
+
+    # ----------- Writes (exclusive lock, after refresh) ---------------
+    def upsert(self, vectors: list):
+        if not vectors:
+            return 0
+
+        matrix = _normalize_rows(np.asarray([v["values"] for v in vectors], dtype=np.float32))
+        if matrix.shape[1] != self.dimension:
+            raise ValueError(f"Vector dimension {matrix.shape[1]} does not match store dimension {self.dimension}")
+
+        # Rows written by a process that died before logging them stay dead
+        first_row = len(self.ids)
+        ops = []
+        live = np.concatenate([self.live, np.ones(len(vectors), dtype=bool)])
+
+        for offset, v in enumerate(vectors):
+            row = first_row + offset
+            old = self.rows.get(v["id"])
+            if old is not None:
+                live[old] = False
+            metadata = v.get("metadata") or {}
+            self.rows[v["id"]] = row
+            self.ids.append(v["id"])
+            self.metadata.append(metadata)
+            ops.append({"op": "u", "id": v["id"], "row": row, "metadata": metadata})
+
+        with open(self.vectors_path, "ab") as f:
+            f.truncate(first_row * self.dimension * 4)  # drop a torn partial row
+            f.write(np.ascontiguousarray(matrix, dtype=np.float32).tobytes())
+        self._append_log(ops)
+        self.live = live
+        self._remap(len(self.ids))
+        self._field_index = {}
+        self._maybe_compact()
+        return len(vectors)
+
+    def delete(self, ids: list):
+        ops = []
+        for vec_id in ids:
+            row = self.rows.pop(vec_id, None)
+            if row is not None:
+                self.live[row] = False
+                ops.append({"op": "d", "id": vec_id})
+        if ops:
+            self._append_log(ops)
+            self._field_index = {}
+            self._maybe_compact()
+
+    def _maybe_compact(self):
+        dead = len(self.live) - len(self.rows)
+        if dead > 1000 and dead > len(self.rows):
+            self._compact()
+
+    # ----------- Reads ---------------
+    def _rows_with(self, field: str, values) -> np.ndarray:
+        index = self._field_index.get(field)
+        if index is None:
+            index = {}
+            for row, meta in enumerate(self.metadata):
+                value = meta.get(field) if meta else None
+                for v in value if isinstance(value, list) else [value]:
+                    try:
+                        index.setdefault(v, []).append(row)
+                    except TypeError:
+                        continue  # unhashable metadata values cannot be filtered on
+            index = {k: np.asarray(v, dtype=np.int64) for k, v in index.items()}
+            self._field_index[field] = index
+
+        hits = [index[v] for v in values if v in index]
+        return np.concatenate(hits) if hits else np.zeros(0, dtype=np.int64)
+
+    def filter_mask(self, filter: dict) -> np.ndarray:
+        mask = self.live.copy()
+
+        for field, condition in (filter or {}).items():
+            if not isinstance(condition, dict):
+                condition = {"$eq": condition}
+
+            for op, value in condition.items():
+                field_mask = np.zeros(len(mask), dtype=bool)
+                if op in ("$eq", "$ne"):
+                    field_mask[self._rows_with(field, [value])] = True
+                elif op in ("$in", "$nin"):
+                    field_mask[self._rows_with(field, value)] = True
+                else:
+                    raise ValueError(f"Unsupported filter operator: {op}")
+
+                mask &= ~field_mask if op in ("$ne", "$nin") else field_mask
+
+        return mask
+
+    def query(self, vector, top_k: int, filter: dict, include_metadata: bool) -> dict:
+        if not self.rows:
+            return {"matches": []}
+
+        query = np.asarray(vector, dtype=np.float32)
+        norm = np.linalg.norm(query)
+        if norm:
+            query = query / norm
+
+        mask = self.filter_mask(filter)
+        candidates = self._candidates(query, mask, top_k)
+        if len(candidates) == 0:
+            return {"matches": []}
+
+        scores = np.asarray(self.vectors[candidates]) @ query
+        k = min(top_k, len(candidates))
+        best = np.argpartition(-scores, k - 1)[:k]
+        best = best[np.argsort(-scores[best], kind="stable")]
+
+        matches = []
+        for i in best:
+            row = int(candidates[i])
+            match = {"id": self.ids[row], "score": float(scores[i])}
+            if include_metadata:
+                match["metadata"] = self.metadata[row]
+            matches.append(match)
+        return {"matches": matches}
+
+    def _candidates(self, query: np.ndarray, mask: np.ndarray, top_k: int) -> np.ndarray:
+        """Rows passing the filter to score: all of them, or those in the probed IVF lists."""
+        if len(self.rows) < LOCAL_VECTOR_STORE_ANN_THRESHOLD:
+            self._ivf = None
+            return np.flatnonzero(mask)
+
+        # (Re)build once the namespace has grown 20% past the last build
+        if self._ivf is None or len(self.rows) > self._ivf.size * 1.2:
+            self._ivf = _IVFIndex(self.vectors, np.flatnonzero(self.live))
+
+        # A filter can reject most of the probed rows: double nprobe until top_k
+        # rows pass it, or every list has been probed
+        tail = np.arange(self._ivf.built_rows, len(self.ids))
+        wanted = min(top_k, int(np.count_nonzero(mask)))
+        nprobe = LOCAL_VECTOR_STORE_NPROBE
+        while True:
+            candidates = np.concatenate([self._ivf.candidates(query, nprobe), tail])
+            candidates = candidates[mask[candidates]]
+            if len(candidates) >= wanted or nprobe >= len(self._ivf.lists):
+                return candidates
+            nprobe *= 2
+
+
+class LocalVectorStore(VectorStore):
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        self._lock = threading.RLock()
+        self._namespaces = {}
+        self.dimension = None
+
+        os.makedirs(directory, exist_ok=True)
+        self._info_path = os.path.join(directory, "store.json")
+        if os.path.exists(self._info_path):
+            self._read_info()
+
+    def _read_info(self):
+        with open(self._info_path, encoding="utf-8") as f:
+            self.dimension = json.load(f)["dimension"]
+
+    def _namespace(self, namespace: str, create: bool) -> _Namespace:
+        name = namespace or DEFAULT_NAMESPACE
+        ns = self._namespaces.get(name)
+        if ns is None:
+            if self.dimension is None and os.path.exists(self._info_path):
+                self._read_info()  # written by another process since
+            if self.dimension is None:
+                return None
+            prefix = os.path.join(self.directory, re.sub(r"[^A-Za-z0-9_.-]+", "_", name))
+            if not create and not os.path.exists(f"{prefix}.f32"):
+                return None
+            ns = _Namespace(prefix, self.dimension)
+            self._namespaces[name] = ns
+        return ns
+
+    def upsert(self, vectors: list, namespace: str = None):
+        if not vectors:
+            return {"upserted_count": 0}
+
+        with self._lock:
+            if self.dimension is None:
+                self.dimension = len(vectors[0]["values"])
+                tmp = f"{self._info_path}.{os.getpid()}.tmp"
+                with open(tmp, "w", encoding="utf-8") as f:
+                    json.dump({"dimension": self.dimension}, f)
+                os.replace(tmp, self._info_path)  # other processes never read half a file
+            ns = self._namespace(namespace, create=True)
+            with ns.locked(exclusive=True):
+                ns.refresh()
+                count = ns.upsert(vectors)
+        return {"upserted_count": count}
+
+    def query(self, vector, top_k: int = 5, namespace: str = None, filter: dict = None,
+              include_metadata: bool = True) -> dict:
+        with self._lock:
+            ns = self._namespace(namespace, create=False)
+            if ns is None:
+                return {"matches": []}
+            with ns.locked(exclusive=False):
+                ns.refresh()
+            return ns.query(vector, top_k, filter, include_metadata)
+
+    def delete(self, ids: list, namespace: str = None):
+        with self._lock:
+            ns = self._namespace(namespace, create=False)
+            if ns is not None:
+                with ns.locked(exclusive=True):
+                    ns.refresh()
+                    ns.delete(ids)
+        return {}
+
+    def list_ids(self, prefix: str = None, namespace: str = None):
+        with self._lock:
+            ns = self._namespace(namespace, create=False)
+            if ns is None:
+                return iter(())
+            with ns.locked(exclusive=False):
+                ns.refresh()
+            return iter([vec_id for vec_id in ns.rows if not prefix or vec_id.startswith(prefix)])
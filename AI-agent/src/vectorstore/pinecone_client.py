@@ -1,22 +1,41 @@
-from pinecone import Pinecone, ServerlessSpec
-import os
+from src import resources
+from src.config import PINECONE_API_KEY
 
-PINECONE_API_KEY = os.getenv("PINECONE_API_KEY")
+INDEX_NAME = "study-planner"
 
-pc = Pinecone(api_key=PINECONE_API_KEY)
 
-INDEX_NAME = "study-planner"
+def _create_client():
+    from pinecone import Pinecone
+    return Pinecone(api_key=PINECONE_API_KEY)
+
 
-# Create index if not exists
-if INDEX_NAME not in pc.list_indexes().names():
-    pc.create_index(
-        name=INDEX_NAME,
-        dimension=384,  # for "all-MiniLM-L6-v2"
-        metric="cosine",
-        spec=ServerlessSpec(
-            cloud="aws",
-            region="us-east-1"
+def _create_index():
+    from pinecone import ServerlessSpec
+
+    pc = get_pinecone_client()
+
+    # Create index if not exists
+    if INDEX_NAME not in pc.list_indexes().names():
+        pc.create_index(
+            name=INDEX_NAME,
+            dimension=384,  # for "all-MiniLM-L6-v2"
+            metric="cosine",
+            spec=ServerlessSpec(
+                cloud="aws",
+                region="us-east-1"
+            )
         )
-    )
 
-index = pc.Index(INDEX_NAME)
+    return pc.Index(INDEX_NAME)
+
+
+resources.register("pinecone_client", _create_client)
+resources.register("study_planner_index", _create_index)
+
+
+def get_pinecone_client():
+    return resources.get("pinecone_client")
+
+
+def get_index():
+    return resources.get("study_planner_index")
@@ -1,28 +1,43 @@
-from .pinecone_client import index
-from sentence_transformers import SentenceTransformer
+from src import resources
+from src.preprocessing.embedding_service import embed_cached
+from .pinecone_client import INDEX_NAME, get_index
+from .store import get_vector_store
+from .bulk_upsert import bulk_upsert
 
-model = SentenceTransformer("all-MiniLM-L6-v2")
+
+MODEL_NAME = "all-MiniLM-L6-v2"
+
+
+def _load_model():
+    from sentence_transformers import SentenceTransformer
+    return SentenceTransformer(MODEL_NAME)
+
+
+resources.register("minilm_model", _load_model)
+
+
+def get_store():
+    return get_vector_store(INDEX_NAME, get_index)
+
+def embed_batch(texts: list):
+    return embed_cached(MODEL_NAME, lambda: resources.get("minilm_model"), texts)
 
 def embed(text):
-    return model.encode(text).tolist()
+    return embed_batch([text])[0].tolist()
 
 def store_sections(sections: list):
-    vectors = []
-
-    for i, sec in enumerate(sections):
-        vectors.append({
-            "id": f"sec-{i}",
-            "values": embed(sec),
-            "metadata": {"text": sec}
-        })
+    items = (
+        {"id": f"sec-{i}", "text": sec, "metadata": {"text": sec}}
+        for i, sec in enumerate(sections)
+    )
 
-    index.upsert(vectors=vectors)
+    bulk_upsert(get_store(), items, embed_fn=embed_batch)
     return True
 
 def search(query: str, top_k: int = 5):
     query_vec = embed(query)
 
-    results = index.query(
+    results = get_store().query(
         vector=query_vec,
         top_k=top_k,
         include_metadata=True
@@ -0,0 +1,117 @@
+"""
+Pluggable vector-store interface.
+
+Every backend takes and returns Pinecone-shaped data, so callers do not care
+which one is configured:
+
+    upsert([{"id", "values", "metadata"}], namespace=None)
+    query(vector=..., top_k=5, namespace=None, filter=None, include_metadata=True)
+        -> {"matches": [{"id", "score", "metadata"}]}
+    delete(ids=[...], namespace=None)
+
+Backends may also support listing ids, which document sync
+(src.vectorstore.sync) needs to find stale vectors:
+
+    list_ids(prefix=None, namespace=None) -> iterator of stored ids
+
+Those that cannot raise UnsupportedOperation.
+
+The backend is chosen by VECTOR_STORE_BACKEND ("pinecone" or "local").
+"""
+
+import os
+from abc import ABC, abstractmethod
+
+from src import resources
+from src.config import VECTOR_STORE_BACKEND, LOCAL_VECTOR_STORE_DIR
+
+
+class UnsupportedOperation(NotImplementedError):
+    """The backend (or this particular index) does not support an optional operation."""
+
+
+class VectorStore(ABC):
+
+    @abstractmethod
+    def upsert(self, vectors: list, namespace: str = None):
+        ...
+
+    @abstractmethod
+    def query(self, vector, top_k: int = 5, namespace: str = None, filter: dict = None,
+              include_metadata: bool = True) -> dict:
+        ...
+
+    @abstractmethod
+    def delete(self, ids: list, namespace: str = None):
+        ...
+
+    def list_ids(self, prefix: str = None, namespace: str = None):
+        """Optional: ids stored in `namespace` starting with `prefix`."""
+        raise UnsupportedOperation(f"{type(self).__name__} cannot list ids")
+
+
+class PineconeVectorStore(VectorStore):
+    """Thin adapter over a Pinecone Index."""
+
+    def __init__(self, index):
+        self.index = index
+
+    @staticmethod
+    def _ns(namespace):
+        return {"namespace": namespace} if namespace else {}
+
+    def upsert(self, vectors: list, namespace: str = None):
+        return self.index.upsert(vectors=vectors, **self._ns(namespace))
+
+    def query(self, vector, top_k: int = 5, namespace: str = None, filter: dict = None,
+              include_metadata: bool = True) -> dict:
+        kwargs = self._ns(namespace)
+        if filter:
+            kwargs["filter"] = filter
+        return self.index.query(vector=vector, top_k=top_k, include_metadata=include_metadata, **kwargs)
+
+    def delete(self, ids: list, namespace: str = None):
+        return self.index.delete(ids=ids, **self._ns(namespace))
+
+    def list_ids(self, prefix: str = None, namespace: str = None):
+        # Paginated listing; only serverless indexes support it (pod-based
+        # ones answer 400, older clients have no list())
+        kwargs = self._ns(namespace)
+        if prefix:
+            kwargs["prefix"] = prefix
+        if not hasattr(self.index, "list"):
+            raise UnsupportedOperation("this Pinecone client cannot list ids")
+        pages = self.index.list(**kwargs)
+        try:
+            first = next(pages, [])
+        except Exception as e:
+            if getattr(e, "status", None) == 400:
+                raise UnsupportedOperation(f"this Pinecone index cannot list ids: {e}") from e
+            raise
+        yield from first
+        for page in pages:
+            yield from page
+
+
+def get_vector_store(index_name: str, connect_pinecone) -> VectorStore:
+    """
+    Returns the shared store for `index_name` using the configured backend.
+
+    :param connect_pinecone: callable returning the Pinecone Index; only
+                             called when the Pinecone backend is selected.
+    """
+    if VECTOR_STORE_BACKEND == "local":
+        from src.vectorstore.local_store import LocalVectorStore
+
+        return resources.get_or_create(
+            f"vector_store:local:{index_name}",
+            lambda: LocalVectorStore(os.path.join(LOCAL_VECTOR_STORE_DIR, index_name)),
+        )
+
+    if VECTOR_STORE_BACKEND != "pinecone":
+        raise ValueError(f"Unknown VECTOR_STORE_BACKEND: {VECTOR_STORE_BACKEND}")
+
+    return resources.get_or_create(
+        f"vector_store:pinecone:{index_name}",
+        lambda: PineconeVectorStore(connect_pinecone()),
+    )
@@ -0,0 +1,252 @@
+"""
+Content-hash vector ids and differential document sync.
+
+Every vector of a document gets an id made of the document key and a hash of
+its text and metadata:
+
+    <percent-encoded doc id>#<sha256 prefix>
+
+The same heading of the same document always maps to the same id, two
+documents never share ids, and editing one heading changes only that id.
+Where an item sits in the document (offsets, page span) goes in its
+"location", which is stored as metadata but not hashed, so items that only
+moved keep their ids. The
+document key never contains "#", so one document's prefix cannot match
+another document's ids.
+
+Sync mode lists the ids already stored under the document's prefix (in its
+namespace), upserts only the items whose ids are not stored yet and
+bulk-deletes the stored ids that are no longer wanted. Re-uploading an
+unchanged file costs one listing, and an edited one costs one write per
+changed item. New vectors are written before stale ones are deleted, so the
+document is never missing from search mid-sync.
+
+Vectors written before content-hash ids used positional ids, "<name>-<n>"
+("notes.pdf-3" from /upload-pdf, "heading-3" from store_headings_in_pinecone).
+They are not under any document prefix, so sync only removes them when given
+the old prefix (`legacy_prefix`); `python -m src.vectorstore.sync` deletes
+them in one go.
+"""
+
+import argparse
+import hashlib
+import itertools
+import json
+import sys
+from typing import List, NamedTuple
+from urllib.parse import quote
+
+from src import metrics
+from src.vectorstore.bulk_upsert import bulk_delete, bulk_upsert
+from src.vectorstore.store import UnsupportedOperation
+
+_HASH_CHARS = 24
+
+
+def document_prefix(doc_id: str) -> str:
+    """Id prefix shared by all vectors of `doc_id`."""
+    return quote(str(doc_id), safe="") + "#"
+
+
+def content_id(doc_id: str, text: str, metadata: dict = None) -> str:
+    payload = json.dumps([text, metadata or {}], sort_keys=True, ensure_ascii=False, default=str)
+    return document_prefix(doc_id) + hashlib.sha256(payload.encode("utf-8")).hexdigest()[:_HASH_CHARS]
+
+
+def iter_content_ids(doc_id: str, items, seen: set = None):
+    """
+    Yields copies of {"text", "metadata"[, "location", "values"]} items with
+    their content id, lazily, without empty texts and repeats (first kept).
+    The id hashes the text and metadata; "location" is merged into the
+    stored metadata. Only the ids are remembered, in `seen`.
+    """
+    seen = set() if seen is None else seen
+    for item in items:
+        if not item["text"].strip():
+            continue
+        vec_id = content_id(doc_id, item["text"], item.get("metadata"))
+        if vec_id in seen:
+            continue
+        seen.add(vec_id)
+
+        copy = {key: value for key, value in item.items() if key != "location"}
+        copy["id"] = vec_id
+        if item.get("location"):
+            copy["metadata"] = {**(item.get("metadata") or {}), **item["location"]}
+        yield copy
+
+
+def with_content_ids(doc_id: str, items) -> List[dict]:
+    """iter_content_ids() as a list."""
+    return list(iter_content_ids(doc_id, items))
+
+
+def legacy_ids(store, prefix: str, namespace: str = None) -> List[str]:
+    """Positional ids "<prefix><n>" from before content-hash ids."""
+    return [
+        vec_id for vec_id in store.list_ids(prefix=prefix, namespace=namespace)
+        if vec_id[len(prefix):].isdigit()
+    ]
+
+
+@metrics.timed("vector_sync")
+def list_document_ids(store, doc_id: str, namespace: str = None, legacy_prefix: str = None):
+    """
+    (ids stored under the document's prefix, its positional ids under
+    `legacy_prefix`), or None if the store cannot list ids.
+    """
+    try:
+        stored = set(store.list_ids(prefix=document_prefix(doc_id), namespace=namespace))
+        legacy = legacy_ids(store, legacy_prefix, namespace=namespace) if legacy_prefix else []
+    except UnsupportedOperation as e:
+        # Indexes that cannot list ids (Pinecone pod indexes) get a full upsert
+        print(f"⚠️ Could not list stored ids for {doc_id}, upserting everything: {e}")
+        return None
+    return stored, legacy
+
+
+class SyncPlan(NamedTuple):
+    upsert: list  # items (with ids) not stored yet
+    delete: list  # stored ids the document no longer has
+    kept: int     # items already stored
+
+
+def plan_sync(store, doc_id: str, items, namespace: str = None, legacy_prefix: str = None) -> SyncPlan:
+    """
+    Diffs the document's wanted items against the ids `store` already holds.
+    Positional ids under `legacy_prefix` (e.g. "notes.pdf-") are deleted too.
+    Holds every item; store_document() streams them instead.
+    """
+    items = with_content_ids(doc_id, items)
+    listed = list_document_ids(store, doc_id, namespace=namespace, legacy_prefix=legacy_prefix)
+    if listed is None:
+        return SyncPlan(upsert=items, delete=[], kept=0)
+
+    stored, legacy = listed
+    wanted = {item["id"] for item in items}
+    return SyncPlan(
+        upsert=[item for item in items if item["id"] not in stored],
+        delete=sorted(stored - wanted) + sorted(legacy),
+        kept=len(wanted & stored),
+    )
+
+
+def apply_sync(store, plan: SyncPlan, namespace: str = None, embed_fn=None, progress=None) -> dict:
+    """
+    Writes a plan: upserts `plan.upsert` (embedded with `embed_fn`, else
+    ready vectors with "values"), then deletes `plan.delete`.
+    """
+    upserted = 0
+    if plan.upsert:
+        if embed_fn:
+            items = plan.upsert
+        else:
+            items = [
+                {"id": item["id"], "values": item["values"], "metadata": item.get("metadata") or {}}
+                for item in plan.upsert
+            ]
+        upserted = bulk_upsert(store, items, namespace=namespace, embed_fn=embed_fn, progress=progress)["vectors"]
+
+    deleted = bulk_delete(store, plan.delete, namespace=namespace)["deleted"] if plan.delete else 0
+    return {"kept": plan.kept, "upserted": upserted, "deleted": deleted}
+
+
+def _as_vectors(items):
+    for item in items:
+        yield {"id": item["id"], "values": item["values"], "metadata": item.get("metadata") or {}}
+
+
+def store_document(store, doc_id: str, items, namespace: str = None, embed_fn=None,
+                   sync: bool = True, progress=None, legacy_prefix: str = None) -> dict:
+    """
+    Stores a document's items under content-hash ids.
+
+    Items are streamed: the stored ids are listed first, then each item is
+    skipped or sent to bulk_upsert as it comes. Memory grows only with the
+    number of ids (the document's stored ids and those seen so far), not
+    with its text or vectors.
+
+    :param items: {"text", "metadata"[, "location"]} items embedded with
+                  `embed_fn`, or ready vectors {"text", "values", "metadata"}
+    :param sync: only write new items and delete the document's stale ones;
+                 otherwise upsert every item (nothing is deleted)
+    :param legacy_prefix: with `sync`, also delete the document's positional
+                          ids "<legacy_prefix><n>"
+    :return: {"kept", "upserted", "deleted"}
+    """
+    listed = list_document_ids(store, doc_id, namespace=namespace, legacy_prefix=legacy_prefix) if sync else None
+    stored = listed[0] if listed else set()
+    seen = set()
+    stats = {"kept": 0, "upserted": 0, "deleted": 0}
+
+    def pending():
+        for item in iter_content_ids(doc_id, items, seen):
+            if item["id"] in stored:
+                stats["kept"] += 1
+            else:
+                yield item
+
+    upserts = pending()
+    first = next(upserts, None)
+    if first is not None:
+        upserts = itertools.chain([first], upserts)
+        if not embed_fn:
+            upserts = _as_vectors(upserts)
+        stats["upserted"] = bulk_upsert(store, upserts, namespace=namespace, embed_fn=embed_fn,
+                                        progress=progress)["vectors"]
+
+    if listed:
+        stale = sorted(stored - seen) + sorted(listed[1])
+        if stale:
+            stats["deleted"] = bulk_delete(store, stale, namespace=namespace)["deleted"]
+
+    if sync:
+        print(f"📌 Synced {doc_id}: {stats['kept']} kept, {stats['upserted']} upserted, "
+              f"{stats['deleted']} deleted")
+    return stats
+
+
+# ------------------------------------------------
+# 🔹 One-off cleanup of positional ids
+# ------------------------------------------------
+def delete_legacy_ids(store, prefix: str, namespace: str = None, dry_run: bool = False) -> int:
+    """Deletes every "<prefix><n>" id; returns how many there were."""
+    ids = legacy_ids(store, prefix, namespace=namespace)
+    print(f"📌 {len(ids)} legacy ids under {prefix!r}" + (f" in {namespace!r}" if namespace else ""))
+    if ids and not dry_run:
+        bulk_delete(store, ids, namespace=namespace)
+    return len(ids)
+
+
+def main(argv=None):
+    """
+    Deletes the "heading-<n>" vectors store_headings_in_pinecone used to
+    write and, for each --pdf, the "<pdf>-<n>" vectors of /upload-pdf
+    (re-uploading a PDF with sync also removes its own).
+
+        python -m src.vectorstore.sync --pdf notes.pdf syllabus.pdf --dry-run
+    """
+    from src.config import PINECONE_INDEX, PINECONE_NAMESPACE
+    from src.preprocessing.embedding_service import get_embedding_service
+    from src.schedule.utils import get_headings_store
+
+    parser = argparse.ArgumentParser(description=main.__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--pdf", nargs="*", default=[], help="uploaded file names to clean up")
+    parser.add_argument("--dry-run", action="store_true", help="only count the ids")
+    args = parser.parse_args(argv)
+
+    try:
+        if PINECONE_INDEX:
+            delete_legacy_ids(get_headings_store(), "heading-", namespace=PINECONE_NAMESPACE, dry_run=args.dry_run)
+
+        store = get_embedding_service().index
+        for filename in args.pdf:
+            delete_legacy_ids(store, f"{filename}-", dry_run=args.dry_run)
+    except UnsupportedOperation as e:
+        print(f"⚠️ This index cannot list ids: {e}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,20 @@
+"""
+Test setup: everything runs offline. Vector writes go to the local store in
+a scratch directory and the embedding cache is off. Set before src.config is
+imported.
+"""
+
+import os
+import sys
+import tempfile
+
+_WORK_DIR = tempfile.mkdtemp(prefix="study-planner-tests-")
+os.environ["VECTOR_STORE_BACKEND"] = "local"
+os.environ["LOCAL_VECTOR_STORE_DIR"] = os.path.join(_WORK_DIR, "vectors")
+os.environ["ANALYSIS_CACHE_DIR"] = os.path.join(_WORK_DIR, "analysis")
+os.environ["UPLOAD_SPOOL_DIR"] = os.path.join(_WORK_DIR, "spool")
+os.environ["EMBEDDING_CACHE_ENABLED"] = "0"
+os.environ["EMBEDDING_CACHE_DIR"] = os.path.join(_WORK_DIR, "embeddings")
+os.environ["CHUNK_OVERLAP_TOKENS"] = "2"
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
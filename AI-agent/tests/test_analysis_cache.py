@@ -0,0 +1,75 @@
+"""
+PDF analysis cache (src.schedule.analysis_cache): versioned content keys,
+the in-memory LRU and least-recently-used eviction on disk.
+"""
+
+import hashlib
+import os
+
+from src.schedule import analysis_cache as module
+from src.schedule.analysis_cache import AnalysisCache
+
+
+def _cache(tmp_path, memory=2, disk=10**6):
+    return AnalysisCache(str(tmp_path), max_memory_items=memory, max_disk_bytes=disk)
+
+
+def _entry(n):
+    # Incompressible enough that every file has about the same size
+    return {"headings": [hashlib.sha256(f"{n}-{i}".encode()).hexdigest() for i in range(20)]}
+
+
+def test_keys_carry_the_cache_version(monkeypatch):
+    digest = hashlib.sha256(b"%PDF").hexdigest()
+    assert AnalysisCache.key_for(b"%PDF") == AnalysisCache.key_for_digest(digest) == f"{module.CACHE_VERSION}-{digest}"
+
+    monkeypatch.setattr(module, "CACHE_VERSION", "v-next")
+    assert AnalysisCache.key_for(b"%PDF") == f"v-next-{digest}"
+
+
+def test_entries_from_another_version_are_misses(tmp_path, monkeypatch):
+    cache = _cache(tmp_path)
+    cache.put(AnalysisCache.key_for(b"%PDF"), _entry(1))
+
+    monkeypatch.setattr(module, "CACHE_VERSION", "v-next")
+    assert _cache(tmp_path).get(AnalysisCache.key_for(b"%PDF")) is None
+
+
+def test_memory_lru_falls_back_to_disk(tmp_path):
+    cache = _cache(tmp_path, memory=2)
+    for n in range(3):
+        cache.put(f"k{n}", _entry(n))
+
+    assert cache.get("k2") == _entry(2)
+    assert cache.get("k0") == _entry(0)  # evicted from memory, still on disk
+    assert cache.get("missing") is None
+
+    stats = cache.stats()
+    assert (stats["memory_hits"], stats["disk_hits"], stats["misses"]) == (1, 1, 1)
+    assert stats["memory_items"] == 2
+
+
+def test_disk_evicts_least_recently_used_files(tmp_path):
+    cache = _cache(tmp_path)
+    cache.put("k0", _entry(0))
+    size = os.path.getsize(tmp_path / "k0.json.gz")
+    cache.max_disk_bytes = size * 3 + size // 2
+
+    for n in (1, 2):
+        cache.put(f"k{n}", _entry(n))
+    for n, mtime in ((0, 1000), (1, 1001), (2, 1002)):
+        os.utime(tmp_path / f"k{n}.json.gz", (mtime, mtime))
+
+    # A disk read marks k0 as used, so k1 is now the oldest
+    assert _cache(tmp_path).get("k0") == _entry(0)
+    cache.put("k3", _entry(3))
+
+    assert sorted(os.listdir(tmp_path)) == ["k0.json.gz", "k2.json.gz", "k3.json.gz"]
+    assert cache.stats()["disk_bytes"] <= cache.max_disk_bytes
+
+
+def test_disk_tier_can_be_turned_off(tmp_path):
+    cache = _cache(tmp_path, disk=0)
+    cache.put("k0", _entry(0))
+    assert os.listdir(tmp_path) == []
+    assert cache.get("k0") == _entry(0)
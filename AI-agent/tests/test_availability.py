@@ -0,0 +1,82 @@
+"""
+Availability/studyTime strings compiled to weekly patterns and capacity
+arrays (src.schedule.availability).
+"""
+
+from datetime import date
+
+import numpy as np
+
+from src.config import DEFAULT_DAILY_HOURS
+from src.schedule.availability import (
+    capacity_array,
+    compile_availability,
+    compile_study_time,
+    horizon_for,
+    weekly_capacity,
+)
+
+INF = np.inf
+
+
+def _week(availability):
+    return compile_availability(availability).tolist()
+
+
+def test_day_ranges_and_windows():
+    assert _week("Mon-Fri 9AM-5PM") == [8, 8, 8, 8, 8, 0, 0]
+    assert _week("Tue to Thu 18:00-21:00") == [0, 3, 3, 3, 0, 0, 0]
+    assert _week("Fri-Mon 7-9pm") == [2, 0, 0, 0, 2, 2, 2]
+
+
+def test_day_groups_flexible_and_off():
+    assert _week("Weekdays 6-8pm, Weekends flexible") == [2, 2, 2, 2, 2, 24, 24]
+    assert _week("Daily 2 hours, Sun off") == [2, 2, 2, 2, 2, 2, 0]
+
+
+def test_days_share_the_next_window():
+    assert _week("Mon, Wed 6-8pm") == [2, 0, 2, 0, 0, 0, 0]
+
+
+def test_window_without_days_and_unrecognised_text():
+    assert _week("7-9pm") == [2] * 7
+    assert _week("whenever I can") == [24] * 7
+    assert _week(None) == [24] * 7
+
+
+def test_compiled_patterns_are_cached_and_read_only():
+    week = compile_availability("Mon-Fri 9AM-5PM")
+    assert compile_availability("Mon-Fri 9AM-5PM") is week
+    assert not week.flags.writeable
+
+
+def test_study_time():
+    assert compile_study_time("3 hours/day") == (3.0, False)
+    assert compile_study_time("90 min") == (1.5, False)
+    assert compile_study_time("15 hours/week") == (15.0, True)
+    assert compile_study_time("as much as possible") is None
+    assert compile_study_time("0 hours") is None
+
+
+def test_weekly_capacity_caps_by_free_hours():
+    assert weekly_capacity("Mon-Fri 7-9pm, Sat flexible", "3 hours/day").tolist() == [2, 2, 2, 2, 2, 3, 0]
+    assert weekly_capacity("anytime", None).tolist() == [DEFAULT_DAILY_HOURS] * 7
+
+
+def test_weekly_budget_moves_to_days_with_room():
+    # 10 hours over Mon (1h free), Tue and Wed (flexible)
+    capacity = weekly_capacity("Mon 1 hour, Tue flexible, Wed flexible", "10 hours/week")
+    assert capacity.tolist() == [1.0, 4.5, 4.5, 0, 0, 0, 0]
+
+
+def test_capacity_array_starts_on_the_start_weekday():
+    # 2026-10-22 is a Thursday
+    capacity = capacity_array("Mon-Fri 7-9pm", "2 hours/day", date(2026, 10, 22), 10)
+    assert capacity.tolist() == [2, 2, 0, 0, 2, 2, 2, 2, 2, 0]
+    assert capacity.dtype == np.float64
+
+
+def test_horizon_for():
+    weekly = weekly_capacity("Mon-Fri 7-9pm", "2 hours/day")
+    assert horizon_for(20, weekly) == 14 + 7
+    assert horizon_for(20, np.zeros(7)) == 0
@@ -0,0 +1,52 @@
+"""
+Benchmark tooling: the synthetic syllabus generator, the offline encoder and
+the regression comparison against a baseline run.
+"""
+
+import fitz
+import numpy as np
+
+from benchmarks.suite import HashingEncoder, compare
+from benchmarks.syllabus_pdf import build_syllabus_pdf
+
+
+def test_syllabus_is_deterministic():
+    data = build_syllabus_pdf(3, seed=1)
+
+    assert build_syllabus_pdf(3, seed=1) == data
+    assert build_syllabus_pdf(3, seed=2) != data
+    with fitz.open(stream=data, filetype="pdf") as doc:
+        assert doc.page_count == 3
+        assert "Page 2 of 3" in doc[1].get_text()
+
+
+def test_hashing_encoder_is_deterministic_and_normalized():
+    encoder = HashingEncoder(dim=64)
+    matrix = encoder.encode(["binary search tree", "Binary  search tree", "hash table", ""])
+
+    assert matrix.shape == (4, 64) and encoder.get_sentence_embedding_dimension() == 64
+    assert np.array_equal(matrix[0], matrix[1])
+    assert np.allclose(np.linalg.norm(matrix[:3], axis=1), 1.0)
+    assert not matrix[3].any()
+
+
+def test_compare_flags_only_real_slowdowns():
+    baseline = {"results": {
+        "parse": {"median_s": 1.0},
+        "tiny": {"median_s": 0.001},
+        "faster": {"median_s": 0.5},
+        "broken": {"median_s": 0.5},
+    }}
+    current = {"results": {
+        "parse": {"median_s": 1.3},      # 30% slower
+        "tiny": {"median_s": 0.003},     # 3x, but within timer noise
+        "faster": {"median_s": 0.2},
+        "broken": {"error": "OSError: no model"},
+        "new": {"median_s": 9.0},        # no baseline
+    }}
+
+    rows, regressions = compare(current, baseline, tolerance=0.25)
+
+    assert regressions == ["parse"]
+    assert [row[0] for row in rows] == ["parse", "tiny", "faster"]
+    assert compare(current, baseline, tolerance=0.5)[1] == []
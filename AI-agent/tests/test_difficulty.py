@@ -0,0 +1,65 @@
+"""
+Difficulty scoring: term/word counting over all headings at once
+(src.extraction.term_matcher) must give the numbers of the per-heading
+loops it replaced, and rank_terms those of the dense TF-IDF sum.
+"""
+
+import random
+import re
+
+from sklearn.feature_extraction.text import TfidfVectorizer
+
+from src.extraction.term_matcher import count_terms, word_stats
+from src.schedule.utils import compute_topic_difficulty, rank_terms
+
+HEADINGS = [
+    "binary search trees", "Graph algorithms: BFS & DFS", "", "naïve bayes — théorème",
+    "hash tables", "binary search trees", "tree\x00search", "42",
+]
+TERMS = ["search", "tree", "search", "bayes", "", "s t", "é", "\x00s", "graph"]
+
+
+def _reference_score(heading, terms):
+    h = heading.lower()
+    words = re.findall(r"\w+", h)
+    term_count = sum(1 for t in terms if t in h)
+    return round(term_count * 3 + sum(map(len, words)) / (len(words) + 1) * 0.8, 3)
+
+
+def test_counts_match_the_per_heading_loop():
+    assert count_terms(HEADINGS, TERMS) == [sum(1 for t in TERMS if t in h) for h in HEADINGS]
+    assert count_terms([], TERMS) == [] and count_terms(HEADINGS, []) == [0] * len(HEADINGS)
+
+
+def test_word_stats_match_the_regex():
+    chars, words = word_stats(HEADINGS)
+    assert words == [len(re.findall(r"\w+", h)) for h in HEADINGS]
+    assert chars == [sum(map(len, re.findall(r"\w+", h))) for h in HEADINGS]
+    assert word_stats([]) == ([], [])
+
+
+def test_random_texts_match_the_loops():
+    rng = random.Random(0)
+    alphabet = "ab é_-\x00"
+    texts = ["".join(rng.choice(alphabet) for _ in range(rng.randrange(12))) for _ in range(300)]
+    terms = ["".join(rng.choice(alphabet) for _ in range(rng.randrange(1, 4))) for _ in range(40)]
+
+    assert count_terms(texts, terms) == [sum(1 for t in terms if t in x) for x in texts]
+    assert word_stats(texts)[1] == [len(re.findall(r"\w+", x)) for x in texts]
+
+
+def test_difficulty_scores_are_unchanged():
+    terms = ["search", "tree", "bayes", "graph"]
+    scores = compute_topic_difficulty(HEADINGS, "", tech_terms=terms)
+    assert scores == {h: _reference_score(h, terms) for h in HEADINGS}
+
+
+def test_rank_terms_matches_the_dense_sum():
+    phrases = ["binary search tree", "search tree", "hash table", "graph search", "the tree", "hash map"]
+
+    vectorizer = TfidfVectorizer(stop_words="english")
+    dense = vectorizer.fit_transform(phrases).toarray().sum(axis=0)
+    expected = [t for t, _ in sorted(zip(vectorizer.get_feature_names_out(), dense), key=lambda x: x[1], reverse=True)]
+
+    assert rank_terms(iter(phrases), top_k=4) == expected[:4]
+    assert rank_terms(iter(["the", "a"])) == []
@@ -0,0 +1,167 @@
+"""
+EmbeddingService.iter_chunks / upsert_document against the local vector
+store, with a small whitespace-tokenizing stand-in for the SentenceTransformer.
+"""
+
+import uuid
+import zlib
+
+import numpy as np
+import pytest
+
+from src.preprocessing.embedding_service import EmbeddingService
+from src.preprocessing.text_chunker import whitespace_token_spans
+from src.vectorstore.sync import content_id, document_prefix
+
+MAX_TOKENS = 8  # max_seq_length minus [CLS]/[SEP]
+OVERLAP = 2     # CHUNK_OVERLAP_TOKENS in conftest
+
+PAGES = [
+    (1, " ".join(f"p1w{i}" for i in range(12))),
+    (2, " ".join(f"p2w{i}" for i in range(5))),
+    (3, " ".join(f"p3w{i}" for i in range(14))),
+]
+
+
+class FakeModel:
+    max_seq_length = MAX_TOKENS + 2
+
+    def __init__(self):
+        self.encoded = []
+
+    @staticmethod
+    def tokenizer(text, add_special_tokens=False, return_offsets_mapping=True, verbose=False):
+        return {"offset_mapping": whitespace_token_spans(text)}
+
+    def get_sentence_embedding_dimension(self):
+        return 8
+
+    def encode(self, texts, **kwargs):
+        self.encoded.extend(texts)
+        return np.array(
+            [[zlib.crc32(f"{text}/{i}".encode()) % 97 + 1 for i in range(8)] for text in texts],
+            dtype=np.float32,
+        )
+
+
+@pytest.fixture
+def model(monkeypatch):
+    fake = FakeModel()
+    monkeypatch.setattr(EmbeddingService, "embedding_model", property(lambda self: fake))
+    return fake
+
+
+@pytest.fixture
+def service(model):
+    service = EmbeddingService()
+    service.index_name = f"test-{uuid.uuid4().hex}"  # a fresh local index per test
+    return service
+
+
+def _document(pages):
+    return "\n".join(text for _, text in pages)
+
+
+def _page_at(pages, offset):
+    start = 0
+    for number, text in pages:
+        if offset <= start + len(text):
+            return number
+        start += len(text) + 1
+    raise AssertionError(f"offset {offset} is past the document")
+
+
+def _expected_ids(doc_id, chunks, metadata):
+    return {
+        content_id(doc_id, chunk.text, {**metadata, "doc": doc_id, "text": chunk.text})
+        for chunk in chunks
+    }
+
+
+def test_chunks_point_into_the_document(service):
+    chunks = list(service.iter_chunks(PAGES))
+    document = _document(PAGES)
+
+    assert [chunk.index for chunk in chunks] == list(range(len(chunks)))
+    assert any(chunk.page_start != chunk.page_end for chunk in chunks)  # crosses a page break
+
+    for chunk in chunks:
+        assert chunk.text == document[chunk.char_start:chunk.char_end]
+        assert chunk.page_start == _page_at(PAGES, chunk.char_start)
+        assert chunk.page_end == _page_at(PAGES, chunk.char_end)
+        assert chunk.n_tokens == len(chunk.text.split()) <= MAX_TOKENS
+
+    for previous, current in zip(chunks, chunks[1:]):
+        assert previous.text.split()[-OVERLAP:] == current.text.split()[:OVERLAP]
+
+    # Every token is covered
+    covered = {word for chunk in chunks for word in chunk.text.split()}
+    assert covered == set(document.split())
+
+
+def test_upsert_document_stores_chunks_under_content_ids(service):
+    chunks = list(service.iter_chunks(PAGES))
+
+    stats = service.upsert_document("notes.pdf", PAGES, metadata={"course": "algebra"})
+
+    assert stats == {"kept": 0, "upserted": len(chunks), "deleted": 0}
+    stored = set(service.index.list_ids(prefix=document_prefix("notes.pdf")))
+    assert stored == _expected_ids("notes.pdf", chunks, {"course": "algebra"})
+
+    # The stored metadata carries the chunk's offsets and page span
+    chunk = chunks[1]
+    match = service.index.query(vector=service.embed_batch([chunk.text])[0].tolist(), top_k=1)["matches"][0]
+    assert match["metadata"]["text"] == chunk.text
+    assert match["metadata"]["page_start"] == chunk.page_start
+    assert match["metadata"]["page_end"] == chunk.page_end
+    assert match["metadata"]["char_start"] == chunk.char_start
+    assert match["metadata"]["course"] == "algebra"
+
+
+def test_resync_writes_only_changed_chunks(service, model):
+    old_chunks = list(service.iter_chunks(PAGES))
+    service.upsert_document("notes.pdf", PAGES)
+
+    model.encoded.clear()
+    stats = service.upsert_document("notes.pdf", PAGES)
+    assert stats == {"kept": len(old_chunks), "upserted": 0, "deleted": 0}
+    assert model.encoded == []
+
+    edited = PAGES[:2] + [(3, PAGES[2][1].replace("p3w12", "changed"))]
+    new_chunks = list(service.iter_chunks(edited))
+    old_ids = _expected_ids("notes.pdf", old_chunks, {})
+    new_ids = _expected_ids("notes.pdf", new_chunks, {})
+
+    model.encoded.clear()
+    stats = service.upsert_document("notes.pdf", edited)
+
+    assert 0 < stats["upserted"] == len(new_ids - old_ids) < len(new_chunks)
+    assert stats["deleted"] == len(old_ids - new_ids)
+    new_texts = {_expected_ids("notes.pdf", [c], {}).pop(): c.text for c in new_chunks}
+    assert sorted(model.encoded) == sorted(new_texts[vec_id] for vec_id in new_ids - old_ids)
+    assert set(service.index.list_ids(prefix=document_prefix("notes.pdf"))) == new_ids
+
+
+def test_insert_near_the_start_rewrites_few_chunks(service):
+    pages = [(n, " ".join(f"p{n}w{i}" for i in range(40))) for n in (1, 2, 3)]
+    chunks = list(service.iter_chunks(pages))
+    service.upsert_document("notes.pdf", pages)
+
+    edited = [(1, "inserted " + pages[0][1])] + pages[1:]
+    stats = service.upsert_document("notes.pdf", edited)
+
+    # Every later chunk moved by one word but keeps its id
+    assert stats["kept"] >= len(chunks) - 6
+    assert stats["upserted"] <= 6 and stats["deleted"] <= 6  # vs. every chunk with fixed windows
+    assert set(service.index.list_ids(prefix=document_prefix("notes.pdf"))) == _expected_ids(
+        "notes.pdf", service.iter_chunks(edited), {}
+    )
+
+
+def test_documents_do_not_share_ids(service):
+    service.upsert_document("a.pdf", PAGES)
+    service.upsert_document("a.pdf-2", PAGES)
+
+    a = set(service.index.list_ids(prefix=document_prefix("a.pdf")))
+    b = set(service.index.list_ids(prefix=document_prefix("a.pdf-2")))
+    assert a and b and not a & b
@@ -0,0 +1,84 @@
+"""
+The shared embedding cache: hits skip the model entirely, and a process with
+another configured capacity never resizes the file under other workers.
+"""
+
+import os
+import uuid
+
+import numpy as np
+import pytest
+
+from src import resources
+from src.preprocessing import embedding_cache
+from src.preprocessing.embedding_cache import EmbeddingCache, recorded_dimension
+from src.preprocessing.embedding_service import embed_cached
+
+DIM = 4
+
+
+class FakeModel:
+
+    def get_sentence_embedding_dimension(self):
+        return DIM
+
+    def encode(self, texts, **kwargs):
+        return np.array([[len(t), 1, 2, 3] for t in texts], dtype=np.float32)
+
+
+@pytest.fixture
+def cache_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(embedding_cache, "EMBEDDING_CACHE_ENABLED", True)
+    monkeypatch.setattr(embedding_cache, "EMBEDDING_CACHE_DIR", str(tmp_path))
+    return str(tmp_path)
+
+
+def test_cache_hits_do_not_load_the_model(cache_dir, monkeypatch):
+    model_name = f"model-{uuid.uuid4().hex}"
+    loads = []
+
+    def load():
+        loads.append(1)
+        return FakeModel()
+
+    first = embed_cached(model_name, load, ["graph theory", "", "markov chain"])
+    assert loads and not first[1].any()
+
+    # A new process: the cache object is gone but the dimension was recorded
+    monkeypatch.delitem(resources._instances, f"embedding_cache:{model_name}")
+    assert recorded_dimension(model_name) == DIM
+    loads.clear()
+
+    again = embed_cached(model_name, load, ["markov chain", "graph theory", "  "])
+
+    assert loads == []
+    np.testing.assert_array_equal(again, first[[2, 0, 1]])
+
+
+def test_misses_still_go_through_the_model(cache_dir):
+    model_name = f"model-{uuid.uuid4().hex}"
+    embed_cached(model_name, lambda: FakeModel(), ["graph theory"])
+
+    vectors = embed_cached(model_name, lambda: FakeModel(), ["graph theory", "hash table"])
+    assert vectors[:, 0].tolist() == [12, 10]
+
+
+def test_other_capacity_uses_the_existing_file(tmp_path):
+    small = EmbeddingCache(str(tmp_path), "m", DIM, capacity=8, dtype="float32")
+    small.store(["a", "b"], np.ones((2, DIM), dtype=np.float32))
+    size = os.path.getsize(small.vectors_path)
+
+    larger = EmbeddingCache(str(tmp_path), "m", DIM, capacity=16, dtype="float32")
+
+    assert larger.capacity == 8
+    assert os.path.getsize(small.vectors_path) == size
+    assert sorted(larger.lookup(["a", "b", "c"])) == [0, 1]
+
+
+def test_a_torn_vector_file_fails_loudly(tmp_path):
+    cache = EmbeddingCache(str(tmp_path), "m", DIM, capacity=8, dtype="float32")
+    with open(cache.vectors_path, "r+b") as f:
+        f.truncate(DIM * 4 * 3 + 2)
+
+    with pytest.raises(RuntimeError, match="whole number"):
+        EmbeddingCache(str(tmp_path), "m", DIM, capacity=8, dtype="float32")
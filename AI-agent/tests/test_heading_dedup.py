@@ -0,0 +1,115 @@
+"""
+Heading consolidation on the synthetic syllabus PDF (benchmarks.syllabus_pdf):
+stacked section headings stay separate, line-wrapped ones are joined.
+"""
+
+import re
+
+import numpy as np
+import pytest
+
+from benchmarks.syllabus_pdf import build_syllabus_pdf
+from src.extraction import heading_dedup
+from src.extraction.heading_dedup import (
+    HeadingSpan,
+    consolidate_headings,
+    dedupe_headings,
+    drop_running_headers,
+    merge_fragments,
+)
+from src.pdf.pdf_service import PDFService
+from src.schedule.utils import ingest_pdf
+
+SECTION = re.compile(r"(?:^|\s)\d+\.\d+\s")
+
+
+@pytest.fixture(scope="module")
+def syllabus_path(tmp_path_factory):
+    path = tmp_path_factory.mktemp("pdf") / "syllabus.pdf"
+    path.write_bytes(build_syllabus_pdf(6))
+    return str(path)
+
+
+def _extractors():
+    return [
+        ("ingest_pdf", lambda path: ingest_pdf(path)["headings"]),
+        ("PDFService.extract_headings", PDFService.extract_headings),
+    ]
+
+
+@pytest.mark.parametrize("name, extract", _extractors())
+def test_stacked_section_headings_stay_separate(syllabus_path, name, extract):
+    headings = extract(syllabus_path)
+
+    for number in ("1.1", "1.2", "1.3"):
+        assert sum(h.startswith(number + " ") for h in headings) == 1, (number, headings)
+    # No heading swallowed the next section's number
+    assert all(len(SECTION.findall(h + " ")) <= 1 for h in headings), headings
+
+
+@pytest.mark.parametrize("name, extract", _extractors())
+def test_every_heading_is_a_unit_or_section(syllabus_path, name, extract):
+    # Wrapped second lines are joined to their heading (no orphan
+    # fragments) and the running header/footer is gone
+    headings = extract(syllabus_path)
+
+    assert headings
+    assert all(re.match(r"Unit \d+: |\d+\.\d+ ", h) for h in headings), headings
+
+
+def _span(text, y0, x0=56.0, size=14.0):
+    return HeadingSpan(text, x0, x0 + 6 * len(text), y0, y0 + size * 1.2, size)
+
+
+def test_merge_fragments_joins_wraps_but_not_new_headings():
+    spans = [
+        # 22pt apart: each line box ends a few points above the next one
+        _span("1.1 Graph Theory", 100),
+        _span("1.2 Shortest Paths and", 122),  # stacked: a new section
+        _span("Minimum Spanning Trees", 139),   # wrapped continuation
+        _span("Chapter 2: Trees", 161),
+        _span("• Heaps", 183),
+    ]
+
+    assert [s.text for s in merge_fragments(spans)] == [
+        "1.1 Graph Theory",
+        "1.2 Shortest Paths and Minimum Spanning Trees",
+        "Chapter 2: Trees",
+        "• Heaps",
+    ]
+
+
+def test_merge_fragments_joins_spans_on_one_line():
+    first = _span("Chapter", 100)
+    second = _span("2 Basics", 100, x0=first.x1 + 3)
+
+    assert [s.text for s in merge_fragments([first, second])] == ["Chapter 2 Basics"]
+
+
+def _page(*spans, height=800.0):
+    return height, list(spans)
+
+
+def test_running_headers_go_but_repeated_body_headings_stay():
+    pages = [
+        _page(_span("Discrete Mathematics", 20), _span(f"Unit {n}: Topic {n}", 200),
+              _span("Summary", 500), _span(f"Page {n}", 770))
+        for n in range(1, 5)
+    ]
+
+    kept = [[span.text for span in spans] for spans in drop_running_headers(pages)]
+
+    assert kept == [[f"Unit {n}: Topic {n}", "Summary"] for n in range(1, 5)]
+    assert consolidate_headings(pages) == [
+        "Unit 1: Topic 1", "Summary", "Unit 2: Topic 2", "Unit 3: Topic 3", "Unit 4: Topic 4",
+    ]
+
+
+def test_near_duplicates_behind_a_dissimilar_bucket_head_are_merged(monkeypatch):
+    # Every heading lands in the same bucket of every band
+    monkeypatch.setattr(heading_dedup, "minhash_signatures",
+                        lambda groups: np.ones((len(groups), heading_dedup._NUM_PERM), dtype=np.uint64))
+
+    headings = ["Probability Theory", "Linear Algebra Basics", "Linear Algebra Basic", "Probability theory!"]
+
+    assert dedupe_headings(headings) == ["Probability Theory", "Linear Algebra Basics"]
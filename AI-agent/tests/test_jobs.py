@@ -0,0 +1,139 @@
+"""
+Background jobs (src.jobs): progress snapshots, error mapping, the pending
+limit, expiry and the server-sent event stream.
+"""
+
+import asyncio
+import json
+import threading
+import time
+
+import pytest
+from fastapi import HTTPException
+from fastapi.testclient import TestClient
+
+from src.jobs.manager import FAILED, SUCCEEDED, JobManager, job_manager
+from src.main import app
+from src.schedule.engine import ScheduleConstraintError
+
+
+def _wait(job):
+    for _ in range(500):
+        if job.status in (SUCCEEDED, FAILED):
+            return job.snapshot()
+        time.sleep(0.01)
+    raise AssertionError("job did not finish")
+
+
+def _parse_events(text):
+    events = []
+    for block in text.strip().split("\n\n"):
+        fields = dict(line.split(": ", 1) for line in block.splitlines() if not line.startswith(":"))
+        if fields:
+            events.append((fields["event"], json.loads(fields["data"])))
+    return events
+
+
+def _pipeline(progress):
+    progress("pages", parsed=2, total=4)
+    progress("pages", parsed=4)
+    progress("headings", found=3)
+    return {"headings": 3}
+
+
+def test_progress_and_result():
+    manager = JobManager(workers=1, max_pending=4, result_ttl=60)
+
+    snapshot = _wait(manager.submit("pdf", _pipeline))
+
+    assert snapshot["status"] == SUCCEEDED and snapshot["result"] == {"headings": 3}
+    assert snapshot["stages"] == {"pages": {"parsed": 4, "total": 4}, "headings": {"found": 3}}
+    assert snapshot["started_at"] <= snapshot["finished_at"]
+    manager.shutdown()
+
+
+def test_errors_keep_their_status_code():
+    manager = JobManager(workers=1, max_pending=4, result_ttl=60)
+
+    def constrained(progress):
+        raise ScheduleConstraintError("exam_date must be after the start date.")
+
+    def broken(progress):
+        raise RuntimeError("boom")
+
+    assert _wait(manager.submit("pdf", constrained))["error"] == {
+        "status_code": 422, "detail": "exam_date must be after the start date.",
+    }
+    failed = _wait(manager.submit("pdf", broken))
+    assert failed["status"] == FAILED and failed["error"]["status_code"] == 500 and "result" not in failed
+    manager.shutdown()
+
+
+def test_rejects_when_too_many_jobs_wait():
+    manager = JobManager(workers=1, max_pending=1, result_ttl=60)
+    release = threading.Event()
+    blocked = lambda progress: release.wait(5)
+
+    try:
+        running = manager.submit("pdf", blocked)
+        for _ in range(500):
+            if running.status != "queued":
+                break
+            time.sleep(0.01)
+        manager.submit("pdf", blocked)
+
+        with pytest.raises(HTTPException) as rejected:
+            manager.submit("pdf", blocked)
+        assert rejected.value.status_code == 429
+        assert manager.stats()["rejected"] == 1
+    finally:
+        release.set()
+    manager.shutdown()
+
+
+def test_finished_jobs_expire():
+    manager = JobManager(workers=1, max_pending=4, result_ttl=0)
+    job = manager.submit("pdf", _pipeline)
+    _wait(job)
+    time.sleep(0.01)
+
+    assert manager.get(job.id) is None
+    assert manager.stats()["expired"] == 1
+    manager.shutdown()
+
+
+def test_event_stream_ends_with_the_result():
+    manager = JobManager(workers=1, max_pending=4, result_ttl=60)
+    release = threading.Event()
+
+    def pipeline(progress):
+        release.wait(5)
+        return _pipeline(progress)
+
+    async def follow(job):
+        chunks = []
+        async for chunk in manager.events(job):
+            chunks.append(chunk)
+            release.set()  # let the job run once the first snapshot is out
+        return "".join(chunks)
+
+    events = _parse_events(asyncio.run(follow(manager.submit("pdf", pipeline))))
+
+    assert events[0][0] == "progress" and events[0][1]["status"] in ("queued", "running")
+    assert all(name == "progress" for name, _ in events[:-1])
+    assert events[-1][0] == "result" and events[-1][1]["result"] == {"headings": 3}
+    manager.shutdown()
+
+
+def test_job_routes():
+    client = TestClient(app)
+    assert client.get("/jobs/missing").status_code == 404
+    assert client.get("/jobs/missing/events").status_code == 404
+
+    job = job_manager.submit("pdf", _pipeline)
+    _wait(job)
+
+    assert client.get(f"/jobs/{job.id}").json()["result"] == {"headings": 3}
+    response = client.get(f"/jobs/{job.id}/events")
+    assert response.headers["content-type"].startswith("text/event-stream")
+    assert [name for name, _ in _parse_events(response.text)] == ["result"]
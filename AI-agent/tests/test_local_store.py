@@ -0,0 +1,64 @@
+"""
+LocalVectorStore shared by several processes (two instances on one
+directory stand in for two uvicorn workers) and filtered IVF queries.
+"""
+
+import numpy as np
+
+from src.vectorstore import local_store
+from src.vectorstore.local_store import LocalVectorStore
+
+
+def _vectors(ids, seed):
+    rng = np.random.default_rng(seed)
+    return [{"id": vec_id, "values": rng.normal(size=8).tolist(), "metadata": {"n": i}}
+            for i, vec_id in enumerate(ids)]
+
+
+def _finds_itself(store, vectors):
+    return all(store.query(v["values"], top_k=1)["matches"][0]["id"] == v["id"] for v in vectors)
+
+
+def test_interleaved_writers_do_not_share_rows(tmp_path):
+    first, second = LocalVectorStore(str(tmp_path)), LocalVectorStore(str(tmp_path))
+    a, b, c = _vectors(["a0", "a1"], 1), _vectors(["b0", "b1", "b2"], 2), _vectors(["c0"], 3)
+
+    first.upsert(a)
+    second.upsert(b)
+    first.upsert(c)
+    second.delete(["a1"])
+
+    for store in (first, second, LocalVectorStore(str(tmp_path))):
+        assert set(store.list_ids()) == {"a0", "b0", "b1", "b2", "c0"}
+        assert _finds_itself(store, a[:1] + b + c)
+
+
+def test_reader_follows_a_compaction_by_another_process(tmp_path):
+    writer, reader = LocalVectorStore(str(tmp_path)), LocalVectorStore(str(tmp_path))
+    kept = _vectors(["kept"], 1)
+    writer.upsert(kept)
+    assert _finds_itself(reader, kept)
+
+    # Rewriting every id more than once retires enough rows to compact
+    for seed in range(3):
+        writer.upsert(_vectors([f"v{i}" for i in range(600)], seed + 10))
+    assert len(writer._namespace(None, create=False).ids) < 1800
+
+    latest = _vectors([f"v{i}" for i in range(600)], 12)
+    assert set(reader.list_ids()) == {"kept"} | {v["id"] for v in latest}
+    assert _finds_itself(reader, kept + latest[:20])
+
+
+def test_filtered_ivf_query_widens_the_probe(tmp_path, monkeypatch):
+    monkeypatch.setattr(local_store, "LOCAL_VECTOR_STORE_ANN_THRESHOLD", 100)
+    monkeypatch.setattr(local_store, "LOCAL_VECTOR_STORE_NPROBE", 1)
+    store = LocalVectorStore(str(tmp_path))
+    vectors = _vectors([f"v{i}" for i in range(900)], 1)
+    for i, v in enumerate(vectors):
+        v["metadata"] = {"pdf": "rare.pdf" if i % 150 == 0 else "common.pdf"}
+    store.upsert(vectors)
+
+    matches = store.query(vectors[1]["values"], top_k=5, filter={"pdf": "rare.pdf"})["matches"]
+
+    assert len(matches) == 5
+    assert all(m["metadata"]["pdf"] == "rare.pdf" for m in matches)
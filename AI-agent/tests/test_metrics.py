@@ -0,0 +1,97 @@
+"""
+Prometheus text exposition (src.metrics), the /metrics endpoint, the
+request middleware and the app lifespan.
+"""
+
+import re
+
+from fastapi.testclient import TestClient
+
+from src import metrics
+from src.main import app
+from src.metrics import Counter, Gauge, Histogram, Registry
+from src.processing import processing_stage
+
+# name{labels} value, as Prometheus parses it
+SAMPLE = re.compile(r'^[a-zA-Z_:][a-zA-Z0-9_:]*(\{([a-zA-Z_]\w*="([^"\\]|\\.)*",?)*\})? (-?[0-9.e+-]+|\+Inf|NaN)$')
+
+
+def test_counter_gauge_and_escaped_labels():
+    registry = Registry()
+    counter = registry.register(Counter("requests_total", "Requests.", ["route"]))
+    gauge = registry.register(Gauge("in_flight", "In flight."))
+    counter.inc(route='/a"b\\c')
+    counter.inc(2, route='/a"b\\c')
+    gauge.inc()
+    gauge.dec(3)
+
+    assert registry.render() == (
+        "# HELP requests_total Requests.\n"
+        "# TYPE requests_total counter\n"
+        'requests_total{route="/a\\"b\\\\c"} 3\n'
+        "# HELP in_flight In flight.\n"
+        "# TYPE in_flight gauge\n"
+        "in_flight -2\n"
+    )
+
+
+def test_histogram_buckets_are_cumulative():
+    registry = Registry()
+    histogram = registry.register(Histogram("latency_seconds", "Latency.", ["stage"], buckets=(0.1, 1.0)))
+    for value in (0.05, 0.1, 0.5, 3.0):
+        histogram.observe(value, stage="parse")
+
+    assert registry.render().splitlines()[2:] == [
+        'latency_seconds_bucket{stage="parse",le="0.1"} 2',
+        'latency_seconds_bucket{stage="parse",le="1.0"} 3',
+        'latency_seconds_bucket{stage="parse",le="+Inf"} 4',
+        'latency_seconds_sum{stage="parse"} 3.65',
+        'latency_seconds_count{stage="parse"} 4',
+    ]
+
+
+def test_failing_collector_is_skipped():
+    registry = Registry()
+
+    def broken():
+        raise RuntimeError("boom")
+        yield
+
+    registry.add_collector(broken)
+    registry.add_collector(lambda: [("up", "gauge", "Up.", [({}, 1)])])
+    assert registry.render() == "# HELP up Up.\n# TYPE up gauge\nup 1\n"
+
+
+def test_stage_excludes_nested_time_and_reaches_server_timing():
+    token = metrics.start_request_timings()
+    with metrics.stage("outer") as span:
+        span.exclude(10.0)
+    with metrics.stage("inner"):
+        pass
+    timings = metrics.finish_request_timings(token)
+
+    assert [name for name, _ in timings] == ["outer", "inner"]
+    assert timings[0][1] == 0.0
+    header = metrics.server_timing_header(timings + [("inner", 0.002)], 0.5)
+    assert re.fullmatch(r"outer;dur=0\.0, inner;dur=\d+\.\d, total;dur=500\.0", header)
+
+
+def test_metrics_endpoint_is_valid_exposition():
+    client = TestClient(app)
+    client.get("/")
+    response = client.get("/metrics")
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain; version=0.0.4")
+    lines = response.text.splitlines()
+    samples = [line for line in lines if not line.startswith("#")]
+    assert all(SAMPLE.match(line) for line in samples), [l for l in samples if not SAMPLE.match(l)]
+    assert 'study_planner_http_requests_total{method="GET",route="/",status="200"}' in response.text
+    assert "# TYPE study_planner_processing_calls_total counter" in lines
+
+
+def test_lifespan_shuts_down_the_workers():
+    with TestClient(app) as client:
+        assert client.post("/schedule/realign", json={}).status_code == 422
+        assert processing_stage.executor is not None
+    assert processing_stage._executor is None
@@ -0,0 +1,20 @@
+"""
+Page-range splitting and how the shared PDF process pool starts its workers.
+"""
+
+from src.pdf import page_pool
+
+
+def test_page_ranges_cover_every_page_once():
+    assert page_pool.page_ranges(0, 4) == []
+    assert page_pool.page_ranges(10, 3) == [(0, 4), (4, 8), (8, 10)]
+    assert page_pool.page_ranges(2, 8) == [(0, 1), (1, 2)]
+
+
+def test_pool_workers_are_not_forked():
+    page_pool.shutdown_page_pool()
+    try:
+        method = page_pool.get_page_pool()._mp_context.get_start_method()
+    finally:
+        page_pool.shutdown_page_pool()
+    assert method in ("forkserver", "spawn")
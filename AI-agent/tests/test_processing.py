@@ -0,0 +1,97 @@
+"""
+ProcessingStage admission control: 429 when the queue is full, 503 after
+the queue timeout, and slots held until the executor call itself finishes.
+"""
+
+import asyncio
+import threading
+
+import pytest
+from fastapi import HTTPException
+
+from src.processing import ProcessingStage
+
+
+def _stage(**kwargs):
+    return ProcessingStage(**{"max_concurrency": 1, "max_queue": 1, "queue_timeout": 5.0, **kwargs})
+
+
+async def _wait_for(predicate):
+    for _ in range(500):
+        if predicate():
+            return
+        await asyncio.sleep(0.01)
+    raise AssertionError("condition not reached")
+
+
+def test_runs_the_call_and_counts_it():
+    stage = _stage()
+
+    assert asyncio.run(stage.run(sum, [1, 2, 3])) == 6
+    assert stage.stats()["completed"] == 1 and stage.running == 0
+
+
+def test_rejects_with_429_when_slots_and_queue_are_taken():
+    stage = _stage()
+    release = threading.Event()
+
+    async def scenario():
+        first = asyncio.ensure_future(stage.run(release.wait))
+        second = asyncio.ensure_future(stage.run(release.wait))
+        await _wait_for(lambda: stage.running == 1 and stage.waiting == 1)
+
+        with pytest.raises(HTTPException) as rejected:
+            await stage.run(release.wait)
+
+        release.set()
+        await asyncio.gather(first, second)
+        return rejected.value
+
+    error = asyncio.run(scenario())
+    assert error.status_code == 429 and error.headers["Retry-After"] == "2"
+    assert stage.rejected == 1 and stage.completed == 2
+
+
+def test_times_out_with_503_waiting_for_a_slot():
+    stage = _stage(queue_timeout=0.05)
+    release = threading.Event()
+
+    async def scenario():
+        first = asyncio.ensure_future(stage.run(release.wait))
+        await _wait_for(lambda: stage.running == 1)
+        try:
+            with pytest.raises(HTTPException) as timed_out:
+                await stage.run(release.wait)
+        finally:
+            release.set()
+        await first
+        return timed_out.value
+
+    assert asyncio.run(scenario()).status_code == 503
+    assert stage.timed_out == 1 and stage.waiting == 0
+
+
+def test_cancelled_request_keeps_its_slot_until_the_call_finishes():
+    stage = _stage(max_queue=0)
+    release = threading.Event()
+
+    async def scenario():
+        request = asyncio.ensure_future(stage.run(release.wait))
+        await _wait_for(lambda: stage.running == 1)
+
+        request.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await request
+
+        try:
+            # The call is still running on the executor: no room for another one
+            assert stage.running == 1
+            with pytest.raises(HTTPException):
+                await stage.run(release.wait, 1)
+        finally:
+            release.set()
+        await _wait_for(lambda: stage.running == 0)
+        return await stage.run(sum, [1])
+
+    assert asyncio.run(scenario()) == 1
+    stage.shutdown()
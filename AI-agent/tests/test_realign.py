@@ -0,0 +1,122 @@
+"""
+realign_schedule and the Timetable it edits: which task is realigned, where
+the copy goes, copy-on-write and the ?diff=true output.
+"""
+
+from fastapi.testclient import TestClient
+
+from src.main import app
+from src.schedule.generator import realign_schedule
+from src.schedule.router import TimetableTask
+from src.schedule.timetable import Timetable
+
+
+def _task(task_id, hours=1, completed=False):
+    return {"id": task_id, "description": f"Study {task_id}", "hours": hours, "completed": completed}
+
+
+def _timetable():
+    return {
+        "Day 1": [_task("task-1", 2), _task("task-2", 1)],
+        "Day 2": [_task("task-3", 3)],
+        "Day 3": [_task("task-4", 1)],
+    }
+
+
+def _realign(timetable, task_id, **kwargs):
+    return realign_schedule(timetable, task_id, "Mon-Sun 6-9pm", "3 hours/day", "user-1", **kwargs)
+
+
+def test_missed_task_moves_to_first_later_day_with_room():
+    timetable = _timetable()
+
+    realigned = _realign(timetable, "task-2")
+
+    assert realigned["Day 1"][1]["description"] == "[RESCHEDULED] Study task-2"
+    assert realigned["Day 1"][1]["rescheduled"] is True
+    # Day 2 is full (3 of 3 hours), Day 3 has room
+    assert realigned["Day 3"][-1] == {
+        "id": "task-2-realigned", "description": "Realigned: Study task-2", "hours": 1, "completed": False,
+    }
+    # The input is not modified
+    assert timetable == _timetable()
+
+
+def test_new_day_when_no_later_day_has_room():
+    realigned = _realign(_timetable(), "task-3")
+    assert realigned["day4"] == [
+        {"id": "task-3-realigned", "description": "Realigned: Study task-3", "hours": 3, "completed": False}
+    ]
+
+
+def test_completed_or_unknown_task_is_left_alone():
+    timetable = _timetable()
+    timetable["Day 1"][0]["completed"] = True
+
+    assert _realign(timetable, "task-1") == timetable
+    assert _realign(timetable, "task-9") == timetable
+    assert _realign(timetable, None, return_diff=True) == {"added": [], "changed": [], "days": []}
+
+
+def test_duplicate_ids_realign_the_first_open_task():
+    timetable = _timetable()
+    timetable["Day 1"][0]["completed"] = True
+    timetable["Day 3"].append(_task("task-1", 1))
+
+    realigned = _realign(timetable, "task-1")
+
+    assert realigned["Day 1"][0] == timetable["Day 1"][0]
+    assert realigned["Day 3"][1]["rescheduled"] is True
+    assert realigned["day4"][0]["id"] == "task-1-realigned"
+
+
+def test_copy_skips_days_without_study_time():
+    # 2026-10-19 is a Monday: Day 2 is Tuesday, when the student is not free
+    timetable = {"Day 1": [_task("task-1", 2)], "Day 2": [], "Day 3": [_task("task-3", 1)]}
+
+    realigned = realign_schedule(timetable, "task-1", "Mon, Wed 6-9pm", "3 hours/day", "user-1",
+                                 start_date="2026-10-19")
+
+    assert realigned["Day 2"] == []
+    assert realigned["Day 3"][-1]["id"] == "task-1-realigned"
+
+
+def test_diff_has_only_the_edits():
+    diff = _realign(_timetable(), "task-2", return_diff=True)
+
+    assert diff == {
+        "added": [{"day": "Day 3", "task": {
+            "id": "task-2-realigned", "description": "Realigned: Study task-2", "hours": 1, "completed": False,
+        }}],
+        "changed": [{"day": "Day 1", "task": {**_task("task-2", 1), "description": "[RESCHEDULED] Study task-2",
+                                              "rescheduled": True}}],
+        "days": ["Day 1", "Day 3"],
+    }
+
+
+def test_models_are_dumped_only_when_edited():
+    days = {day: [TimetableTask(**task) for task in tasks] for day, tasks in _timetable().items()}
+    timetable = Timetable(days)
+
+    timetable.update("task-2", completed=True)
+    result = timetable.to_dict()
+
+    assert timetable.days() == ["Day 1", "Day 2", "Day 3"]
+    assert result["Day 1"][1] == {**_task("task-2", 1), "completed": True}
+    assert result["Day 2"] == [_task("task-3", 3)]
+    assert days["Day 1"][1].completed is False  # the input is not modified
+
+
+def test_untouched_days_are_shared():
+    timetable = _timetable()
+    realigned = _realign(timetable, "task-2")
+    assert realigned["Day 2"][0] is timetable["Day 2"][0]
+
+
+def test_realign_route_returns_the_diff():
+    body = {"userId": "user-1", "currentTimetable": _timetable(), "missedTaskId": "task-2",
+            "availability": "Mon-Sun 6-9pm", "studyTime": "3 hours/day"}
+    response = TestClient(app).post("/schedule/realign?diff=true", json=body)
+
+    assert response.status_code == 200
+    assert response.json()["diff"]["days"] == ["Day 1", "Day 3"]
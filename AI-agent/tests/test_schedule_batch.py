@@ -0,0 +1,74 @@
+"""
+/schedule/generate-batch: requests grouped by document, one NDJSON line per
+request plus a summary line, and per-request errors.
+"""
+
+import json
+
+from fastapi.testclient import TestClient
+
+from src.main import app
+from src.schedule import router
+
+SYLLABUS = "Unit 1 Sets\nUnit 2 Relations\nUnit 3 Functions"
+
+
+def _request(user_id, **fields):
+    return {"userId": user_id, "availability": "Mon-Sun 6-9pm", "startDate": "2026-10-19",
+            "studyTime": "2 hours/day", "rawData": SYLLABUS, **fields}
+
+
+def _post(requests):
+    return TestClient(app).post("/schedule/generate-batch", json={"requests": requests})
+
+
+def _lines(response):
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    return [json.loads(line) for line in response.text.splitlines()]
+
+
+def test_one_line_per_request_and_a_summary():
+    response = _post([
+        _request("a"),
+        _request("b", rawData="Chapter 1 Graphs"),
+        _request("c", studyTime="1 hour/day"),
+    ])
+
+    assert response.status_code == 200
+    *results, summary = _lines(response)
+    assert summary == {"done": True, "total": 3, "failed": 0, "documents": 2}
+
+    by_index = {line["index"]: line for line in results}
+    assert sorted(by_index) == [0, 1, 2]
+    assert [by_index[i]["userId"] for i in range(3)] == ["a", "b", "c"]
+    assert all(line["success"] for line in results)
+    assert by_index[0]["timetable"]["Day 1"][0] == {
+        "id": "task-1", "description": "Study Unit 1 Sets", "hours": 2.0, "completed": False,
+    }
+    assert list(by_index[1]["timetable"]) == ["Day 1"]
+    # Same document, different study time: the split follows each user's time
+    assert by_index[2]["timetable"]["Day 1"][0]["id"] == "task-1-1"
+
+
+def test_errors_are_reported_per_request():
+    response = _post([
+        _request("ok"),
+        _request("no-time", availability="Mon-Sun off"),
+        _request("bad-pdf", pdfContent="not base64!"),
+        _request("empty", rawData=""),
+    ])
+
+    *results, summary = _lines(response)
+    by_user = {line["userId"]: line for line in results}
+
+    assert summary == {"done": True, "total": 4, "failed": 3, "documents": 3}
+    assert by_user["ok"]["success"] is True
+    for user_id in ("no-time", "bad-pdf", "empty"):
+        assert by_user[user_id]["success"] is False and by_user[user_id]["status"] == 422
+
+
+def test_rejects_empty_and_oversized_batches(monkeypatch):
+    assert _post([]).status_code == 422
+
+    monkeypatch.setattr(router, "SCHEDULE_BATCH_MAX_ITEMS", 2)
+    assert _post([_request(str(i)) for i in range(3)]).status_code == 413
@@ -0,0 +1,90 @@
+"""
+Capacity-aware packing (src.schedule.engine): splitting topics across days,
+per-day capacity arrays, deadline compression and the horizon limit.
+"""
+
+import logging
+from datetime import datetime
+
+import numpy as np
+import pytest
+
+from src.config import MAX_SCHEDULE_DAYS
+from src.schedule.engine import (
+    ScheduleConstraintError,
+    check_horizon,
+    dated_sessions,
+    days_until,
+    pack_sessions,
+    rounded_hours,
+)
+
+
+def _sessions(hours, capacity, max_days=None):
+    days, topics, taken = pack_sessions(hours, capacity, max_days)
+    return list(zip(days.tolist(), topics.tolist(), np.round(taken, 6).tolist()))
+
+
+def test_topics_fill_each_day_and_continue_on_the_next():
+    assert _sessions([2, 3, 1], 3) == [(0, 0, 2.0), (0, 1, 1.0), (1, 1, 2.0), (1, 2, 1.0)]
+
+
+def test_days_without_capacity_are_skipped():
+    capacity = np.array([2.0, 0.0, 0.0, 2.0, 2.0])
+    assert _sessions([3, 1], capacity) == [(0, 0, 2.0), (3, 0, 1.0), (3, 1, 1.0)]
+
+
+def test_zero_hour_topic_keeps_a_session():
+    assert _sessions([1, 0, 1], 2) == [(0, 0, 1.0), (0, 1, 0.0), (0, 2, 1.0)]
+
+
+def test_hours_are_compressed_to_fit_the_deadline(caplog):
+    with caplog.at_level(logging.WARNING, logger="src.schedule.engine"):
+        sessions = _sessions([4, 4], 2, max_days=2)
+
+    assert sessions == [(0, 0, 2.0), (1, 1, 2.0)]
+    assert "compressing to 50%" in caplog.text
+
+
+def test_no_capacity_is_a_constraint_error():
+    with pytest.raises(ScheduleConstraintError):
+        pack_sessions([1], 0)
+    with pytest.raises(ScheduleConstraintError):
+        pack_sessions([1], np.zeros(5))
+
+
+def test_horizon_is_checked_before_allocating():
+    check_horizon(MAX_SCHEDULE_DAYS)
+    with pytest.raises(ScheduleConstraintError):
+        check_horizon(MAX_SCHEDULE_DAYS + 1)
+    with pytest.raises(ScheduleConstraintError):
+        pack_sessions([1e9], 0.01)
+    with pytest.raises(ScheduleConstraintError):
+        pack_sessions([1], np.ones(MAX_SCHEDULE_DAYS + 1))
+
+
+def test_rounded_hours_keep_the_total():
+    shown = rounded_hours(np.full(3000, 1 / 3))
+    assert round(sum(shown), 2) == 1000.0
+
+
+def test_dated_sessions_end_before_the_exam():
+    start = datetime(2026, 10, 19)
+    max_days = days_until(start, "2026-10-22")
+    topics = [{"title": "Unit 1", "hours": 5, "difficulty": 2.0}, {"title": "Unit 2", "hours": 5}]
+
+    rows = dated_sessions(topics, start, capacity=3, max_days=max_days)
+
+    assert max_days == 3
+    assert rows[0] == {"date": "2026-10-19", "topic": "Unit 1", "hours": 3.0, "difficulty": 2.0}
+    assert rows[-1]["date"] == "2026-10-21"
+    assert round(sum(r["hours"] for r in rows), 2) == 9.0
+
+
+def test_exam_date_must_follow_the_start():
+    start = datetime(2026, 10, 19)
+    assert days_until(start, None) is None
+    with pytest.raises(ScheduleConstraintError):
+        days_until(start, "2026-10-19")
+    with pytest.raises(ScheduleConstraintError):
+        days_until(start, "19/10/2026")
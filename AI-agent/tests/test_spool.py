@@ -0,0 +1,84 @@
+"""
+Upload spooling (src.pdf.spool): chunked base64 decoding, the per-chunk size
+limit and the digest the analysis cache is keyed by.
+"""
+
+import asyncio
+import base64
+import hashlib
+import os
+
+import pytest
+from fastapi import HTTPException
+
+from src.pdf import spool
+from src.pdf.spool import check_content_length, file_digest, spool_base64, spool_stream
+
+DATA = bytes(range(256)) * 40
+
+
+@pytest.fixture(autouse=True)
+def small_chunks(monkeypatch):
+    # Odd size so base64 quanta and line breaks straddle chunk boundaries
+    monkeypatch.setattr(spool, "UPLOAD_CHUNK_BYTES", 100)
+
+
+def _spool_files():
+    return set(os.listdir(spool.UPLOAD_SPOOL_DIR)) if os.path.isdir(spool.UPLOAD_SPOOL_DIR) else set()
+
+
+def test_base64_is_decoded_in_chunks():
+    encoded = base64.encodebytes(DATA).decode()  # line breaks every 76 characters
+
+    with spool_base64(encoded, filename="notes.pdf") as spooled:
+        with open(spooled.path, "rb") as f:
+            assert f.read() == DATA
+        assert spooled.size == len(DATA) and spooled.filename == "notes.pdf"
+        assert spooled.digest == hashlib.sha256(DATA).hexdigest() == file_digest(spooled.path)
+    assert not os.path.exists(spooled.path)
+
+
+def test_unpadded_base64_and_invalid_input():
+    with spool_base64(base64.b64encode(b"%PDF-1").decode().rstrip("=")) as spooled:
+        assert spooled.size == 6
+
+    before = _spool_files()
+    with pytest.raises(ValueError):
+        spool_base64("abcde")
+    assert _spool_files() == before
+
+
+def test_oversized_upload_fails_while_streaming():
+    async def body():
+        for _ in range(10):
+            yield b"x" * 100
+
+    before = _spool_files()
+    with pytest.raises(HTTPException) as too_large:
+        asyncio.run(spool_stream(body(), max_bytes=250))
+    assert too_large.value.status_code == 413
+    assert _spool_files() == before
+
+    with pytest.raises(HTTPException):
+        spool_base64(base64.b64encode(b"x" * 400).decode(), max_bytes=250)
+
+
+def test_stream_is_spooled_with_its_digest():
+    async def body():
+        for start in range(0, len(DATA), 1000):
+            yield DATA[start:start + 1000]
+        yield b""
+
+    spooled = asyncio.run(spool_stream(body()))
+    try:
+        assert spooled.size == len(DATA) and spooled.digest == hashlib.sha256(DATA).hexdigest()
+    finally:
+        spooled.discard()
+
+
+def test_declared_length_is_checked_up_front():
+    check_content_length({"content-length": "100"}, max_bytes=100)
+    check_content_length({}, max_bytes=100)
+    with pytest.raises(HTTPException):
+        check_content_length({"content-length": "101"}, max_bytes=100)
+    check_content_length({"content-length": "150"}, max_bytes=100, overhead=50)
@@ -0,0 +1,50 @@
+"""
+Golden-file tests: TextCleaner output must stay byte-identical to the
+original (pre-optimization) implementation.
+
+Each tests/golden/text_cleaner/<case>.input.txt has a <case>.expected.txt
+produced by that original implementation; do not regenerate the expected
+files from the current code. In "pages" the pages are separated by form
+feeds, in both the input and the expected file.
+"""
+
+from pathlib import Path
+
+import pytest
+
+from src.preprocessing.text_cleaner import TextCleaner
+
+GOLDEN = Path(__file__).parent / "golden" / "text_cleaner"
+CASES = sorted(path.name[: -len(".input.txt")] for path in GOLDEN.glob("*.input.txt"))
+PAGE_BREAK = "\f"
+
+
+def _read(case: str, kind: str) -> bytes:
+    return (GOLDEN / f"{case}.{kind}.txt").read_bytes()
+
+
+def test_golden_cases_exist():
+    assert {"pages", "symbols", "syllabus"} <= set(CASES)
+
+
+@pytest.mark.parametrize("case", [c for c in CASES if c != "pages"])
+def test_clean_matches_golden(case):
+    text = _read(case, "input").decode("utf-8")
+    assert TextCleaner().clean(text).encode("utf-8") == _read(case, "expected")
+
+
+@pytest.mark.parametrize("case", [c for c in CASES if c != "pages"])
+def test_clean_iter_matches_golden(case):
+    text = _read(case, "input").decode("utf-8")
+    assert [page.encode("utf-8") for page in TextCleaner().clean_iter(iter([text]))] == [_read(case, "expected")]
+
+
+def test_pages_match_golden():
+    pages = _read("pages", "input").decode("utf-8").split(PAGE_BREAK)
+    expected = _read("pages", "expected").split(PAGE_BREAK.encode())
+    cleaner = TextCleaner()
+
+    assert len(pages) == len(expected)
+    assert [cleaner.clean(page).encode("utf-8") for page in pages] == expected
+    # clean_iter consumes the pages lazily and yields clean(page) per page
+    assert [page.encode("utf-8") for page in cleaner.clean_iter(iter(pages))] == expected
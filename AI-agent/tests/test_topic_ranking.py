@@ -0,0 +1,71 @@
+"""
+Topic ranking on the embedding matrix (src.logic.topic_ranking) and
+StudyPlanner.rank_topics on top of it.
+"""
+
+import numpy as np
+
+from src.logic.study_planner import StudyPlanner
+from src.logic.topic_ranking import cluster_topics, difficulty_scores, rank_matrix, similarity_matrix
+
+# Two groups (x-ish and y-ish topics) and one outlier (z), interleaved
+MATRIX = np.array([
+    [1.0, 0.1, 0.0],    # 0 x
+    [0.1, 1.0, 0.0],    # 1 y
+    [0.0, 0.0, 5.0],    # 2 z (length does not matter)
+    [0.9, 0.2, 0.0],    # 3 x
+    [0.2, 0.9, 0.1],    # 4 y
+    [0.95, 0.05, 0.0],  # 5 x
+])
+
+
+def test_similarity_ignores_vector_length():
+    similarity = similarity_matrix(MATRIX)
+    assert similarity.shape == (6, 6) and similarity.dtype == np.float32
+    assert np.allclose(np.diagonal(similarity), 1.0)
+    assert similarity_matrix(np.zeros((2, 3))).tolist() == [[0, 0], [0, 0]]
+
+
+def test_clusters_are_numbered_by_first_appearance():
+    labels = cluster_topics(similarity_matrix(MATRIX), threshold=0.8)
+    assert labels.tolist() == [0, 1, 2, 0, 1, 0]
+
+
+def test_outlier_is_the_most_distinct_topic():
+    difficulty = difficulty_scores(similarity_matrix(MATRIX))
+    assert int(np.argmax(difficulty)) == 2
+
+
+def test_study_order_keeps_clusters_together():
+    order, _, labels = rank_matrix(MATRIX, threshold=0.8)
+
+    assert sorted(order) == list(range(6))
+    visited = [int(labels[i]) for i in order]
+    # Each cluster is one contiguous run
+    assert len([c for i, c in enumerate(visited) if i == 0 or c != visited[i - 1]]) == 3
+    # The outlier is furthest from everything, so it is studied last
+    assert order[-1] == 2
+
+
+def test_single_topic_and_empty_matrix():
+    order, difficulty, labels = rank_matrix(np.ones((1, 3)))
+    assert order == [0] and labels.tolist() == [0] and difficulty.tolist() == [0.0]
+    assert rank_matrix(np.zeros((0, 3)))[0] == []
+
+
+class FakeEmbeddingService:
+    def embed_batch(self, texts):
+        return MATRIX[:len(texts)]
+
+
+def test_rank_topics_returns_topics_in_study_order():
+    planner = StudyPlanner()
+    planner.embedding_service = FakeEmbeddingService()
+    topics = [f"topic {i}" for i in range(6)]
+
+    ranked = planner.rank_topics(topics)
+
+    assert sorted(r["text"] for r in ranked) == topics
+    assert ranked[-1] == {"text": "topic 2", "difficulty": ranked[-1]["difficulty"], "cluster": 2}
+    assert isinstance(ranked[0]["difficulty"], float)
+    assert planner.rank_topics([]) == []
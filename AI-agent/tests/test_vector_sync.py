@@ -0,0 +1,103 @@
+"""
+Differential sync (src.vectorstore.sync) against the local vector store,
+including the clean-up of positional ids written before content-hash ids.
+"""
+
+import numpy as np
+import pytest
+
+from src.config import PINECONE_NAMESPACE
+from src.schedule.utils import get_headings_store, store_headings_in_pinecone
+from src.vectorstore.local_store import LocalVectorStore
+from src.vectorstore.sync import delete_legacy_ids, document_prefix, store_document
+
+NAMESPACE = "pdf-headings"
+
+
+def _vector(i):
+    return [float(i + 1), 1.0, 0.0, 0.5]
+
+
+def _items(texts):
+    return [{"text": t, "values": _vector(i), "metadata": {"heading": t}} for i, t in enumerate(texts)]
+
+
+@pytest.fixture
+def store(tmp_path):
+    return LocalVectorStore(str(tmp_path))
+
+
+def _ids(store):
+    return set(store.list_ids(namespace=NAMESPACE))
+
+
+def _upsert_positional(store, ids):
+    store.upsert([{"id": vec_id, "values": _vector(i), "metadata": {}} for i, vec_id in enumerate(ids)],
+                 namespace=NAMESPACE)
+
+
+def test_sync_deletes_only_stale_items(store):
+    store_document(store, "notes.pdf", _items(["Unit 1", "Unit 2"]), namespace=NAMESPACE)
+    before = _ids(store)
+
+    stats = store_document(store, "notes.pdf", _items(["Unit 1", "Unit 3"]), namespace=NAMESPACE)
+
+    assert stats == {"kept": 1, "upserted": 1, "deleted": 1}
+    after = _ids(store)
+    assert len(after) == 2 and len(before & after) == 1
+    assert all(vec_id.startswith(document_prefix("notes.pdf")) for vec_id in after)
+
+
+def test_sync_removes_the_documents_positional_ids(store):
+    # "notes.pdf-2-0" belongs to a document called "notes.pdf-2"
+    _upsert_positional(store, ["notes.pdf-0", "notes.pdf-1", "notes.pdf-2-0", "heading-0"])
+
+    stats = store_document(store, "notes.pdf", _items(["Unit 1"]), namespace=NAMESPACE,
+                           legacy_prefix="notes.pdf-")
+
+    assert stats == {"kept": 0, "upserted": 1, "deleted": 2}
+    remaining = _ids(store)
+    assert {"notes.pdf-2-0", "heading-0"} <= remaining
+    assert not {"notes.pdf-0", "notes.pdf-1"} & remaining
+
+
+def test_delete_legacy_ids(store):
+    store_document(store, "heading", _items(["Unit 1"]), namespace=NAMESPACE)
+    synced = _ids(store)
+    _upsert_positional(store, ["heading-0", "heading-1", "heading-x"])
+
+    assert delete_legacy_ids(store, "heading-", namespace=NAMESPACE, dry_run=True) == 2
+    assert len(_ids(store)) == len(synced) + 3
+
+    assert delete_legacy_ids(store, "heading-", namespace=NAMESPACE) == 2
+    assert _ids(store) == synced | {"heading-x"}
+
+
+def test_store_document_streams_items(store):
+    embedded = []
+
+    def embed(texts):
+        embedded.append(len(texts))
+        return np.ones((len(texts), 4), dtype=np.float32)
+
+    def items():
+        for i in range(600):
+            # Groups of 256 are embedded before later items are read
+            assert sum(embedded) >= i - i % 256
+            yield {"text": f"chunk {i}", "metadata": {}}
+
+    stats = store_document(store, "big.pdf", items(), namespace=NAMESPACE, embed_fn=embed)
+
+    assert stats == {"kept": 0, "upserted": 600, "deleted": 0}
+    assert embedded == [256, 256, 88]
+
+
+def test_store_headings_in_pinecone_scopes_ids_to_the_document():
+    a = store_headings_in_pinecone(["Unit 1", "Unit 2"], doc_id="a.pdf")
+    b = store_headings_in_pinecone(["Unit 1"], doc_id="b.pdf")
+    assert not set(a) & set(b)
+
+    kept = store_headings_in_pinecone(["Unit 1"], doc_id="a.pdf")
+
+    stored = set(get_headings_store().list_ids(prefix=document_prefix("a.pdf"), namespace=PINECONE_NAMESPACE))
+    assert stored == set(kept) == {a[0]}
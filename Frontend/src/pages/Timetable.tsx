@@ -88,6 +88,7 @@ export default function Timetable() {
             missedTaskId: taskId,
             availability: availability,
             studyTime: studyTime,
+            startDate: startDate, // Day 1 of the timetable, so days map to weekdays
           }),
         });
 